@@ -1,8 +1,6 @@
 import asyncio.exceptions
 import logging
 import os
-from concurrent import futures
-from concurrent.futures.process import BrokenProcessPool
 from copy import deepcopy
 from tempfile import TemporaryDirectory
 from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
@@ -29,6 +27,8 @@ from pctasks.core.utils.backoff import (
     with_backoff,
 )
 from pctasks.dataset.collection import Collection
+from pctasks.dataset.items.task import record_stage
+from pctasks.dataset.workers import WorkerCrashedError, get_worker_pool
 
 handler = logging.StreamHandler()
 handler.setFormatter(logging.Formatter("[%(levelname)s]:%(asctime)s: %(message)s"))
@@ -46,6 +46,9 @@ GOES_COG_STORAGE_URL = f"blob://{GOES_COG_STORAGE_ACCOUNT}/{GOES_COG_CONTAINER}"
 WEB_COG_FOLDER_PREFIX = "web"
 WEB_COG_SUFFIX = "wm"
 
+SEGFAULT_TEST_POOL = "goes-segfault-test"
+COGIFY_POOL = "goes-cogify"
+
 
 def should_generate_web_cog(product: ProductAcronym, variable: str) -> bool:
     # If it's MCMIP, generate for bands 1, 2 and 3
@@ -71,9 +74,6 @@ class SegfaultTestFailError(Exception):
 
 
 class GoesCmiCollection(Collection):
-    _segfault_test_pool: Optional[futures.ProcessPoolExecutor] = None
-    _segfault_test_pool_shutdown: bool = False
-
     @classmethod
     def backoff_throttle_check(cls, e: Exception) -> bool:
         """Used in cls.with_backoff to check if exceptions
@@ -95,29 +95,54 @@ class GoesCmiCollection(Collection):
             strategy=BackoffStrategy(),
         )
 
-    @classmethod
-    def _get_segfault_test_pool(cls) -> futures.ProcessPoolExecutor:
-        if cls._segfault_test_pool is None or cls._segfault_test_pool_shutdown:
-            cls._segfault_test_pool = futures.ProcessPoolExecutor(max_workers=1)
-            cls._segfault_test_pool_shutdown = False
-        return cls._segfault_test_pool
-
     @classmethod
     def ensure_no_segfault(cls, f: Callable[..., Any], *args: Any) -> None:
-        pool = cls._get_segfault_test_pool()
+        pool = get_worker_pool(SEGFAULT_TEST_POOL, max_workers=1)
         try:
-            proc = pool.submit(f, *args)
-            proc.result()
-        except BrokenProcessPool as e:
+            pool.run(f, *args, stage="segfault_test")
+        except WorkerCrashedError as e:
             logger.error(e)
             raise SegfaultTestFailError() from e
 
+    @classmethod
+    def cogify(
+        cls,
+        local_nc_path: str,
+        local_cog_dir: str,
+        variables: List[str],
+        web: bool = False,
+    ) -> Dict[str, str]:
+        """Create COGs for each variable in parallel worker processes.
+
+        Returns a mapping of variable to local COG path.
+        """
+        kwargs: Dict[str, Any] = {}
+        if web:
+            kwargs = {"target_srs": "epsg:3857", "additional_suffix": WEB_COG_SUFFIX}
+
+        pool = get_worker_pool(COGIFY_POOL)
+        fs = [
+            pool.submit(
+                cog.cogify,
+                local_nc_path,
+                local_cog_dir,
+                variables_to_include=[variable],
+                **kwargs,
+            )
+            for variable in variables
+        ]
+        created: Dict[str, str] = {}
+        for result in pool.results(fs, stage="cogify"):
+            created.update(result)
+        return created
+
     @classmethod
     def _download_cog(cls, href: str, cog_storage: Storage, local_cog_dir: str) -> str:
         cog_path = cog_storage.get_path_from_url(href)
         logger.info(f"Downloading {cog_path}...")
         local_path = os.path.join(local_cog_dir, os.path.basename(cog_path))
-        cls.with_backoff(lambda: cog_storage.download_file(cog_path, local_path))
+        with record_stage("download"):
+            cls.with_backoff(lambda: cog_storage.download_file(cog_path, local_path))
         return local_path
 
     @classmethod
@@ -152,23 +177,17 @@ class GoesCmiCollection(Collection):
 
                 try:
                     if cogs_to_create:
-                        created_cogs = cog.cogify(
-                            local_nc_path,
-                            local_cog_dir,
-                            variables_to_include=cogs_to_create,
+                        created_cogs = cls.cogify(
+                            local_nc_path, local_cog_dir, cogs_to_create
                         )
 
                     if web_cogs_to_create:
-                        created_web_cogs = cog.cogify(
-                            local_nc_path,
-                            local_cog_dir,
-                            variables_to_include=web_cogs_to_create,
-                            target_srs="epsg:3857",
-                            additional_suffix=WEB_COG_SUFFIX,
+                        created_web_cogs = cls.cogify(
+                            local_nc_path, local_cog_dir, web_cogs_to_create, web=True
                         )
 
                     logger.info("...done stactools cogify calls.")
-                except StactoolsCogifyError as e:
+                except (StactoolsCogifyError, WorkerCrashedError) as e:
                     logger.error(e)
                     return CogifyError.create(item_id=item_id, path=nc_path)
                 except GOESMissingExtentError as e:
@@ -180,16 +199,17 @@ class GoesCmiCollection(Collection):
 
                 # Upload
 
-                for var, source in created_cogs.items():
-                    destination = cog_storage.get_path_from_url(cog_hrefs[var])
-                    logger.info(f"Uploading COG to {destination}...")
-                    cog_storage.upload_file(source, destination)
-                    logger.info("...done uploading COG")
-                for var, source in created_web_cogs.items():
-                    destination = cog_storage.get_path_from_url(web_cog_hrefs[var])
-                    logger.info(f"Uploading COG to {destination}...")
-                    cog_storage.upload_file(source, destination)
-                    logger.info("...done uploading COG")
+                with record_stage("upload"):
+                    for var, source in created_cogs.items():
+                        destination = cog_storage.get_path_from_url(cog_hrefs[var])
+                        logger.info(f"Uploading COG to {destination}...")
+                        cog_storage.upload_file(source, destination)
+                        logger.info("...done uploading COG")
+                    for var, source in created_web_cogs.items():
+                        destination = cog_storage.get_path_from_url(web_cog_hrefs[var])
+                        logger.info(f"Uploading COG to {destination}...")
+                        cog_storage.upload_file(source, destination)
+                        logger.info("...done uploading COG")
 
         # Download existing COGs
 
@@ -221,7 +241,8 @@ class GoesCmiCollection(Collection):
         nc_url = asset_storage.get_url(nc_path)
         local_nc_path = os.path.join(tmp_dir, ABIL2FileName.from_href(nc_url).to_str())
         logger.info(f"  - Downloading file {nc_path}...")
-        asset_storage.download_file(nc_path, local_nc_path)
+        with record_stage("download"):
+            asset_storage.download_file(nc_path, local_nc_path)
 
         # Test that opening and closing works;
         # otherwise reading could segfault.
@@ -402,14 +423,15 @@ class GoesCmiCollection(Collection):
             logger.info("Creating Item from stactools...")
 
             try:
-                item = with_backoff(
-                    lambda: stac.create_item(  # type: ignore
-                        product_hrefs,
-                        read_href_modifier=read_href_modifier,
-                        backoff_func=cls.with_backoff,
-                    ),
-                    strategy=BackoffStrategy(waits=[0.2, 0.5]),
-                )
+                with record_stage("create_item"):
+                    item = with_backoff(
+                        lambda: stac.create_item(  # type: ignore
+                            product_hrefs,
+                            read_href_modifier=read_href_modifier,
+                            backoff_func=cls.with_backoff,
+                        ),
+                        strategy=BackoffStrategy(waits=[0.2, 0.5]),
+                    )
             except GOESInvalidGeometryError as e:
                 logger.exception(e)
                 logger.warning("Bad geometry!")
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import collections.abc
+import concurrent.futures
 import dataclasses
 import datetime
 import hashlib
@@ -22,11 +23,10 @@ import fsspec
 import pandas as pd
 import pystac
 import requests
-from stac_geoparquet.arrow import to_parquet
+from stac_geoparquet.arrow import parse_stac_items_to_arrow, to_parquet
 from stac_geoparquet.pgstac_reader import (
     get_pgstac_partitions,
     Partition,
-    pgstac_to_arrow,
     pgstac_to_iter,
 )
 
@@ -47,6 +47,7 @@ logger.addHandler(handler)
 logger.setLevel(logging.DEBUG)
 
 CHUNK_SIZE = 8192
+POOL_TYPES = ("thread", "process")
 
 PARTITION_FREQUENCIES = {
     "3dep-lidar-classification": "YS",
@@ -332,32 +333,34 @@ class CollectionConfig:
 
         def _row_func(item: dict[str, Any]) -> dict[str, Any]:
             return clean_item(item, self.render_config)
-        if any(
-            pgstac_to_iter(
-                conninfo=conninfo,
-                collection=self.collection_id,
-                start_datetime=start_datetime,
-                end_datetime=end_datetime,
-                row_func=_row_func,
+
+        # Run the query once, peeking at the first row to skip empty partitions.
+        items = pgstac_to_iter(
+            conninfo=conninfo,
+            collection=self.collection_id,
+            start_datetime=start_datetime,
+            end_datetime=end_datetime,
+            row_func=_row_func,
+            cursor_itersize=CHUNK_SIZE,
+        )
+        first = next(items, None)
+        if first is None:
+            logger.debug("Partition %s is empty.", output_path)
+            return output_path
+
+        logger.info(f"Running parquet export with chunk size of {CHUNK_SIZE}")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            arrow = parse_stac_items_to_arrow(
+                itertools.chain([first], items),
+                chunk_size=CHUNK_SIZE,
+                schema="ChunksToDisk",
+                tmpdir=tmpdir,
             )
-        ):
-            logger.info(f"Running parquet export with chunk size of {CHUNK_SIZE}")
-            with tempfile.TemporaryDirectory() as tmpdir:
-                arrow = pgstac_to_arrow(
-                    conninfo=conninfo,
-                    collection=self.collection_id,
-                    start_datetime=start_datetime,
-                    end_datetime=end_datetime,
-                    row_func=_row_func,
-                    schema="ChunksToDisk",
-                    tmpdir=tmpdir,
-                    chunk_size=CHUNK_SIZE
-                )
 
-                to_parquet(
-                    arrow,
-                    output_path,
-                    filesystem=fs)
+            to_parquet(
+                arrow,
+                output_path,
+                filesystem=fs)
         return output_path
 
     def export_partition_for_endpoints(
@@ -398,31 +401,88 @@ class CollectionConfig:
             output_path = f"{output_protocol}://{output_path}"
         return fs.exists(output_path)
 
-    def _partition_needs_to_be_rewritten(
+    def _list_last_modified(
         self,
         output_protocol: str,
         output_path: str,
         storage_options: dict[str, Any],
-        partition: Partition,
-    ) -> bool:
+    ) -> dict[str, datetime.datetime]:
+        """
+        Get the last modified time of every file under ``output_path``,
+        keyed by file name, with a single listing.
+        """
         fs = fsspec.filesystem(output_protocol, **storage_options)
         if output_protocol:
             output_path = f"{output_protocol}://{output_path}"
-        if not fs.exists(output_path):
-            return True
-        file_info = fs.info(output_path)
+        try:
+            file_infos = fs.ls(output_path, detail=True)
+        except FileNotFoundError:
+            return {}
+
+        last_modified_times = {}
+        for file_info in file_infos:
+            # Handle case where last_modified is already a datetime object or a timestamp
+            last_modified = file_info.get("last_modified", file_info.get("mtime"))
+            if last_modified is None:
+                continue
+            if not isinstance(last_modified, datetime.datetime):
+                # Assume it's a timestamp (int/float)
+                last_modified = datetime.datetime.fromtimestamp(last_modified)
+            name = file_info["name"].rstrip("/").rsplit("/", 1)[-1]
+            last_modified_times[name] = last_modified
+        return last_modified_times
 
-        # Handle case where last_modified is already a datetime object or a timestamp
-        last_modified = file_info["last_modified"]
-        if isinstance(last_modified, datetime.datetime):
-            file_modified_time = last_modified
-        else:
-            # Assume it's a timestamp (int/float)
-            file_modified_time = datetime.datetime.fromtimestamp(last_modified)
-            
+    def _partition_needs_to_be_rewritten(
+        self,
+        partition_path: str,
+        partition: Partition,
+        last_modified_times: dict[str, datetime.datetime],
+    ) -> bool:
+        name = partition_path.rsplit("/", 1)[-1]
+        file_modified_time = last_modified_times.get(name)
+        if file_modified_time is None:
+            return True
         partition_modified_time = partition.last_updated
         return file_modified_time < partition_modified_time
 
+    def _export_partitions(
+        self,
+        jobs: list[tuple[str, dict[str, Any]]],
+        max_workers: int,
+        pool_type: str,
+    ) -> list[str | None]:
+        """
+        Run ``export_partition`` for each ``(output_path, kwargs)`` job,
+        in parallel when ``max_workers`` is greater than one.
+
+        Results are returned in the order of ``jobs``.
+        """
+        if max_workers <= 1 or len(jobs) <= 1:
+            return [
+                self.export_partition(output_path=output_path, **kwargs)
+                for output_path, kwargs in tqdm.auto.tqdm(jobs, total=len(jobs))
+            ]
+
+        if pool_type not in POOL_TYPES:
+            raise ValueError(f"pool_type must be one of {POOL_TYPES}, got {pool_type}")
+        executor_class: type[concurrent.futures.Executor]
+        if pool_type == "process":
+            executor_class = concurrent.futures.ProcessPoolExecutor
+        else:
+            executor_class = concurrent.futures.ThreadPoolExecutor
+
+        results: list[str | None] = [None] * len(jobs)
+        with executor_class(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(self.export_partition, output_path=output_path, **kwargs): i
+                for i, (output_path, kwargs) in enumerate(jobs)
+            }
+            for future in tqdm.auto.tqdm(
+                concurrent.futures.as_completed(futures), total=len(futures)
+            ):
+                results[futures[future]] = future.result()
+        return results
+
     def export_collection(
         self,
         conninfo: str,
@@ -432,7 +492,22 @@ class CollectionConfig:
         pgstac_partitions: dict[str, list[Partition]],
         rewrite: bool = False,
         skip_empty_partitions: bool = False,
+        max_workers: int = 1,
+        pool_type: str = "thread",
     ) -> list[str | None]:
+        """
+        Export a collection, one parquet file per partition.
+
+        Partitions are exported in parallel by a pool of ``max_workers``
+        threads or processes (``pool_type``). Each worker opens its own
+        database connection.
+        """
+        common = dict(
+            conninfo=conninfo,
+            output_protocol=output_protocol,
+            storage_options=storage_options,
+            rewrite=rewrite,
+        )
 
         if not self.partition_frequency:
             logger.info("Exporting single-partition collection %s", self.collection_id)
@@ -452,21 +527,16 @@ class CollectionConfig:
                 "Exporting %d partitions for collection %s with frequency %s", total, self.collection_id, self.partition_frequency
             )
 
-            results = []
-            for i, endpoint in tqdm.auto.tqdm(enumerate(endpoints), total=total):
-                results.append(
-                    self.export_partition_for_endpoints(
-                        endpoints=endpoint,
-                        conninfo=conninfo,
-                        output_protocol=output_protocol,
-                        output_path=output_path,
-                        storage_options=storage_options,
-                        rewrite=rewrite,
-                        skip_empty_partitions=skip_empty_partitions,
-                        part_number=i,
-                        total=total,
+            jobs = []
+            for i, (start, end) in enumerate(endpoints):
+                partition_path = _build_output_path(output_path, i, total, start, end)
+                jobs.append(
+                    (
+                        partition_path,
+                        dict(common, start_datetime=start, end_datetime=end),
                     )
                 )
+            results = self._export_partitions(jobs, max_workers, pool_type)
         else:
             partitions = pgstac_partitions[self.collection_id]
             total = len(partitions)
@@ -479,33 +549,43 @@ class CollectionConfig:
                 "Exporting %d partitions for collection %s using pgstac partitions", total, self.collection_id
             )
 
-            results = []
-            for i, partition in tqdm.auto.tqdm(enumerate(partitions), total=total):
+            last_modified_times = self._list_last_modified(
+                output_protocol=output_protocol,
+                output_path=output_path,
+                storage_options=storage_options,
+            )
+            jobs = []
+            skipped = {}
+            for i, partition in enumerate(partitions):
                 partition_path = _build_output_path(output_path, i, total, partition.start, partition.end)
                 if self._partition_needs_to_be_rewritten(
-                    output_protocol=output_protocol,
-                    output_path=partition_path,
-                    storage_options=storage_options,
+                    partition_path=partition_path,
                     partition=partition,
+                    last_modified_times=last_modified_times,
                 ):
-                    results.append(
-                        self.export_partition(
-                            conninfo=conninfo,
-                            output_protocol=output_protocol,
-                            output_path=partition_path,
-                            start_datetime=partition.start,
-                            end_datetime=partition.end,
-                            storage_options=storage_options,
-                            rewrite=rewrite
+                    jobs.append(
+                        (
+                            partition_path,
+                            dict(
+                                common,
+                                start_datetime=partition.start,
+                                end_datetime=partition.end,
+                            ),
                         )
-                )
+                    )
                 else:
                     logger.info(
                         "Partition %s already exists and was last updated at %s, skipping",
                         partition_path,
                         partition.last_updated,
                     )
-                    results.append(partition_path)
+                    skipped[i] = partition_path
+
+            exported = iter(self._export_partitions(jobs, max_workers, pool_type))
+            results = [
+                skipped[i] if i in skipped else next(exported)
+                for i in range(total)
+            ]
 
         return results
 
@@ -588,6 +668,8 @@ class StacGeoparquetTaskInput(PCBaseModel):
     storage_options_credential: str | None = None
     extra_skip: Set[str] | None = None
     collections: str | Set[str] | None = None
+    max_workers: int = 1
+    pool_type: str = "thread"
 
 
 class StacGeoparquetTaskOutput(PCBaseModel):
@@ -614,6 +696,8 @@ class StacGeoparquetTask(Task[StacGeoparquetTaskInput, StacGeoparquetTaskOutput]
             storage_options_credential=input.storage_options_credential,
             extra_skip=input.extra_skip,
             collections=input.collections,
+            max_workers=input.max_workers,
+            pool_type=input.pool_type,
         )
         return StacGeoparquetTaskOutput(n_failures=result)
 
@@ -713,6 +797,8 @@ def run(
     extra_skip: Set[str] | None = None,
     collections: str | Set[str] | None = None,
     configs: dict[str, CollectionConfig] | None = None,
+    max_workers: int = 1,
+    pool_type: str = "thread",
 ) -> int:
     if configs is None:
         configs = list_planetary_computer_collection_configs(
@@ -772,7 +858,9 @@ def run(
                 storage_options,
                 pgstac_partitions=recent_collection_updates,
                 skip_empty_partitions=True,
-                rewrite=True
+                rewrite=True,
+                max_workers=max_workers,
+                pool_type=pool_type,
             )
             t1 = time.monotonic()
             logger.info(f"Completed {config.collection_id} [{i}/{N}] in {t1-t0:.2f}s")
@@ -800,6 +888,18 @@ if __name__ == "__main__":
         required=False,
         help="The collection ID to export."
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=1,
+        help="The number of partitions to export in parallel."
+    )
+    parser.add_argument(
+        "--pool-type",
+        choices=POOL_TYPES,
+        default="thread",
+        help="Whether to export partitions in threads or processes."
+    )
     args = parser.parse_args()
     configs = list_planetary_computer_collection_configs(
         connection_info=os.environ["STAC_GEOPARQUET_CONNECTION_INFO"],
@@ -811,7 +911,12 @@ if __name__ == "__main__":
         extra_skip=SKIP,
         collections=args.collection,
     )
-    n_failures = run(collections=args.collection, configs=configs)
+    n_failures = run(
+        collections=args.collection,
+        configs=configs,
+        max_workers=args.max_workers,
+        pool_type=args.pool_type,
+    )
     if n_failures == 0:
         logger.info("Export completed successfully.")
     else:
@@ -1,13 +1,14 @@
 import logging
 import sys
 from functools import lru_cache
-from typing import Any, Optional, Union
+from importlib.metadata import EntryPoint
+from typing import Any, Dict, List, Optional, Union
 
 import click
 from rich import print as rprint
 
 from pctasks.cli.version import __version__
-from pctasks.core.cli import get_plugin_subcommands
+from pctasks.core.cli import get_plugin_entry_points, load_plugin_subcommand
 from pctasks.core.context import PCTasksCommandContext
 from pctasks.core.settings import SettingsError
 
@@ -51,6 +52,34 @@ def print_header() -> None:
 
 
 class PCTasksGroup(click.Group):
+    """Group of the subcommands registered as pctasks.commands entry points.
+
+    Subcommands are loaded when they are invoked or listed, so running
+    e.g. ``pctasks task run`` only imports the task plugin.
+    """
+
+    _entry_points: Optional[Dict[str, EntryPoint]] = None
+
+    def _get_entry_points(self) -> Dict[str, EntryPoint]:
+        if self._entry_points is None:
+            self._entry_points = get_plugin_entry_points(
+                PCTASKS_COMMAND_ENTRY_POINT_GROUP
+            )
+        return self._entry_points
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self._get_entry_points()))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        command = super().get_command(ctx, cmd_name)
+        if command is None:
+            entry_point = self._get_entry_points().get(cmd_name)
+            if entry_point:
+                command = load_plugin_subcommand(click.Command, entry_point)
+                if command is not None:
+                    self.add_command(command, cmd_name)
+        return command
+
     def format_help(self, ctx: Any, formatter: Any) -> Any:
         print_header()
         super().format_help(ctx, formatter)
@@ -130,12 +159,6 @@ def pctasks_cmd(
     setup_logging(logging_level)
 
 
-for subcommand in get_plugin_subcommands(
-    click.Command, PCTASKS_COMMAND_ENTRY_POINT_GROUP
-):
-    pctasks_cmd.add_command(subcommand)
-
-
 def cli() -> None:
     try:
         pctasks_cmd(prog_name="pctasks")
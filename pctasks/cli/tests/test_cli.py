@@ -1,6 +1,7 @@
+import click
 from click.testing import CliRunner
 
-from pctasks.cli.cli import pctasks_cmd
+from pctasks.cli.cli import PCTasksGroup, pctasks_cmd
 from pctasks.cli.version import __version__
 
 
@@ -13,3 +14,16 @@ def test_cli_version():
 def test_direct_invoke():
     result = pctasks_cmd.main(["--version"], standalone_mode=False)
     assert result == 0
+
+
+def test_subcommands_load_on_demand():
+    group = PCTasksGroup(name="test")
+    ctx = click.Context(group)
+
+    assert group.commands == {}
+    assert "task" in group.list_commands(ctx)
+
+    task_cmd = group.get_command(ctx, "task")
+    assert task_cmd is not None
+    assert list(group.commands) == ["task"]
+    assert group.get_command(ctx, "not-a-command") is None
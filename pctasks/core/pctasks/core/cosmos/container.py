@@ -1,7 +1,9 @@
+import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from itertools import groupby
 from typing import (
     Any,
     AsyncIterable,
@@ -20,7 +22,6 @@ from typing import (
     cast,
 )
 
-import orjson
 from azure.core.async_paging import AsyncItemPaged, AsyncPageIterator
 from azure.core.paging import ItemPaged, PageIterator
 from azure.cosmos import ContainerProxy
@@ -36,7 +37,7 @@ from pctasks.core.cosmos.database import (
 from pctasks.core.cosmos.page import Page
 from pctasks.core.cosmos.settings import CosmosDBSettings
 from pctasks.core.models.record import Record
-from pctasks.core.models.utils import tzutc_now
+from pctasks.core.models.utils import STORAGE_CONTEXT, tzutc_now
 from pctasks.core.utils import grouped
 from pctasks.core.utils.backoff import BackoffStrategy, with_backoff, with_backoff_async
 
@@ -44,6 +45,8 @@ T = TypeVar("T", bound=Record)
 
 logger = logging.getLogger(__name__)
 
+REQUEST_CHARGE_HEADER = "x-ms-request-charge"
+
 
 class ContainerOperation(Enum):
     PUT = "PUT"
@@ -62,6 +65,8 @@ def query_clean(s: str) -> str:
 
 
 class BaseCosmosDBContainer(Generic[T], ABC):
+    settings: CosmosDBSettings
+
     def __init__(
         self,
         name: Union[str, Callable[[CosmosDBSettings], str]],
@@ -75,13 +80,10 @@ class BaseCosmosDBContainer(Generic[T], ABC):
         triggers: Optional[Dict[ContainerOperation, Dict[TriggerType, str]]] = None,
         with_backoff_waits: Optional[List[float]] = None,
     ) -> None:
-        if not settings:
-            if db:
-                settings = db.settings
-            else:
-                settings = CosmosDBSettings.get()
         if not db:
             db = CosmosDBDatabase(settings)
+        # The database loads the settings if none were given
+        settings = settings or db.settings
         self.settings = settings
         self.db = db
         self.partition_key = partition_key
@@ -120,7 +122,9 @@ class BaseCosmosDBContainer(Generic[T], ABC):
 
     def item_from_model(self, model: T) -> Dict[str, Any]:
         """Transform a model into a cosmosdb item (dict)."""
-        result = orjson.loads(model.json())
+        result = model.model_dump(
+            mode="json", by_alias=True, exclude_none=True, context=STORAGE_CONTEXT
+        )
         if "id" not in result:
             result["id"] = model.get_id()
         return result
@@ -165,13 +169,34 @@ class BaseCosmosDBContainer(Generic[T], ABC):
 
     def _group_for_bulk_put(
         self, models: Iterable[T]
-    ) -> Iterable[Tuple[str, List[Dict[str, Any]]]]:
-        by_partition_key = groupby(models, key=self.get_partition_key)
-        for partition_key, partition_models in by_partition_key:
-            items = [self._prepare_put_item(model) for model in partition_models]
-            # Bulk put the items in groups of the max size
-            for item_group in grouped(items, self.settings.max_bulk_put_size):
-                yield partition_key, list(item_group)
+    ) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        # Bucket by partition key, as models may not be sorted by it
+        by_partition_key: Dict[str, List[Dict[str, Any]]] = {}
+        for model in models:
+            by_partition_key.setdefault(self.get_partition_key(model), []).append(
+                self._prepare_put_item(model)
+            )
+
+        # Bulk put the items in groups of the max size
+        return [
+            (partition_key, list(item_group))
+            for partition_key, items in by_partition_key.items()
+            for item_group in grouped(items, self.settings.max_bulk_put_size)
+        ]
+
+    def _report_bulk_put(
+        self,
+        groups: List[Tuple[str, List[Dict[str, Any]]]],
+        charges: List[float],
+        elapsed: float,
+    ) -> None:
+        total = sum(charges)
+        item_count = sum(len(items) for _, items in groups)
+        logger.info(
+            f"Bulk put {item_count} items to {self.name} in {len(groups)} calls "
+            f"in {elapsed:.2f}s: {total:.1f} RU "
+            f"({total / len(groups) if groups else 0:.1f} RU per call)"
+        )
 
     def _query_prep(
         self, query: str, parameters: Optional[Dict[str, Any]] = None
@@ -186,6 +211,17 @@ class BaseCosmosDBContainer(Generic[T], ABC):
         return query_clean(query), params
 
 
+def _request_charge_hook(charges: List[float]) -> Callable[[Any], None]:
+    """A raw response hook that records the request charge of each response."""
+
+    def _hook(response: Any) -> None:
+        charge = response.http_response.headers.get(REQUEST_CHARGE_HEADER)
+        if charge is not None:
+            charges.append(float(charge))
+
+    return _hook
+
+
 class CosmosDBContainer(BaseCosmosDBContainer[T], ABC):
     def __init__(
         self,
@@ -272,8 +308,12 @@ class CosmosDBContainer(BaseCosmosDBContainer[T], ABC):
             for model in models:
                 with_backoff(lambda: self.put(model))
         else:
-            for partition_key, item_group in self._group_for_bulk_put(models):
-                sp_name: str = stored_proc
+            sp_name: str = stored_proc
+            groups = self._group_for_bulk_put(models)
+
+            def _put_group(group: Tuple[str, List[Dict[str, Any]]]) -> float:
+                partition_key, item_group = group
+                charges: List[float] = []
                 with_backoff(
                     lambda: self._container_client.scripts.execute_stored_procedure(
                         sp_name,
@@ -282,10 +322,22 @@ class CosmosDBContainer(BaseCosmosDBContainer[T], ABC):
                         # for params. Ignoring this error:
                         # List item 0 has incompatible type "List[Dict[str, Any]]";
                         # expected "Dict[str, Any]"  [list-item]
-                        params=[list(item_group)],  # type: ignore[list-item]
+                        params=[item_group],  # type: ignore[list-item]
+                        raw_response_hook=_request_charge_hook(charges),
                     ),
                     strategy=self.backoff_strategy,
                 )
+                # Only the charge of the successful attempt
+                return charges[-1] if charges else 0.0
+
+            start = time.perf_counter()
+            concurrency = min(self.settings.bulk_put_concurrency, len(groups))
+            if concurrency > 1:
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    group_charges = list(pool.map(_put_group, groups))
+            else:
+                group_charges = [_put_group(group) for group in groups]
+            self._report_bulk_put(groups, group_charges, time.perf_counter() - start)
 
     def get(self, id: str, partition_key: str) -> Optional[T]:
         try:
@@ -471,25 +523,46 @@ class AsyncCosmosDBContainer(BaseCosmosDBContainer[T], ABC):
                 f"No bulk put stored procedure for {self.name} "
                 f"and model {type(models[0])}. Falling back to individual puts."
             )
-            for model in models:
-                await self.put(model)
+            # Each put is independent, so run them concurrently.
+            semaphore = asyncio.Semaphore(self.settings.bulk_put_concurrency)
+
+            async def _put(model: T) -> None:
+                async with semaphore:
+                    await self.put(model)
+
+            await asyncio.gather(*(_put(model) for model in models))
         else:
             sp_name: str = stored_proc
-            for partition_key, item_group in self._group_for_bulk_put(models):
+            groups = self._group_for_bulk_put(models)
+            semaphore = asyncio.Semaphore(self.settings.bulk_put_concurrency)
+
+            async def _put_group(group: Tuple[str, List[Dict[str, Any]]]) -> float:
+                partition_key, item_group = group
+                charges: List[float] = []
 
                 async def _sp() -> Dict[str, Any]:
                     return (
                         await self._container_client.scripts.execute_stored_procedure(
                             sp_name,
                             partition_key=partition_key,
-                            params=[list(item_group)],
+                            params=[item_group],
+                            raw_response_hook=_request_charge_hook(charges),
                         )
                     )
 
-                await with_backoff_async(
-                    _sp,
-                    strategy=self.backoff_strategy,
-                )
+                async with semaphore:
+                    await with_backoff_async(
+                        _sp,
+                        strategy=self.backoff_strategy,
+                    )
+                # Only the charge of the successful attempt
+                return charges[-1] if charges else 0.0
+
+            start = time.perf_counter()
+            group_charges = await asyncio.gather(*(_put_group(g) for g in groups))
+            self._report_bulk_put(
+                groups, list(group_charges), time.perf_counter() - start
+            )
 
     async def get(self, id: str, partition_key: str) -> Optional[T]:
         try:
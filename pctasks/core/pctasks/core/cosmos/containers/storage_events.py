@@ -4,6 +4,7 @@ from pydantic import BaseModel
 
 from pctasks.core._compat import TypeAlias
 from pctasks.core.cosmos.container import (
+    AsyncCosmosDBContainer,
     ContainerOperation,
     CosmosDBContainer,
     CosmosDBDatabase,
@@ -40,3 +41,24 @@ class StorageEventsContainer(CosmosDBContainer[T]):
 
     def get_partition_key(self, model: T) -> str:
         return model.id
+
+
+class AsyncStorageEventsContainer(AsyncCosmosDBContainer[T]):
+    def __init__(
+        self,
+        model_type: Type[T],
+        db: Optional[CosmosDBDatabase] = None,
+        settings: Optional[CosmosDBSettings] = None,
+    ) -> None:
+        super().__init__(
+            lambda settings: settings.get_storage_events_container_name(),
+            PARTITION_KEY,
+            model_type=model_type,
+            db=db,
+            settings=settings,
+            stored_procedures=STORED_PROCEDURES,
+            triggers=TRIGGERS,
+        )
+
+    def get_partition_key(self, model: T) -> str:
+        return model.id
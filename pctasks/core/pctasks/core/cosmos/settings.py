@@ -50,6 +50,8 @@ class CosmosDBSettings(PCTasksSettings):
     process_item_errors_container_name: str = DEFAULT_PROCESS_ITEM_ERRORS_CONTAINER_NAME
 
     max_bulk_put_size: int = 250
+    # Maximum number of concurrent requests issued by a single bulk_put
+    bulk_put_concurrency: int = 10
 
     def get_workflows_container_name(self) -> str:
         return f"{self.workflows_container_name}{self.test_container_suffix}"
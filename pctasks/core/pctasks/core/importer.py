@@ -8,12 +8,17 @@ Import machinery for loading code from Azure Blob Storage.
 # For background, checkout out Recipe 10.11 in the Python Cookbook (3rd edition)
 from __future__ import annotations
 
+import hashlib
 import io
 import logging
+import os
 import pathlib
+import shutil
 import site
 import subprocess
 import sys
+import tempfile
+import time
 import zipfile
 from tempfile import TemporaryDirectory
 from typing import List, Optional, Tuple, Union
@@ -23,11 +28,81 @@ from pctasks.core.storage import Storage
 logger = logging.getLogger(__name__)
 
 
+def _cache_key(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:32]
+
+
+def _file_md5(path: Union[str, pathlib.Path]) -> str:
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+def _get_etag(file_path: str, storage: Storage) -> Optional[str]:
+    try:
+        return storage.get_file_info(file_path).etag
+    except FileNotFoundError:
+        raise
+    except Exception:
+        logger.warning("Could not read the etag of %s", file_path, exc_info=True)
+        return None
+
+
+def _publish(tmp_path: pathlib.Path, cache_path: pathlib.Path) -> pathlib.Path:
+    """Atomically move a populated temporary directory into the cache.
+
+    If another process populated the same cache entry first, the temporary
+    directory is discarded in favor of the existing entry.
+    """
+    try:
+        os.rename(tmp_path, cache_path)
+    except OSError:
+        if not cache_path.exists():
+            raise
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return cache_path
+
+
+def _prepend_sys_path(path: Union[str, pathlib.Path]) -> None:
+    resolved = str(pathlib.Path(path).resolve())
+    if resolved not in sys.path:
+        sys.path = [resolved] + sys.path
+
+
+def _pip_install(
+    local_path: str, pip_options: List[str], requirements_path: str
+) -> None:
+    logger.debug("Pip installing from %s", requirements_path)
+    cmd = [
+        sys.executable,
+        "-m",
+        "pip",
+        "install",
+        "-r",
+        local_path,
+    ] + pip_options
+
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    stdout, stderr = proc.communicate()
+    returncode = proc.wait()
+    if returncode:
+        logger.error("Pip install failed with %s", stderr.decode().strip())
+        raise subprocess.CalledProcessError(returncode, cmd, stdout, stderr)
+    logger.debug("Pip install output: %s", stdout.decode().strip())
+
+
 def ensure_requirements(
     requirements_path: str,
     storage: Storage,
     pip_options: Optional[List[str]] = None,
     target_dir: Optional[str] = None,
+    cache_dir: Optional[str] = None,
 ) -> None:
     """
     Ensure that the requirements at ``requirements_path`` are available.
@@ -38,44 +113,108 @@ def ensure_requirements(
         Path to a pip requirements file
     pip_options: list[str]
         Optional arguments to pass to the command ``pip install -r``.
+    cache_dir: str, optional
+        A node-local directory for caching installed environments. When set,
+        requirements are installed into an environment under this directory
+        keyed by the requirements file's etag (or content hash), the pip
+        options and the Python version. Later calls with the same key skip
+        the download and the ``pip install``. ``target_dir`` is not used
+        when ``cache_dir`` is set.
     """
+    pip_options = list(pip_options or [])
+    if "-t" in pip_options or "--target" in pip_options:
+        if target_dir or cache_dir:
+            raise ValueError(
+                "Cannot specify target directory in pip options; "
+                f"target directory already specified as {target_dir or cache_dir}"
+            )
+
+    if cache_dir:
+        _ensure_cached_requirements(
+            requirements_path, storage, pip_options, pathlib.Path(cache_dir)
+        )
+        return
+
     with TemporaryDirectory() as tmp_dir:
         local_path = str(pathlib.Path(tmp_dir) / pathlib.Path(requirements_path).name)
         storage.download_file(requirements_path, local_path)
-        pip_options = pip_options or []
         if target_dir:
-            if "-t" in pip_options or "--target" in pip_options:
-                raise ValueError(
-                    "Cannot specify target directory in pip options; "
-                    f"target directory already specified as {target_dir}"
-                )
             target_dir_path = pathlib.Path(target_dir)
             target_dir_path.mkdir(parents=True, exist_ok=True)
             resolved_dir = str(target_dir_path.resolve())
             pip_options.extend(["-t", resolved_dir])
-            if resolved_dir not in sys.path:
-                sys.path = [resolved_dir] + sys.path
-        logger.debug("Pip installing from %s", requirements_path)
-        cmd = [
-            sys.executable,
-            "-m",
-            "pip",
-            "install",
-            "-r",
-            local_path,
-        ] + pip_options
-
-        proc = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            _prepend_sys_path(resolved_dir)
+        _pip_install(local_path, pip_options, requirements_path)
+
+
+def _ensure_cached_requirements(
+    requirements_path: str,
+    storage: Storage,
+    pip_options: List[str],
+    cache_dir: pathlib.Path,
+) -> pathlib.Path:
+    start = time.perf_counter()
+    envs_dir = cache_dir / "requirements"
+    envs_dir.mkdir(parents=True, exist_ok=True)
+
+    def env_key(content_key: str) -> str:
+        return _cache_key(
+            storage.get_uri(requirements_path),
+            content_key,
+            " ".join(pip_options),
+            sys.version,
         )
-        stdout, stderr = proc.communicate()
-        returncode = proc.wait()
-        if returncode:
-            logger.error("Pip install failed with %s", stderr.decode().strip())
-            raise subprocess.CalledProcessError(returncode, cmd, stdout, stderr)
-        logger.debug("Pip install output: %s", stdout.decode().strip())
+
+    etag = _get_etag(requirements_path, storage)
+    if etag:
+        env_path = envs_dir / env_key(etag)
+        if env_path.exists():
+            _prepend_sys_path(env_path)
+            logger.info(
+                "Requirements cache hit for %s (%s) in %.2fs",
+                requirements_path,
+                env_path.name,
+                time.perf_counter() - start,
+            )
+            return env_path
+
+    tmp_env_path = pathlib.Path(tempfile.mkdtemp(dir=envs_dir, prefix=".tmp-"))
+    try:
+        with TemporaryDirectory() as tmp_dir:
+            local_path = str(
+                pathlib.Path(tmp_dir) / pathlib.Path(requirements_path).name
+            )
+            storage.download_file(requirements_path, local_path)
+            if not etag:
+                env_path = envs_dir / env_key(_file_md5(local_path))
+                if env_path.exists():
+                    shutil.rmtree(tmp_env_path, ignore_errors=True)
+                    _prepend_sys_path(env_path)
+                    logger.info(
+                        "Requirements cache hit for %s (%s) in %.2fs",
+                        requirements_path,
+                        env_path.name,
+                        time.perf_counter() - start,
+                    )
+                    return env_path
+            _pip_install(
+                local_path,
+                pip_options + ["-t", str(tmp_env_path.resolve())],
+                requirements_path,
+            )
+    except Exception:
+        shutil.rmtree(tmp_env_path, ignore_errors=True)
+        raise
+
+    env_path = _publish(tmp_env_path, env_path)
+    _prepend_sys_path(env_path)
+    logger.info(
+        "Requirements cache miss for %s (%s); installed in %.2fs",
+        requirements_path,
+        env_path.name,
+        time.perf_counter() - start,
+    )
+    return env_path
 
 
 def ensure_code(
@@ -83,6 +222,7 @@ def ensure_code(
     storage: Storage,
     is_package: bool | None = None,
     target_dir: Optional[str] = None,
+    cache_dir: Optional[str] = None,
 ) -> pathlib.Path:
     """
     Ensure that a module or zipped package at a URI ``file_path`` is importable.
@@ -99,6 +239,11 @@ def ensure_code(
 
         When ``is_package`` is true, the path is appended to ``sys.path``, and
         submodules can be imported from that package.
+    cache_dir: str, optional
+        A node-local directory for caching downloaded code. When set, the file
+        is stored under this directory keyed by its etag (or content hash),
+        and later calls with the same key skip the download. ``target_dir``
+        is not used when ``cache_dir`` is set.
     Returns
     -------
     pathlib.Path
@@ -111,22 +256,25 @@ def ensure_code(
     for more on creating Zip files for Python packages.
 
     """
-    if target_dir:
-        target_dir_path = pathlib.Path(target_dir)
-        target_dir_path.mkdir(parents=True, exist_ok=True)
-        resolved_dir = str(target_dir_path.resolve())
-        if resolved_dir not in sys.path:
-            sys.path = [resolved_dir] + sys.path
-        output_path = pathlib.Path(target_dir) / pathlib.Path(file_path).name
+    if cache_dir:
+        output_path = _ensure_cached_code(file_path, storage, pathlib.Path(cache_dir))
+        # Make single modules importable from their cache entry.
+        _prepend_sys_path(output_path.parent)
     else:
-        output_path = (
-            pathlib.Path(site.getsitepackages()[0]) / pathlib.Path(file_path).name
-        )
+        if target_dir:
+            target_dir_path = pathlib.Path(target_dir)
+            target_dir_path.mkdir(parents=True, exist_ok=True)
+            _prepend_sys_path(target_dir_path)
+            output_path = pathlib.Path(target_dir) / pathlib.Path(file_path).name
+        else:
+            output_path = (
+                pathlib.Path(site.getsitepackages()[0]) / pathlib.Path(file_path).name
+            )
 
-    if output_path.exists():
-        logger.debug("Module destination %s already exists", output_path)
+        if output_path.exists():
+            logger.debug("Module destination %s already exists", output_path)
 
-    storage.download_file(file_path, str(output_path))
+        storage.download_file(file_path, str(output_path))
 
     if is_package is None:
         is_package = zipfile.is_zipfile(output_path)
@@ -137,6 +285,46 @@ def ensure_code(
     return pathlib.Path(output_path)
 
 
+def _ensure_cached_code(
+    file_path: str, storage: Storage, cache_dir: pathlib.Path
+) -> pathlib.Path:
+    start = time.perf_counter()
+    code_dir = cache_dir / "code"
+    code_dir.mkdir(parents=True, exist_ok=True)
+    name = pathlib.Path(file_path).name
+    uri = storage.get_uri(file_path)
+
+    etag = _get_etag(file_path, storage)
+    if etag:
+        entry_path = code_dir / _cache_key(uri, etag)
+        if (entry_path / name).exists():
+            logger.info(
+                "Code cache hit for %s (%s) in %.2fs",
+                file_path,
+                entry_path.name,
+                time.perf_counter() - start,
+            )
+            return entry_path / name
+
+    tmp_entry_path = pathlib.Path(tempfile.mkdtemp(dir=code_dir, prefix=".tmp-"))
+    try:
+        storage.download_file(file_path, str(tmp_entry_path / name))
+    except Exception:
+        shutil.rmtree(tmp_entry_path, ignore_errors=True)
+        raise
+
+    if not etag:
+        entry_path = code_dir / _cache_key(uri, _file_md5(tmp_entry_path / name))
+    entry_path = _publish(tmp_entry_path, entry_path)
+    logger.info(
+        "Code cache miss for %s (%s); downloaded in %.2fs",
+        file_path,
+        entry_path.name,
+        time.perf_counter() - start,
+    )
+    return entry_path / name
+
+
 def write_code(
     file_path: pathlib.Path,
 ) -> Tuple[str, Union[io.BufferedReader, io.BytesIO]]:
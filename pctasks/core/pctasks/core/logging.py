@@ -7,8 +7,6 @@ from enum import Enum
 from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
-from opencensus.ext.azure.log_exporter import AzureEventHandler, AzureLogHandler
-
 from pctasks.core.constants import ENV_VAR_TASK_APPINSIGHTS_KEY
 from pctasks.core.models.base import RunRecordId
 from pctasks.core.models.task import TaskRunConfig
@@ -43,6 +41,9 @@ def _get_az_loggers(
     )
 
     if instrumentation_key:
+        # opencensus is slow to import; only import it when it's configured
+        from opencensus.ext.azure.log_exporter import AzureEventHandler, AzureLogHandler
+
         # Set up traces logging.
         traces_logger.setLevel(logging.INFO)
         traces_handler = AzureLogHandler(
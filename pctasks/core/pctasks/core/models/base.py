@@ -107,7 +107,11 @@ class ForeachConfig(PCBaseModel):
     items: string or list of objects
     flatten: bool, default True
         Whether to flatten lists nested objects to a single flat list.
+    batch_size: int, optional
+        If set, group the items into lists of at most this many items,
+        creating one job partition per list rather than per item.
     """
 
     items: Union[str, List[Any]]
     flatten: bool = True
+    batch_size: Optional[int] = None
@@ -1,10 +1,10 @@
-from datetime import datetime
 from typing import Any, Dict, Optional
 
 import pystac
 from pydantic import Field, field_validator
 
 from pctasks.core.models.record import Record
+from pctasks.core.models.utils import RecordDatetime
 from pctasks.core.utils import StrEnum
 
 
@@ -82,8 +82,8 @@ class ItemUpdatedRecord(ItemRecord):
     delete: bool = False
     """True if the update was to delete this Item version"""
 
-    storage_event_time: Optional[datetime] = None
-    message_inserted_time: Optional[datetime] = None
+    storage_event_time: Optional[RecordDatetime] = None
+    message_inserted_time: Optional[RecordDatetime] = None
     version: Optional[str]
 
     @field_validator("version")
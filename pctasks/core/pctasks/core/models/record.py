@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
-from datetime import datetime
 from typing import Any, Dict, Optional
 
 from pctasks.core.constants import RECORD_SCHEMA_VERSION
 from pctasks.core.models.base import PCBaseModel
+from pctasks.core.models.utils import RecordDatetime
 
 TYPE_FIELD_NAME = "type"
 
@@ -14,8 +14,8 @@ class Record(PCBaseModel, ABC):
 
     # These fields are updated by the comsodb
     # BaseCosmosDBContainer logic during puts.
-    created: Optional[datetime] = None
-    updated: Optional[datetime] = None
+    created: Optional[RecordDatetime] = None
+    updated: Optional[RecordDatetime] = None
 
     deleted: bool = False
     """Whether this record is deleted or not.
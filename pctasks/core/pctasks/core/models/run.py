@@ -1,4 +1,3 @@
-from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from pydantic import Field, model_validator
@@ -8,7 +7,7 @@ from pctasks.core.models.base import PCBaseModel
 from pctasks.core.models.event import CloudEvent
 from pctasks.core.models.record import Record
 from pctasks.core.models.task import TaskDefinition
-from pctasks.core.models.utils import tzutc_now
+from pctasks.core.models.utils import RecordDatetime, tzutc_now
 from pctasks.core.models.workflow import (
     JobDefinition,
     WorkflowRunStatus,
@@ -82,7 +81,7 @@ class JobRunStatus(StrEnum):
 
 class StatusHistoryEntry(PCBaseModel):
     status: str
-    timestamp: datetime
+    timestamp: RecordDatetime
 
 
 class RunRecord(Record):
@@ -1,6 +1,29 @@
 from datetime import datetime
+from typing import Any, Dict
 
 from dateutil.tz import tzutc
+from pydantic import SerializationInfo, SerializerFunctionWrapHandler, WrapSerializer
+from typing_extensions import Annotated
+
+STORAGE_CONTEXT: Dict[str, Any] = {"storage": True}
+"""Serialization context for model dumps that are stored as records."""
+
+
+def _serialize_record_datetime(
+    value: datetime, handler: SerializerFunctionWrapHandler, info: SerializationInfo
+) -> Any:
+    if info.mode_is_json() and info.context and info.context.get("storage"):
+        return str(value)
+    return handler(value)
+
+
+RecordDatetime = Annotated[datetime, WrapSerializer(_serialize_record_datetime)]
+"""A datetime that is stored in its str() format.
+
+Dumping in JSON mode with STORAGE_CONTEXT writes the format of PCBaseModel.json,
+e.g. "2024-01-02 03:04:05.678901+00:00", rather than pydantic's ISO 8601
+format. Stored records are sorted by these string values.
+"""
 
 
 def tzutc_now() -> datetime:
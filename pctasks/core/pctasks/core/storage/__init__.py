@@ -1,7 +1,8 @@
 import os
-from typing import TYPE_CHECKING, Optional, Tuple
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Optional, Tuple, cast
 
-from cachetools import Cache, LRUCache, cachedmethod
+from cachetools import Cache, LRUCache
 
 from pctasks.core.storage import blob, local
 from pctasks.core.storage.base import Storage
@@ -95,8 +96,14 @@ def read_text(
 class StorageFactory:
     """Factory that produces Storage objects.
 
-    Fetches cached storage objects for folder and file URIs.
-    Uses Tokens to enable SAS token IO from blob storage.
+    Fetches cached storage objects for folder and file URIs. Blob storage
+    is cached per storage account, container and token, so storage for the
+    folders and files of a container share a client, credentials and
+    generated SAS tokens. Uses Tokens to enable SAS token IO from blob storage.
+
+    Factories can be pickled, e.g. to pass to a process pool. Clients are
+    recreated in the receiving process; generated SAS tokens that are still
+    valid are reused.
     """
 
     tokens: Optional[Tokens]
@@ -108,26 +115,97 @@ class StorageFactory:
     _cache: Cache
 
     def __init__(
-        self, tokens: Optional[Tokens] = None, account_url: Optional[str] = None
+        self,
+        tokens: Optional[Tokens] = None,
+        account_url: Optional[str] = None,
+        maxsize: int = 100,
     ) -> None:
-        self._cache = LRUCache(maxsize=100)
         self.tokens = tokens
         self.account_url = account_url
+        self.maxsize = maxsize
+        self._init_cache(blob.ContainerSasCache())
+
+    def _init_cache(self, sas_cache: "blob.ContainerSasCache") -> None:
+        self._cache = LRUCache(maxsize=self.maxsize)
+        self._lock = Lock()
+        self._sas_cache = sas_cache
+        self._hits = 0
+        self._misses = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "account_url": self.account_url,
+            "maxsize": self.maxsize,
+            "sas_cache": self._sas_cache,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.tokens = state["tokens"]
+        self.account_url = state["account_url"]
+        self.maxsize = state["maxsize"]
+        self._init_cache(state["sas_cache"])
 
     def __repr__(self) -> str:
         return (
             f"<StorageFactory(account_url={self.account_url}) "
-            f"with {len(self._cache)} tokens>"
+            f"with {len(self._cache)} cached storages>"
+        )
+
+    def _get_cached(self, key: Hashable, create: Callable[[], Storage]) -> Storage:
+        with self._lock:
+            storage = self._cache.get(key)
+            if storage is not None:
+                self._hits += 1
+                return storage
+            self._misses += 1
+            storage = create()
+            self._cache[key] = storage
+            return storage
+
+    def _get_blob_storage(self, blob_uri: blob.BlobUri) -> blob.BlobStorage:
+        """Gets blob storage for the container of the uri, without a prefix."""
+        account = blob_uri.storage_account_name
+        container = blob_uri.container_name
+        token = self.tokens.get_token(account, container, None) if self.tokens else None
+
+        storage = self._get_cached(
+            (account, container, token),
+            lambda: blob.BlobStorage(
+                storage_account_name=account,
+                container_name=container,
+                sas_token=token,
+                account_url=self.account_url,
+                sas_cache=self._sas_cache,
+            ),
         )
+        return cast(blob.BlobStorage, storage)
 
-    @cachedmethod(lambda self: self._cache)
     def get_storage(self, uri: str) -> Storage:
         """Gets storage that represents the folder at the uri."""
-        if uri in self._cache:
-            return self._cache[uri]
-        storage = get_storage(uri, tokens=self.tokens, account_url=self.account_url)
-        self._cache[uri] = storage
-        return storage
+        if not blob.BlobUri.matches(uri):
+            return self._get_cached(("local", uri), lambda: local.LocalStorage(uri))
+
+        blob_uri = blob.BlobUri(uri)
+        storage = self._get_blob_storage(blob_uri)
+        if not blob_uri.blob_name:
+            return storage
+        if self.tokens:
+            token = self.tokens.get_token_from_uri(blob_uri)
+            if token != storage.sas_token:
+                # A token specific to this prefix
+                return self._get_cached(
+                    uri,
+                    lambda: blob.BlobStorage(
+                        storage_account_name=blob_uri.storage_account_name,
+                        container_name=blob_uri.container_name,
+                        prefix=blob_uri.blob_name,
+                        sas_token=token,
+                        account_url=self.account_url,
+                        sas_cache=self._sas_cache,
+                    ),
+                )
+        return storage.with_prefix(blob_uri.blob_name)
 
     def get_storage_for_file(self, file_uri: str) -> Tuple[Storage, str]:
         """
@@ -141,7 +219,7 @@ class StorageFactory:
         """
         if blob.BlobUri.matches(file_uri):
             blob_uri = blob.BlobUri(file_uri)
-            storage = self.get_storage(str(blob_uri.base_uri))
+            storage = self._get_blob_storage(blob_uri)
             path = blob_uri.blob_name or ""
             return (storage, path)
         else:
@@ -149,9 +227,21 @@ class StorageFactory:
             path = os.path.basename(file_uri)
             return (self.get_storage(parent), path)
 
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """Storage cache hits and misses, and generated SAS token cache counts."""
+        with self._lock:
+            return {
+                "storage_hits": self._hits,
+                "storage_misses": self._misses,
+                "cached_storages": len(self._cache),
+                **self._sas_cache.metrics,
+            }
+
     def clear_cache(self) -> None:
         """Clears the cache."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
 
 
 __all__ = ["Storage", "StorageFactory", "read_text"]
@@ -16,6 +16,9 @@ class StorageFileInfo:
     size: int
     """Size in bytes"""
 
+    etag: Optional[str] = None
+    """The entity tag of the file, if the storage provides one"""
+
 
 class Storage(ABC):
     """Abstraction over storage.
@@ -1,14 +1,18 @@
 import concurrent.futures
 import contextlib
+import copy
 import logging
 import multiprocessing
 import os
 import re
 import sys
+import threading
+from dataclasses import dataclass
 from datetime import datetime as Datetime
 from datetime import timedelta, timezone
 from typing import (
     Any,
+    Callable,
     Dict,
     Generator,
     Iterable,
@@ -144,6 +148,78 @@ class BlobUri:
             return False
 
 
+@dataclass(frozen=True)
+class ContainerSas:
+    """A generated container SAS token and its (UTC) expiry."""
+
+    token: str
+    expiry: Datetime
+
+
+class ContainerSasCache:
+    """Cache of generated container SAS tokens.
+
+    Tokens are keyed by storage account, container and permissions, and
+    are regenerated once they are within ``refresh_margin`` of expiring.
+    The cache can be pickled, e.g. to pass to a process pool; the
+    receiving process reuses the tokens that are still valid.
+    """
+
+    def __init__(self, refresh_margin: timedelta = timedelta(hours=1)) -> None:
+        self.refresh_margin = refresh_margin
+        self._tokens: Dict[Tuple[str, str, str], ContainerSas] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get(
+        self,
+        storage_account_name: str,
+        container_name: str,
+        permission: str,
+        generate: Callable[[], ContainerSas],
+    ) -> str:
+        key = (storage_account_name, container_name, permission)
+        with self._lock:
+            sas = self._tokens.get(key)
+            if sas and sas.expiry - Datetime.utcnow() > self.refresh_margin:
+                self.hits += 1
+                return sas.token
+            if sas:
+                self.refreshes += 1
+            else:
+                self.misses += 1
+
+        sas = generate()
+        with self._lock:
+            self._tokens[key] = sas
+        return sas.token
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "sas_hits": self.hits,
+            "sas_misses": self.misses,
+            "sas_refreshes": self.refreshes,
+        }
+
+    def __getstate__(self) -> Dict[str, Any]:
+        now = Datetime.utcnow()
+        return {
+            "refresh_margin": self.refresh_margin,
+            "tokens": {
+                key: sas
+                for key, sas in self._tokens.items()
+                if sas.expiry - now > self.refresh_margin
+            },
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(refresh_margin=state["refresh_margin"])  # type: ignore[misc]
+        self._tokens.update(state["tokens"])
+
+
 class ContainerClientWrapper:
     """Wrapper class that ensures closing of clients"""
 
@@ -182,6 +258,8 @@ class BlobStorage(Storage):
             AZURE_TENANT_ID are set.
         * account_url: Optional account URL. If not supplied, uses
             the default Azure blob URL for a storage account.
+        * sas_cache: Optional cache of generated container SAS tokens,
+            which can be shared between BlobStorage instances.
 
     Note:
 
@@ -204,8 +282,10 @@ class BlobStorage(Storage):
         sas_token: Optional[str] = None,
         client_secret_credentials: Optional[ClientSecretCredentials] = None,
         account_url: Optional[str] = None,
+        sas_cache: Optional[ContainerSasCache] = None,
     ) -> None:
         self.sas_token = sas_token
+        self._sas_cache = sas_cache or ContainerSasCache()
 
         # If this is the Azurite storage account, set
         # the account_url appropriately, and use
@@ -311,18 +391,23 @@ class BlobStorage(Storage):
         else:
             return os.path.join(container_uri, self.prefix)
 
+    def with_prefix(self: T, prefix: Optional[str]) -> T:
+        """Returns storage for a prefix of this storage's container.
+
+        The returned storage shares this storage's client, credentials and
+        SAS token cache.
+        """
+        self._get_client()
+        storage = copy.copy(self)
+        storage.prefix = prefix.strip("/") if prefix is not None else prefix
+        return storage
+
     def get_substorage(self, path: str) -> "Storage":
         if self.prefix is None:
             subprefix = path
         else:
             subprefix = os.path.join(self.prefix, path)
-        return BlobStorage(
-            storage_account_name=self.storage_account_name,
-            container_name=self.container_name,
-            prefix=subprefix,
-            sas_token=self.sas_token,
-            account_url=self.account_url,
-        )
+        return self.with_prefix(subprefix)
 
     def get_url(self, file_path: str) -> str:
         return f"{self.account_url}/{self.container_name}/{self._add_prefix(file_path)}"
@@ -345,7 +430,22 @@ class BlobStorage(Storage):
 
         This uses the storage instance's BlobServiceClient (and its
         attached credentials) to generate a container-level SAS token.
+        Tokens are cached until shortly before they expire.
         """
+        permission = ContainerSasPermissions(
+            read=read,
+            write=write,
+            delete=delete,
+            list=list,
+        )
+        return self._sas_cache.get(
+            self.storage_account_name,
+            self.container_name,
+            str(permission),
+            lambda: self._new_container_sas(permission),
+        )
+
+    def _new_container_sas(self, permission: ContainerSasPermissions) -> ContainerSas:
         logger.info(f"_generate_container_sas for {self}")
 
         start = Datetime.utcnow() - timedelta(hours=10)
@@ -353,12 +453,6 @@ class BlobStorage(Storage):
         # SAS token having too long of a duration.
         # https://github.com/microsoft/planetary-computer-tasks/pull/291#issuecomment-2135599782
         expiry = start + timedelta(hours=(24 * 7) - 2)
-        permission = ContainerSasPermissions(
-            read=read,
-            write=write,
-            delete=delete,
-            list=list,
-        )
         key = self._get_client()._account_client.get_user_delegation_key(
             key_start_time=start, key_expiry_time=expiry
         )
@@ -370,7 +464,7 @@ class BlobStorage(Storage):
             start=start,
             expiry=expiry,
         )
-        return sas_token
+        return ContainerSas(token=sas_token, expiry=expiry)
 
     def get_authenticated_url(
         self,
@@ -412,7 +506,7 @@ class BlobStorage(Storage):
                     props = with_backoff(lambda: blob.get_blob_properties())
                 except azure.core.exceptions.ResourceNotFoundError:
                     raise FileNotFoundError(f"File {file_path} not found in {self}")
-                return StorageFileInfo(size=cast(int, props.size))
+                return StorageFileInfo(size=cast(int, props.size), etag=props.etag)
 
     def file_exists(self, file_path: str) -> bool:
         client = self._get_client()
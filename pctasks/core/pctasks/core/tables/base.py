@@ -1,11 +1,15 @@
 import json
+import logging
 import unicodedata
 from base64 import b64decode, b64encode
 from typing import (
     Any,
+    AsyncIterator,
     Callable,
     Dict,
     Generic,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Tuple,
@@ -14,21 +18,33 @@ from typing import (
     Union,
 )
 
+import azure.identity.aio
 from azure.core.credentials import AzureNamedKeyCredential, AzureSasCredential
 from azure.core.exceptions import ResourceNotFoundError
 from azure.data.tables import TableClient, TableEntity, TableServiceClient
+from azure.data.tables.aio import TableClient as AsyncTableClient
+from azure.data.tables.aio import TableServiceClient as AsyncTableServiceClient
 from azure.identity import DefaultAzureCredential
 from pydantic.main import BaseModel
 
 from pctasks.core.models.config import TableSasConfig
 from pctasks.core.utils.credential import get_credential
 
+logger = logging.getLogger(__name__)
+
 T = TypeVar("T", bound="TableService")
+AT = TypeVar("AT", bound="AsyncTableService")
 M = TypeVar("M", bound=BaseModel)
 V = TypeVar("V")
 
 PROHIBITED_TABLE_KEY_CHARS = ["/", "\\", "#", "?"]
 
+# Maximum number of operations in a single table transaction
+MAX_TRANSACTION_SIZE = 100
+
+# An operation name ("create", "upsert", "update" or "delete") and entity
+TableOperation = Tuple[str, Dict[str, Any]]
+
 
 class TableError(Exception):
     pass
@@ -55,6 +71,24 @@ def decode_dict(s: str) -> Dict[str, Any]:
     return json.loads(b64decode(s.encode("utf-8")).decode("utf-8"))
 
 
+def group_transactions(
+    operations: Iterable[TableOperation],
+) -> List[List[TableOperation]]:
+    """Group operations into transactions.
+
+    Transactions must only contain entities of a single partition, and at
+    most MAX_TRANSACTION_SIZE operations.
+    """
+    by_partition_key: Dict[str, List[TableOperation]] = {}
+    for operation in operations:
+        by_partition_key.setdefault(operation[1]["PartitionKey"], []).append(operation)
+    return [
+        partition_operations[i : i + MAX_TRANSACTION_SIZE]
+        for partition_operations in by_partition_key.values()
+        for i in range(0, len(partition_operations), MAX_TRANSACTION_SIZE)
+    ]
+
+
 def validate_table_key(table_key: str) -> None:
     valid = True
     for char in PROHIBITED_TABLE_KEY_CHARS:
@@ -164,6 +198,18 @@ class TableService:
             table_name=config.table_name,
         )
 
+    def submit_transactions(self, operations: Iterable[TableOperation]) -> int:
+        """Submit operations as transactions per partition key.
+
+        Returns the number of transactions submitted.
+        """
+        self._ensure_table_client()
+        assert self._table_client
+        transactions = group_transactions(operations)
+        for transaction in transactions:
+            self._table_client.submit_transaction(transaction)
+        return len(transactions)
+
 
 class ValueTableService(Generic[V], TableService):
     _type: Type[V]
@@ -272,6 +318,24 @@ class StrTableService(TableService):
             {"PartitionKey": partition_key, "RowKey": row_key, **values}
         )
 
+    def upsert_many(self, entries: Iterable[Tuple[str, str, Dict[str, str]]]) -> int:
+        """Upsert (partition key, row key, values) entries in transactions.
+
+        Returns the number of transactions submitted.
+        """
+
+        def _entity(
+            partition_key: str, row_key: str, values: Dict[str, str]
+        ) -> Dict[str, Any]:
+            self._validate_values(values)
+            validate_table_key(partition_key)
+            validate_table_key(row_key)
+            return {"PartitionKey": partition_key, "RowKey": row_key, **values}
+
+        return self.submit_transactions(
+            ("upsert", _entity(*entry)) for entry in entries
+        )
+
     def get(
         self, partition_key: str, row_key: str
     ) -> Optional[Dict[str, Optional[str]]]:
@@ -290,64 +354,64 @@ class StrTableService(TableService):
             return None
 
 
+def model_entity(partition_key: str, row_key: str, model: BaseModel) -> Dict[str, Any]:
+    validate_table_key(partition_key)
+    validate_table_key(row_key)
+    return {
+        "PartitionKey": partition_key,
+        "RowKey": row_key,
+        "Data": encode_model(model),
+    }
+
+
+def model_from_entity(model_type: Type[M], entity: TableEntity) -> M:
+    data: Any = entity.get("Data")
+    if not data:
+        partition_key = entity.get("PartitionKey")
+        row_key = entity.get("RowKey")
+        raise TableError(
+            "Data column expected but not found. "
+            f"partition_key={partition_key} row_key={row_key}"
+        )
+    if not isinstance(data, str):
+        partition_key = entity.get("PartitionKey")
+        row_key = entity.get("RowKey")
+        raise TableError(
+            "Data column must be a string. "
+            f"partition_key={partition_key} row_key={row_key}"
+        )
+    return model_type.model_validate(decode_dict(data))
+
+
 class ModelTableService(Generic[M], TableService):
     _model: Type[M]
 
     def _model_from_entity(self, entity: TableEntity) -> M:
-        data: Any = entity.get("Data")
-        if not data:
-            partition_key = entity.get("PartitionKey")
-            row_key = entity.get("RowKey")
-            raise TableError(
-                "Data column expected but not found. "
-                f"partition_key={partition_key} row_key={row_key}"
-            )
-        if not isinstance(data, str):
-            partition_key = entity.get("PartitionKey")
-            row_key = entity.get("RowKey")
-            raise TableError(
-                "Data column must be a string. "
-                f"partition_key={partition_key} row_key={row_key}"
-            )
-        return self._model.model_validate(decode_dict(data))
+        return model_from_entity(self._model, entity)
 
     def insert(self, partition_key: str, row_key: str, entity: M) -> None:
         self._ensure_table_client()
-        validate_table_key(partition_key)
-        validate_table_key(row_key)
         assert self._table_client
-        self._table_client.create_entity(
-            {
-                "PartitionKey": partition_key,
-                "RowKey": row_key,
-                "Data": encode_model(entity),
-            }
-        )
+        self._table_client.create_entity(model_entity(partition_key, row_key, entity))
 
     def upsert(self, partition_key: str, row_key: str, entity: M) -> None:
         self._ensure_table_client()
-        validate_table_key(partition_key)
-        validate_table_key(row_key)
         assert self._table_client
-        self._table_client.upsert_entity(
-            {
-                "PartitionKey": partition_key,
-                "RowKey": row_key,
-                "Data": encode_model(entity),
-            }
-        )
+        self._table_client.upsert_entity(model_entity(partition_key, row_key, entity))
 
     def update(self, partition_key: str, row_key: str, entity: M) -> None:
         self._ensure_table_client()
-        validate_table_key(partition_key)
-        validate_table_key(row_key)
         assert self._table_client
-        self._table_client.update_entity(
-            {
-                "PartitionKey": partition_key,
-                "RowKey": row_key,
-                "Data": encode_model(entity),
-            }
+        self._table_client.update_entity(model_entity(partition_key, row_key, entity))
+
+    def upsert_many(self, entities: Iterable[Tuple[str, str, M]]) -> int:
+        """Upsert (partition key, row key, model) entities in transactions.
+
+        Returns the number of transactions submitted.
+        """
+        return self.submit_transactions(
+            ("upsert", model_entity(partition_key, row_key, entity))
+            for partition_key, row_key, entity in entities
         )
 
     def delete(self, partition_key: str, row_key: str) -> None:
@@ -357,6 +421,16 @@ class ModelTableService(Generic[M], TableService):
         assert self._table_client
         self._table_client.delete_entity(partition_key=partition_key, row_key=row_key)
 
+    def delete_many(self, keys: Iterable[Tuple[str, str]]) -> int:
+        """Delete (partition key, row key) entities in transactions.
+
+        Returns the number of transactions submitted.
+        """
+        return self.submit_transactions(
+            ("delete", {"PartitionKey": partition_key, "RowKey": row_key})
+            for partition_key, row_key in keys
+        )
+
     def get(self, partition_key: str, row_key: str) -> Optional[M]:
         self._ensure_table_client()
         validate_table_key(partition_key)
@@ -378,15 +452,198 @@ class ModelTableService(Generic[M], TableService):
             for entity in self._table_client.list_entities()
         ]
 
-    def query(self, q: str) -> List[M]:
+    def iter_query(self, q: str, page_size: int = 1000) -> Iterator[M]:
+        """Yield the models matching the query, fetching a page at a time.
+
+        Entities that can't be read as models are logged and skipped.
+        """
         self._ensure_table_client()
         assert self._table_client
-        result = []
-        for entity in self._table_client.query_entities(q):
+        for entity in self._table_client.query_entities(q, results_per_page=page_size):
             try:
+                yield self._model_from_entity(entity)
+            except Exception as e:
+                logger.warning(
+                    f"Skipping entity ({entity['PartitionKey']}, "
+                    f"{entity['RowKey']}): {e}"
+                )
+
+    def query(self, q: str) -> List[M]:
+        return list(self.iter_query(q))
+
+
+class AsyncTableService:
+    """Async variant of TableService, using azure.data.tables.aio."""
+
+    def __init__(
+        self,
+        get_clients: Callable[
+            [], Tuple[Optional[AsyncTableServiceClient], AsyncTableClient]
+        ],
+    ) -> None:
+        self._get_clients = get_clients
+        self._service_client: Optional[AsyncTableServiceClient] = None
+        self._table_client: Optional[AsyncTableClient] = None
+
+    def _ensure_table_client(self) -> AsyncTableClient:
+        if not self._table_client:
+            raise TableError("Table client not initialized. Use as a context manager.")
+        return self._table_client
+
+    async def __aenter__(self: AT) -> AT:
+        self._service_client, self._table_client = self._get_clients()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        if self._table_client:
+            await self._table_client.close()
+            self._table_client = None
+        if self._service_client:
+            await self._service_client.close()
+            self._service_client = None
+
+    @classmethod
+    def from_sas_token(
+        cls: Type[AT], account_url: str, sas_token: str, table_name: str
+    ) -> AT:
+        def _get_clients(
+            _url: str = account_url, _token: str = sas_token, _table: str = table_name
+        ) -> Tuple[Optional[AsyncTableServiceClient], AsyncTableClient]:
+            table_service_client = AsyncTableServiceClient(
+                endpoint=_url,
+                credential=AzureSasCredential(_token),
+            )
+            return (
+                table_service_client,
+                table_service_client.get_table_client(table_name=_table),
+            )
+
+        return cls(_get_clients)
+
+    @classmethod
+    def from_connection_string(
+        cls: Type[AT], connection_string: str, table_name: str
+    ) -> AT:
+        def _get_clients(
+            _conn_str: str = connection_string, _table: str = table_name
+        ) -> Tuple[Optional[AsyncTableServiceClient], AsyncTableClient]:
+            table_service_client = AsyncTableServiceClient.from_connection_string(
+                conn_str=_conn_str
+            )
+            return (
+                table_service_client,
+                table_service_client.get_table_client(table_name=_table),
+            )
+
+        return cls(_get_clients)
 
-                result.append(self._model_from_entity(entity))
+    @classmethod
+    def from_account_key(
+        cls: Type[AT],
+        account_name: str,
+        account_key: Optional[str],
+        table_name: str,
+        account_url: Optional[str] = None,
+    ) -> AT:
+        def _get_clients(
+            _name: str = account_name,
+            _key: Optional[str] = account_key,
+            _url: str = account_url or f"https://{account_name}.table.core.windows.net",
+            _table: str = table_name,
+        ) -> Tuple[Optional[AsyncTableServiceClient], AsyncTableClient]:
+            credential: Union[
+                azure.identity.aio.DefaultAzureCredential, AzureNamedKeyCredential
+            ]
+            if _key is None:
+                credential = azure.identity.aio.DefaultAzureCredential()
+            else:
+                # azurite
+                credential = AzureNamedKeyCredential(_name, _key)
+            table_service_client = AsyncTableServiceClient(
+                endpoint=_url, credential=credential  # type: ignore[arg-type]
+            )
+            return (
+                table_service_client,
+                table_service_client.get_table_client(table_name=_table),
+            )
+
+        return cls(_get_clients)
+
+    @classmethod
+    def from_config(cls: Type[AT], config: TableSasConfig) -> AT:
+        return cls.from_sas_token(
+            account_url=config.account_url,
+            sas_token=config.sas_token,
+            table_name=config.table_name,
+        )
+
+    async def submit_transactions(self, operations: Iterable[TableOperation]) -> int:
+        """Submit operations as transactions per partition key.
+
+        Returns the number of transactions submitted.
+        """
+        table_client = self._ensure_table_client()
+        transactions = group_transactions(operations)
+        for transaction in transactions:
+            await table_client.submit_transaction(transaction)
+        return len(transactions)
+
+
+class AsyncModelTableService(Generic[M], AsyncTableService):
+    """Async variant of ModelTableService."""
+
+    _model: Type[M]
+
+    async def insert(self, partition_key: str, row_key: str, entity: M) -> None:
+        await self._ensure_table_client().create_entity(
+            model_entity(partition_key, row_key, entity)
+        )
+
+    async def upsert(self, partition_key: str, row_key: str, entity: M) -> None:
+        await self._ensure_table_client().upsert_entity(
+            model_entity(partition_key, row_key, entity)
+        )
+
+    async def upsert_many(self, entities: Iterable[Tuple[str, str, M]]) -> int:
+        """Upsert (partition key, row key, model) entities in transactions.
+
+        Returns the number of transactions submitted.
+        """
+        return await self.submit_transactions(
+            ("upsert", model_entity(partition_key, row_key, entity))
+            for partition_key, row_key, entity in entities
+        )
+
+    async def delete(self, partition_key: str, row_key: str) -> None:
+        validate_table_key(partition_key)
+        validate_table_key(row_key)
+        await self._ensure_table_client().delete_entity(
+            partition_key=partition_key, row_key=row_key
+        )
+
+    async def get(self, partition_key: str, row_key: str) -> Optional[M]:
+        validate_table_key(partition_key)
+        validate_table_key(row_key)
+        try:
+            entity = await self._ensure_table_client().get_entity(
+                partition_key=partition_key, row_key=row_key
+            )
+            return model_from_entity(self._model, entity)
+        except ResourceNotFoundError:
+            return None
+
+    async def iter_query(self, q: str, page_size: int = 1000) -> AsyncIterator[M]:
+        """Yield the models matching the query, fetching a page at a time.
+
+        Entities that can't be read as models are logged and skipped.
+        """
+        async for entity in self._ensure_table_client().query_entities(
+            q, results_per_page=page_size
+        ):
+            try:
+                yield model_from_entity(self._model, entity)
             except Exception as e:
-                print((entity["PartitionKey"], entity["RowKey"]))
-                print(e)
-        return result
+                logger.warning(
+                    f"Skipping entity ({entity['PartitionKey']}, "
+                    f"{entity['RowKey']}): {e}"
+                )
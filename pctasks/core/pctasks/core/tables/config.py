@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from pctasks.core.constants import DEFAULT_TARGET_ENVIRONMENT
 from pctasks.core.models.config import ImageConfig
@@ -35,13 +35,7 @@ class ImageKeyEntryTable(StrTableService):
             tags=map_opt(self._parse_lst, tags),
         )
 
-    def set_image(
-        self,
-        image_key: str,
-        image_config: ImageConfig,
-        target_environment: Optional[str] = None,
-    ) -> None:
-        row_key = target_environment or DEFAULT_TARGET_ENVIRONMENT
+    def _image_values(self, image_config: ImageConfig) -> Dict[str, str]:
         values = image_config.dict()
 
         if "environment" in values:
@@ -52,5 +46,34 @@ class ImageKeyEntryTable(StrTableService):
             values["tags"] = self._encode_lst(values["tags"])
         else:
             values["tags"] = ""
+        return values
+
+    def set_image(
+        self,
+        image_key: str,
+        image_config: ImageConfig,
+        target_environment: Optional[str] = None,
+    ) -> None:
+        row_key = target_environment or DEFAULT_TARGET_ENVIRONMENT
+        self.upsert(
+            partition_key=image_key,
+            row_key=row_key,
+            values=self._image_values(image_config),
+        )
 
-        self.upsert(partition_key=image_key, row_key=row_key, values=values)
+    def set_images(
+        self, images: Iterable[Tuple[str, ImageConfig, Optional[str]]]
+    ) -> int:
+        """Set (image key, image config, target environment) entries.
+
+        Entries are upserted in transactions per image key.
+        Returns the number of transactions submitted.
+        """
+        return self.upsert_many(
+            (
+                image_key,
+                target_environment or DEFAULT_TARGET_ENVIRONMENT,
+                self._image_values(image_config),
+            )
+            for image_key, image_config, target_environment in images
+        )
@@ -16,6 +16,9 @@ T = TypeVar("T", bound=EventRegistration)
 STORAGE_ACCOUNT_REGEX = ".*/Microsoft.Storage/storageAccounts/([^/]+)$"
 CONTAINER_REGEX = "^/blobServices/default/containers/([^/]+)/.*"
 
+_STORAGE_ACCOUNT_PATTERN = re.compile(STORAGE_ACCOUNT_REGEX)
+_CONTAINER_PATTERN = re.compile(CONTAINER_REGEX)
+
 
 class CloudEventRegistrationTableService(Generic[T], ModelTableService[T], ABC):
     @abstractmethod
@@ -131,9 +134,16 @@ class STACWebHookEventRegistrationTable(
     def get_registration_key(
         self, notification: NotificationMessage, target_environment: Optional[str]
     ) -> Optional[str]:
-        return super().get_registration_key(  # type: ignore
-            notification, target_environment
+        data = notification.event.data
+        collection_id = (
+            data.get("collection_id")
+            if isinstance(data, dict)
+            else getattr(data, "collection_id", None)
         )
+        if not collection_id:
+            return None
+        target_environment = target_environment or DEFAULT_TARGET_ENVIRONMENT
+        return f"{collection_id}|||{target_environment}"
 
 
 class BlobTriggerEventRegistrationTable(
@@ -150,12 +160,12 @@ class BlobTriggerEventRegistrationTable(
         if not event.subject:
             return None
 
-        sa_match = re.match(STORAGE_ACCOUNT_REGEX, event.source)
+        sa_match = _STORAGE_ACCOUNT_PATTERN.match(event.source)
         if not sa_match:
             return None
         else:
             storage_account = sa_match.group(1)
-        cn_match = re.match(CONTAINER_REGEX, event.subject)
+        cn_match = _CONTAINER_PATTERN.match(event.subject)
         if not cn_match:
             return None
         else:
@@ -1,22 +1,207 @@
+import functools
+import hashlib
 import json
-from typing import Any, Dict, List, Union
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Union
 
+import jsonschema
 import pystac
-from stac_validator.validate import StacValidate
+import pystac.errors
+from pystac.serialization import identify_stac_object_type
+from pystac.validation.local_validator import get_local_schema_cache
+from pystac.validation.schema_uri_map import DefaultSchemaUriMap
+from referencing import Registry, Resource
 
+logger = logging.getLogger(__name__)
 
-class STACValidationError(Exception):
+STAC_SCHEMA_CACHE_DIR_ENV_VAR = "PCTASKS_STAC_SCHEMA_CACHE_DIR"
+
+
+class STACValidationError(pystac.errors.STACValidationError):
     def __init__(self, message: str, detail: List[Dict[str, Any]]):
-        super().__init__(message)
-        detail = detail
+        super().__init__(message, source=detail)
+        self.detail = detail
 
 
-def validate_stac(object: Union[Dict[str, Any], pystac.STACObject]) -> None:
-    validator = StacValidate(extensions=True)
-    validator.stac_content = object if isinstance(object, dict) else object.to_dict()
-    validator.run()
-    if not validator.valid:
-        raise STACValidationError(
-            f"Invalid STAC:\n{json.dumps(validator.message, indent=2)}",
-            validator.message,
+class STACValidator:
+    """Validates STAC JSON against compiled JSON schemas.
+
+    Schemas are loaded once and the compiled validators are kept for the
+    lifetime of the validator, so validating many objects doesn't re-fetch
+    or re-compile any schemas. Schemas are looked up in pystac's bundled
+    schemas, then in ``schema_cache_dir`` (if set), and finally fetched
+    over HTTP. Fetched schemas are written to ``schema_cache_dir`` so that
+    nodes without network access can validate from a pre-populated cache.
+
+    Parameters
+    ----------
+    schema_cache_dir: str, optional
+        A directory to read and write cached JSON schemas.
+    """
+
+    def __init__(self, schema_cache_dir: Optional[str] = None) -> None:
+        self.schema_cache_dir = schema_cache_dir
+        self._schema_uri_map = DefaultSchemaUriMap()
+        self._lock = threading.Lock()
+        self._schemas: Dict[str, Dict[str, Any]] = get_local_schema_cache()
+        self._resources: Dict[str, Resource[Any]] = {}
+        self._validators: Dict[str, Any] = {}
+        self._registry: Registry[Any] = Registry(
+            retrieve=self._retrieve  # type: ignore
+        )
+
+    def _cache_path(self, schema_uri: str) -> Optional[str]:
+        if not self.schema_cache_dir:
+            return None
+        key = hashlib.sha256(schema_uri.encode("utf-8")).hexdigest()
+        return os.path.join(self.schema_cache_dir, f"{key}.json")
+
+    def _load_schema(self, schema_uri: str) -> Dict[str, Any]:
+        cache_path = self._cache_path(schema_uri)
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                return json.load(f)
+
+        logger.info(f"Fetching STAC schema {schema_uri}")
+        text = pystac.StacIO.default().read_text(schema_uri)
+        schema: Dict[str, Any] = json.loads(text)
+
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(text)
+            os.replace(tmp_path, cache_path)
+
+        return schema
+
+    def get_schema(self, schema_uri: str) -> Dict[str, Any]:
+        """Get the JSON schema at ``schema_uri``, loading it if needed."""
+        schema = self._schemas.get(schema_uri)
+        if schema is None:
+            with self._lock:
+                schema = self._schemas.get(schema_uri)
+                if schema is None:
+                    schema = self._load_schema(schema_uri)
+                    self._schemas[schema_uri] = schema
+        return schema
+
+    def _retrieve(self, schema_uri: str) -> Resource[Any]:
+        resource = self._resources.get(schema_uri)
+        if resource is None:
+            resource = Resource.from_contents(self.get_schema(schema_uri))
+            self._resources[schema_uri] = resource
+        return resource
+
+    def _get_validator(self, schema_uri: str) -> Any:
+        validator = self._validators.get(schema_uri)
+        if validator is None:
+            schema = self.get_schema(schema_uri)
+            cls = jsonschema.validators.validator_for(schema)
+            cls.check_schema(schema)
+            # Crawl the schema's references up front; subsequent validations
+            # resolve them from the registry without any lookups.
+            registry = self._registry.with_resource(
+                schema_uri, self._retrieve(schema_uri)
+            ).crawl()
+            validator = cls(schema, registry=registry)
+            self._validators[schema_uri] = validator
+        return validator
+
+    def preload(self, schema_uris: Iterable[str]) -> None:
+        """Load and compile validators for ``schema_uris``."""
+        for schema_uri in schema_uris:
+            self._get_validator(schema_uri)
+
+    def get_schema_uris(self, stac_dict: Dict[str, Any]) -> List[str]:
+        """The core and extension schema URIs to validate ``stac_dict`` against."""
+        object_type = identify_stac_object_type(stac_dict)
+        if object_type is None:
+            raise STACValidationError(
+                f"Unable to identify STAC object type of {stac_dict.get('id')}",
+                [],
+            )
+        core_uri = self._schema_uri_map.get_object_schema_uri(
+            object_type, stac_dict.get("stac_version", pystac.get_stac_version())
         )
+        schema_uris = [core_uri] if core_uri else []
+        for extension in stac_dict.get("stac_extensions", []):
+            if extension.startswith("http"):
+                schema_uris.append(extension)
+        return schema_uris
+
+    def iter_errors(self, stac_dict: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Get the validation errors for ``stac_dict``.
+
+        Returns an empty list if the object is valid.
+        """
+        errors: List[Dict[str, Any]] = []
+        for schema_uri in self.get_schema_uris(stac_dict):
+            validator = self._get_validator(schema_uri)
+            for error in validator.iter_errors(stac_dict):
+                errors.append(
+                    {
+                        "schema": schema_uri,
+                        "path": error.json_path,
+                        "error_message": error.message,
+                    }
+                )
+        return errors
+
+    def validate(self, object: Union[Dict[str, Any], pystac.STACObject]) -> None:
+        """Validate a STAC object, raising STACValidationError if it's invalid."""
+        stac_dict = _to_dict(object)
+        errors = self.iter_errors(stac_dict)
+        if errors:
+            raise STACValidationError(
+                f"Invalid STAC:\n{json.dumps(errors, indent=2)}", errors
+            )
+
+    def validate_many(
+        self, objects: Iterable[Union[Dict[str, Any], pystac.STACObject]]
+    ) -> None:
+        """Validate many STAC objects.
+
+        All objects are validated. If any are invalid, a single
+        STACValidationError is raised describing every invalid object.
+        """
+        detail: List[Dict[str, Any]] = []
+        for i, object in enumerate(objects):
+            stac_dict = _to_dict(object)
+            errors = self.iter_errors(stac_dict)
+            if errors:
+                detail.append({"index": i, "id": stac_dict.get("id"), "errors": errors})
+        if detail:
+            raise STACValidationError(
+                f"{len(detail)} invalid STAC objects:\n{json.dumps(detail, indent=2)}",
+                detail,
+            )
+
+
+def _to_dict(object: Union[Dict[str, Any], pystac.STACObject]) -> Dict[str, Any]:
+    if isinstance(object, dict):
+        return object
+    return object.to_dict(include_self_link=False, transform_hrefs=False)
+
+
+@functools.lru_cache(maxsize=1)
+def get_stac_validator() -> STACValidator:
+    """Get the process-wide STACValidator.
+
+    The on-disk schema cache directory is read from the
+    ``PCTASKS_STAC_SCHEMA_CACHE_DIR`` environment variable.
+    """
+    schema_cache_dir = os.environ.get(STAC_SCHEMA_CACHE_DIR_ENV_VAR) or None
+    if schema_cache_dir:
+        schema_cache_dir = os.path.expandvars(schema_cache_dir)
+    return STACValidator(schema_cache_dir=schema_cache_dir)
+
+
+def validate_stac(object: Union[Dict[str, Any], pystac.STACObject]) -> None:
+    get_stac_validator().validate(object)
+
+
+def validate_many(objects: Iterable[Union[Dict[str, Any], pystac.STACObject]]) -> None:
+    get_stac_validator().validate_many(objects)
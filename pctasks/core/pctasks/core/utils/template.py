@@ -1,12 +1,12 @@
+import functools
 import glob
 import json
 import re
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Union, cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union, cast
 from uuid import uuid4
 
-from planetary_computer.sas import get_token
 from pydantic import BaseModel
 
 TEMPLATE_REGEX = r"\$\{\{\s*([^\"]*?)\s*\}\}"
@@ -15,6 +15,10 @@ LIST_PATH_REGEX = r"(.*)\[(\d+)\]$"
 
 _PAREN_REGEX = r"\((.*?)\)"
 
+_TEMPLATE_RE = re.compile(TEMPLATE_REGEX)
+_LIST_PATH_RE = re.compile(LIST_PATH_REGEX)
+_PAREN_RE = re.compile(_PAREN_REGEX)
+
 
 T = TypeVar("T", bound=BaseModel)
 
@@ -28,6 +32,20 @@ TemplateValue = Union[bool, int, float, str, List[Any], Dict[str, Any]]
 # If https://github.com/python/mypy/issues/731 is closed, use above.
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_segment(segment: str) -> Tuple[str, Optional[int]]:
+    """Parses a path segment like "child[0]" into its key and list index."""
+    list_m = _LIST_PATH_RE.match(segment)
+    if list_m:
+        return list_m.group(1), int(list_m.group(2))
+    return segment, None
+
+
+def _check_final_value(head: str, v: Any) -> None:
+    if not (isinstance(v, (dict, list, str, int, float, bool))):
+        raise ValueError(f"Expected final value at key {head}, got {type(v)}")
+
+
 def find_value(
     data: Dict[str, Any], path: List[str], strict: bool = False
 ) -> Optional[TemplateValue]:
@@ -47,16 +65,49 @@ def find_value(
     If part of the path is a list and no index is specified, returns
     a list of values for each item in the list.
     """
+    segments = [_parse_segment(part) for part in path]
+
+    def _project(
+        v: List[Any], head: str, _path: List[str], offset: int
+    ) -> List[TemplateValue]:
+        # Extract the remaining (unindexed) path across a list of dicts in
+        # one pass, rather than recursing into each element. Falls back to
+        # _fetch for elements with nested lists.
+        if not all(isinstance(x, dict) for x in v):
+            raise TemplateError(
+                f"Expected list of dicts at key {head}, got {type(v)} "
+                f"for template {'.'.join(_path)}"
+            )
+        keys = [key for key, _ in segments[offset:]]
+        last = len(keys) - 1
+        values: List[TemplateValue] = []
+        for x in v:
+            value: Any = x
+            for i, key in enumerate(keys):
+                if isinstance(value, list):
+                    value = _fetch(x, offset, fail_if_not_found=True)
+                    break
+                if not isinstance(value, dict):
+                    raise ValueError(
+                        f"Expected dict at key {keys[i - 1]}, got {type(value)}"
+                    )
+                d, value = value, value.get(key)
+                if value is None:
+                    raise TemplateError(
+                        f"Element '{key}' not found in template {'.'.join(path)}. "
+                        f"Dict: {d}"
+                    )
+                if i == last:
+                    _check_final_value(key, value)
+            values.append(value)
+        return values
 
     def _fetch(
-        d: Dict[str, Any], _path: List[str], fail_if_not_found: bool = False
+        d: Dict[str, Any], offset: int, fail_if_not_found: bool = False
     ) -> Optional[TemplateValue]:
-        head, tail = _path[0], _path[1:]
-        index: Optional[int] = None
-        list_m = re.match(LIST_PATH_REGEX, head)
-        if list_m:
-            head = list_m.group(1)
-            index = int(list_m.group(2))
+        _path = path[offset:]
+        head, index = segments[offset]
+        has_tail = offset + 1 < len(path)
         v = d.get(head)
         if v is None:
             if fail_if_not_found:
@@ -82,9 +133,9 @@ def find_value(
                             f"for template {'.'.join(_path)}"
                         )
                     v = v[index]
-            if tail:
+            if has_tail:
                 if isinstance(v, dict):
-                    return _fetch(v, tail, fail_if_not_found=True)
+                    return _fetch(v, offset + 1, fail_if_not_found=True)
                 elif isinstance(v, list):
                     if len(v) == 0:
                         raise TemplateError(
@@ -92,6 +143,8 @@ def find_value(
                             "but found empty list "
                             f"for template {'.'.join(_path)}"
                         )
+                    if all(index is None for _, index in segments[offset + 1 :]):
+                        return _project(v, head, _path, offset + 1)
                     # Ensure the list is of dicts, and then recurse into
                     # each of the dict values.
                     if not all(isinstance(x, dict) for x in v):
@@ -99,7 +152,7 @@ def find_value(
                             f"Expected list of dicts at key {head}, got {type(v)} "
                             f"for template {'.'.join(_path)}"
                         )
-                    values = [_fetch(x, tail, fail_if_not_found=True) for x in v]
+                    values = [_fetch(x, offset + 1, fail_if_not_found=True) for x in v]
                     if all([x is None for x in values]):
                         return None
                     if any([x is None for x in values]):
@@ -113,14 +166,10 @@ def find_value(
                 else:
                     raise ValueError(f"Expected dict at key {head}, got {type(v)}")
             else:
-                if not (isinstance(v, (dict, list, str, int, float, bool))):
-                    raise ValueError(
-                        f"Expected final value at key {head}, got {type(v)}"
-                    )
-                else:
-                    return v
+                _check_final_value(head, v)
+                return cast(TemplateValue, v)
 
-    return _fetch(data, path, fail_if_not_found=strict)
+    return _fetch(data, 0, fail_if_not_found=strict)
 
 
 def split_path(s: str) -> List[str]:
@@ -129,7 +178,14 @@ def split_path(s: str) -> List[str]:
     Anything in parentheses is considered a single part,
     even if it contains periods. E.g. "foo.bar(test.json).baz"
     will parse to ["foo", "bar(test.json)", "baz"]
+
+    Paths are parsed once and cached.
     """
+    return list(_split_path(s))
+
+
+@functools.lru_cache(maxsize=4096)
+def _split_path(s: str) -> Tuple[str, ...]:
     paren_values: Dict[str, str] = {}
     new_str = s
     # Replace all strings within parentheses with a unique
@@ -137,7 +193,7 @@ def split_path(s: str) -> List[str]:
     # the path based on '.'. This prevents values within
     # parentheses that have periods (e.g. file paths) to
     # split incorrectly.
-    for m in re.finditer(_PAREN_REGEX, s):
+    for m in _PAREN_RE.finditer(s):
         part_id = uuid4().hex
         paren_values[part_id] = m.group(1)
         new_str = new_str.replace(m.group(1), part_id)
@@ -147,17 +203,14 @@ def split_path(s: str) -> List[str]:
         for k, v in paren_values.items():
             part = part.replace(k, v)
         result.append(part)
-    return result
+    return tuple(result)
 
 
 def template_str(
     v: str, get_value: Callable[[List[str]], Optional[TemplateValue]]
 ) -> TemplateValue:
     new_v = v
-    for m in re.finditer(
-        TEMPLATE_REGEX,
-        v,
-    ):
+    for m in _TEMPLATE_RE.finditer(v):
         text = m.group(1)
         try:
             new_value = get_value(split_path(text))
@@ -315,6 +368,12 @@ class PCTemplater(Templater):
         if get_token_match:
             storage_account = get_token_match.group(1).strip()
             container = get_token_match.group(2).strip()
-            return get_token(storage_account, container).token
+            return self._get_token(storage_account, container)
 
         return None
+
+    def _get_token(self, storage_account: str, container: str) -> str:
+        # planetary_computer imports pystac; only import it when templating tokens
+        from planetary_computer.sas import get_token
+
+        return get_token(storage_account, container).token
@@ -0,0 +1,165 @@
+import asyncio
+from threading import Barrier, Lock
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from pctasks.core.cosmos.container import (
+    AsyncCosmosDBContainer,
+    ContainerOperation,
+    CosmosDBContainer,
+)
+from pctasks.core.cosmos.database import CosmosDBDatabase
+from pctasks.core.cosmos.settings import CosmosDBSettings
+from pctasks.core.models.record import Record
+
+
+class GroupedModel(Record):
+    type: str = "GROUPED"
+    id: str
+    group_id: str
+
+    def get_id(self) -> str:
+        return self.id
+
+
+STORED_PROCEDURES = {ContainerOperation.BULK_PUT: {GroupedModel: "bulkput"}}
+
+
+class FakeScripts:
+    def __init__(self, barrier: Optional[Barrier] = None) -> None:
+        self.calls: List[Tuple[str, List[str]]] = []
+        self._lock = Lock()
+        # If set, each call waits until every party is in a call, so the
+        # calls fail unless they overlap.
+        self._barrier = barrier
+
+    def _record(self, partition_key: str, params: Any, hook: Any) -> None:
+        with self._lock:
+            self.calls.append((partition_key, [item["id"] for item in params[0]]))
+        hook(
+            SimpleNamespace(
+                http_response=SimpleNamespace(
+                    headers={"x-ms-request-charge": str(len(params[0]))}
+                )
+            )
+        )
+
+    def execute_stored_procedure(
+        self, sproc: str, partition_key: str, params: Any, raw_response_hook: Any
+    ) -> Dict[str, Any]:
+        if self._barrier:
+            self._barrier.wait()
+        self._record(partition_key, params, raw_response_hook)
+        return {}
+
+
+class AsyncFakeScripts(FakeScripts):
+    def __init__(self) -> None:
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def execute_stored_procedure(  # type: ignore[override]
+        self, sproc: str, partition_key: str, params: Any, raw_response_hook: Any
+    ) -> Dict[str, Any]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self._record(partition_key, params, raw_response_hook)
+        self.in_flight -= 1
+        return {}
+
+
+def make_settings() -> CosmosDBSettings:
+    return CosmosDBSettings(
+        connection_string="AccountEndpoint=https://test/;AccountKey=key;",
+        max_bulk_put_size=3,
+        bulk_put_concurrency=4,
+    )
+
+
+class GroupedContainer(CosmosDBContainer[GroupedModel]):
+    def __init__(self) -> None:
+        settings = make_settings()
+        super().__init__(
+            "grouped",
+            "/group_id",
+            GroupedModel,
+            db=CosmosDBDatabase(settings),
+            settings=settings,
+            stored_procedures=STORED_PROCEDURES,  # type: ignore[arg-type]
+        )
+
+    def get_partition_key(self, model: GroupedModel) -> str:
+        return model.group_id
+
+
+class AsyncGroupedContainer(AsyncCosmosDBContainer[GroupedModel]):
+    def __init__(self) -> None:
+        settings = make_settings()
+        super().__init__(
+            "grouped",
+            "/group_id",
+            GroupedModel,
+            db=CosmosDBDatabase(settings),
+            settings=settings,
+            stored_procedures=STORED_PROCEDURES,  # type: ignore[arg-type]
+        )
+
+    def get_partition_key(self, model: GroupedModel) -> str:
+        return model.group_id
+
+
+def interleaved_models() -> List[GroupedModel]:
+    return [
+        GroupedModel(id=str(i), group_id="A" if i % 2 == 0 else "B") for i in range(10)
+    ]
+
+
+def test_group_for_bulk_put_buckets_unsorted_models() -> None:
+    container = GroupedContainer()
+    groups = container._group_for_bulk_put(interleaved_models())
+
+    assert [(pk, [item["id"] for item in items]) for pk, items in groups] == [
+        ("A", ["0", "2", "4"]),
+        ("A", ["6", "8"]),
+        ("B", ["1", "3", "5"]),
+        ("B", ["7", "9"]),
+    ]
+
+
+def test_bulk_put_runs_groups_concurrently(caplog: Any) -> None:
+    container = GroupedContainer()
+    # Fails with a BrokenBarrierError unless all 4 groups are put at once
+    scripts = FakeScripts(barrier=Barrier(4, timeout=5))
+    container.cosmos_clients = SimpleNamespace(  # type: ignore[assignment]
+        container=SimpleNamespace(scripts=scripts)
+    )
+
+    with caplog.at_level("INFO"):
+        container.bulk_put(interleaved_models())
+
+    assert sorted(scripts.calls) == [
+        ("A", ["0", "2", "4"]),
+        ("A", ["6", "8"]),
+        ("B", ["1", "3", "5"]),
+        ("B", ["7", "9"]),
+    ]
+    assert "10 items to grouped in 4 calls" in caplog.text
+    assert "10.0 RU (2.5 RU per call)" in caplog.text
+
+
+async def test_async_bulk_put_runs_groups_concurrently() -> None:
+    container = AsyncGroupedContainer()
+    scripts = AsyncFakeScripts()
+    container.cosmos_clients = SimpleNamespace(  # type: ignore[assignment]
+        container=SimpleNamespace(scripts=scripts)
+    )
+
+    await container.bulk_put(interleaved_models())
+
+    assert len(scripts.calls) == 4
+    assert scripts.max_in_flight == 4
+    assert sorted(i for _, ids in scripts.calls for i in ids) == sorted(
+        str(i) for i in range(10)
+    )
@@ -1,9 +1,20 @@
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Tuple, Type
 
+import orjson
+
 from pctasks.core.cosmos.container import AsyncCosmosDBContainer, CosmosDBContainer
+from pctasks.core.cosmos.containers.workflow_runs import WorkflowRunsContainer
 from pctasks.core.cosmos.database import CosmosDBDatabase
 from pctasks.core.cosmos.page import Page
+from pctasks.core.cosmos.settings import CosmosDBSettings
 from pctasks.core.models.record import Record
+from pctasks.core.models.run import (
+    JobPartitionRunRecord,
+    JobPartitionRunStatus,
+    TaskRunRecord,
+    TaskRunStatus,
+)
 from pctasks.dev.cosmosdb import temp_cosmosdb_if_emulator
 
 
@@ -108,3 +119,56 @@ async def test_container_async():
                 pages.append(page)
 
             assert len(pages) == 5
+
+
+def test_item_from_model_keeps_datetime_format():
+    settings = CosmosDBSettings(
+        connection_string="AccountEndpoint=https://test/;AccountKey=key;"
+    )
+    container = MockContainer(db=CosmosDBDatabase(settings))
+    model = MockModel(
+        id="1",
+        name="one",
+        created=datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    )
+
+    item = container.item_from_model(model)
+
+    # Stored records are sorted by the string value of their datetimes
+    assert item["created"] == "2024-01-02 03:04:05.678901+00:00"
+    assert item == {**orjson.loads(model.json()), "mock_id": "1"}
+
+    # Other JSON dumps, e.g. API responses, keep pydantic's ISO 8601 format
+    assert model.model_dump(mode="json")["created"] == "2024-01-02T03:04:05.678901Z"
+
+
+def test_item_from_model_matches_json_for_nested_records():
+    settings = CosmosDBSettings(
+        connection_string="AccountEndpoint=https://test/;AccountKey=key;"
+    )
+    container = WorkflowRunsContainer(
+        JobPartitionRunRecord, db=CosmosDBDatabase(settings)
+    )
+    record = JobPartitionRunRecord(
+        run_id="run",
+        job_id="job",
+        partition_id="0",
+        status=JobPartitionRunStatus.RUNNING,
+        tasks=[
+            TaskRunRecord(
+                run_id="run",
+                job_id="job",
+                partition_id="0",
+                task_id="task",
+                status=TaskRunStatus.RUNNING,
+            )
+        ],
+        created=datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    )
+
+    item = container.item_from_model(record)
+
+    assert item == {**orjson.loads(record.json()), "id": record.get_id()}
+    assert item["tasks"][0]["status_history"][0]["timestamp"] == str(
+        record.tasks[0].status_history[0].timestamp
+    )
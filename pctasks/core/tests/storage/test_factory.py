@@ -0,0 +1,102 @@
+import pickle
+from datetime import datetime, timedelta
+
+from pctasks.core.models.tokens import ContainerTokens, StorageAccountTokens
+from pctasks.core.storage import StorageFactory
+from pctasks.core.storage.blob import BlobStorage, ContainerSas, ContainerSasCache
+from pctasks.core.storage.local import LocalStorage
+from pctasks.core.tokens import Tokens
+
+
+def _tokens() -> Tokens:
+    return Tokens(
+        {
+            "account": StorageAccountTokens(
+                token="account-token",
+                containers={
+                    "special": ContainerTokens(token="special-token"),
+                },
+            )
+        }
+    )
+
+
+def test_storage_is_cached_per_container():
+    factory = StorageFactory(tokens=_tokens())
+
+    storage_a, path_a = factory.get_storage_for_file("blob://account/data/a/1.json")
+    storage_b, path_b = factory.get_storage_for_file("blob://account/data/b/2.json")
+    assert storage_a is storage_b
+    assert isinstance(storage_a, BlobStorage)
+    assert storage_a.sas_token == "account-token"
+    assert (path_a, path_b) == ("a/1.json", "b/2.json")
+
+    folder = factory.get_storage("blob://account/data/a")
+    assert isinstance(folder, BlobStorage)
+    assert folder.prefix == "a"
+    assert folder._get_client() is storage_a._get_client()
+
+    special, _ = factory.get_storage_for_file("blob://account/special/1.json")
+    assert isinstance(special, BlobStorage)
+    assert special.sas_token == "special-token"
+
+    assert factory.metrics["storage_hits"] == 2
+    assert factory.metrics["storage_misses"] == 2
+
+
+def test_local_storage(tmp_path):
+    factory = StorageFactory()
+    storage, path = factory.get_storage_for_file(str(tmp_path / "file.txt"))
+    assert isinstance(storage, LocalStorage)
+    assert path == "file.txt"
+    assert factory.get_storage(str(tmp_path)) is storage
+
+
+def test_sas_cache_refreshes_expiring_tokens():
+    cache = ContainerSasCache(refresh_margin=timedelta(hours=1))
+    generated = []
+
+    def _generate(hours: float) -> ContainerSas:
+        generated.append(hours)
+        return ContainerSas(
+            token=f"token-{len(generated)}",
+            expiry=datetime.utcnow() + timedelta(hours=hours),
+        )
+
+    assert cache.get("account", "data", "rl", lambda: _generate(0.5)) == "token-1"
+    # Within the refresh margin, so regenerated
+    assert cache.get("account", "data", "rl", lambda: _generate(24)) == "token-2"
+    assert cache.get("account", "data", "rl", lambda: _generate(24)) == "token-2"
+    assert cache.get("account", "data", "rwl", lambda: _generate(24)) == "token-3"
+
+    assert cache.metrics == {"sas_hits": 1, "sas_misses": 2, "sas_refreshes": 1}
+
+
+def test_factory_pickles_without_clients():
+    factory = StorageFactory(
+        tokens=_tokens(), account_url="https://account.blob.core.windows.net"
+    )
+    storage, _ = factory.get_storage_for_file("blob://account/data/1.json")
+    storage._get_client()
+    factory._sas_cache.get(
+        "account",
+        "data",
+        "rl",
+        lambda: ContainerSas(
+            token="generated", expiry=datetime.utcnow() + timedelta(days=1)
+        ),
+    )
+
+    restored = pickle.loads(pickle.dumps(factory))
+
+    assert restored.account_url == "https://account.blob.core.windows.net"
+    assert restored.metrics["cached_storages"] == 0
+    restored_storage, _ = restored.get_storage_for_file("blob://account/data/1.json")
+    assert isinstance(restored_storage, BlobStorage)
+    assert restored_storage.sas_token == "account-token"
+    assert (
+        restored._sas_cache.get(
+            "account", "data", "rl", lambda: ContainerSas("", datetime.utcnow())
+        )
+        == "generated"
+    )
@@ -8,7 +8,9 @@ from tempfile import TemporaryDirectory
 from typing import Optional
 
 from pctasks.core.importer import ensure_code, ensure_requirements, write_code
+from pctasks.core.storage.base import StorageFileInfo
 from pctasks.core.storage.blob import BlobStorage
+from pctasks.core.storage.local import LocalStorage
 from pctasks.dev.blob import temp_azurite_blob_storage
 
 TESTS = Path(__file__).parent.parent
@@ -127,3 +129,58 @@ def test_write_code():
     with zipfile.ZipFile(buf) as zf:
         assert len(zf.filelist) == 1
         assert zf.filelist[0].filename == "my_package/my_file.py"
+
+
+class EtagLocalStorage(LocalStorage):
+    def __init__(self, base_dir: str) -> None:
+        super().__init__(base_dir)
+        self.downloads = 0
+
+    def get_file_info(self, file_path: str) -> StorageFileInfo:
+        info = super().get_file_info(file_path)
+        info.etag = "etag-1"
+        return info
+
+    def download_file(self, file_path: str, output_path: str, **kwargs) -> None:
+        self.downloads += 1
+        super().download_file(file_path, output_path, **kwargs)
+
+
+def test_ensure_code_cache():
+    with TemporaryDirectory() as src_dir, TemporaryDirectory() as cache_dir:
+        storage = EtagLocalStorage(src_dir)
+        storage.write_text("cached_mod.py", "X = 1\n")
+        original_sys_path = list(sys.path)
+        try:
+            first = ensure_code("cached_mod.py", storage, cache_dir=cache_dir)
+            second = ensure_code("cached_mod.py", storage, cache_dir=cache_dir)
+            assert first == second
+            assert first.read_text() == "X = 1\n"
+            assert storage.downloads == 1
+            assert str(first.parent.resolve()) in sys.path
+        finally:
+            sys.path = original_sys_path
+
+
+def test_ensure_requirements_cache():
+    with TemporaryDirectory() as src_dir, TemporaryDirectory() as cache_dir:
+        storage = LocalStorage(src_dir)
+        storage.write_text("requirements.txt", "pystac==1.*")
+        with unittest.mock.patch(
+            "pctasks.core.importer.subprocess", autospec=True
+        ) as p:
+            p.Popen.return_value.communicate.return_value = (b"a", b"b")
+            p.Popen.return_value.wait.return_value = 0
+            p.CalledProcessError = subprocess.CalledProcessError
+            original_sys_path = list(sys.path)
+            try:
+                for _ in range(2):
+                    ensure_requirements(
+                        "requirements.txt", storage, ["--upgrade"], cache_dir=cache_dir
+                    )
+            finally:
+                sys.path = original_sys_path
+
+            assert p.Popen.call_count == 1
+            envs = list((Path(cache_dir) / "requirements").iterdir())
+            assert len(envs) == 1
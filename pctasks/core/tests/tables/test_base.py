@@ -0,0 +1,135 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from pctasks.core.tables.base import (
+    MAX_TRANSACTION_SIZE,
+    AsyncModelTableService,
+    ModelTableService,
+    encode_model,
+    group_transactions,
+)
+
+
+class Record(BaseModel):
+    name: str
+    count: int = 0
+
+
+class RecordTable(ModelTableService[Record]):
+    _model = Record
+
+
+class AsyncRecordTable(AsyncModelTableService[Record]):
+    _model = Record
+
+
+def _entity(partition_key: str, row_key: str, data: str) -> Dict[str, Any]:
+    return {"PartitionKey": partition_key, "RowKey": row_key, "Data": data}
+
+
+class FakeTableClient:
+    def __init__(self, entities: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.entities = entities or []
+        self.transactions: List[List[Tuple[str, Dict[str, Any]]]] = []
+        self.results_per_page: Optional[int] = None
+
+    def submit_transaction(self, operations: Any) -> None:
+        self.transactions.append(list(operations))
+
+    def query_entities(self, query: str, results_per_page: int) -> Any:
+        self.results_per_page = results_per_page
+        return iter(self.entities)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeAsyncTableClient(FakeTableClient):
+    async def submit_transaction(self, operations: Any) -> None:  # type: ignore
+        super().submit_transaction(operations)
+
+    def query_entities(self, query: str, results_per_page: int) -> Any:
+        self.results_per_page = results_per_page
+
+        async def _iter() -> Any:
+            for entity in self.entities:
+                yield entity
+
+        return _iter()
+
+    async def close(self) -> None:  # type: ignore
+        pass
+
+
+def test_group_transactions() -> None:
+    operations = [
+        ("upsert", {"PartitionKey": f"p{i % 2}", "RowKey": str(i)})
+        for i in range(2 * MAX_TRANSACTION_SIZE + 10)
+    ]
+    transactions = group_transactions(operations)
+
+    assert sorted(len(t) for t in transactions) == [5, 5, 100, 100]
+    for transaction in transactions:
+        assert len({entity["PartitionKey"] for _, entity in transaction}) == 1
+    assert sum(len(t) for t in transactions) == len(operations)
+
+
+def test_upsert_many() -> None:
+    client = FakeTableClient()
+    with RecordTable(lambda: (None, client)) as table:  # type: ignore
+        count = table.upsert_many(
+            (f"p{i % 3}", str(i), Record(name=str(i))) for i in range(150)
+        )
+
+    assert count == 3
+    assert len(client.transactions) == 3
+    operation, entity = client.transactions[0][0]
+    assert operation == "upsert"
+    assert entity == _entity("p0", "0", encode_model(Record(name="0")))
+
+
+def test_delete_many() -> None:
+    client = FakeTableClient()
+    with RecordTable(lambda: (None, client)) as table:  # type: ignore
+        assert table.delete_many([("p", "1"), ("p", "2")]) == 1
+
+    assert client.transactions == [
+        [
+            ("delete", {"PartitionKey": "p", "RowKey": "1"}),
+            ("delete", {"PartitionKey": "p", "RowKey": "2"}),
+        ]
+    ]
+
+
+def test_iter_query_is_lazy_and_skips_bad_entities() -> None:
+    client = FakeTableClient(
+        [
+            _entity("p", "1", encode_model(Record(name="a"))),
+            _entity("p", "2", ""),
+            _entity("p", "3", encode_model(Record(name="b"))),
+        ]
+    )
+    with RecordTable(lambda: (None, client)) as table:  # type: ignore
+        results = table.iter_query("PartitionKey eq 'p'", page_size=2)
+        assert client.results_per_page is None
+        assert next(results).name == "a"
+        assert client.results_per_page == 2
+        assert [r.name for r in results] == ["b"]
+
+        assert [r.name for r in table.query("PartitionKey eq 'p'")] == ["a", "b"]
+
+
+async def test_async_upsert_many_and_iter_query() -> None:
+    client = FakeAsyncTableClient(
+        [_entity("p", str(i), encode_model(Record(name=str(i)))) for i in range(3)]
+    )
+    async with AsyncRecordTable(lambda: (None, client)) as table:  # type: ignore
+        count = await table.upsert_many(
+            ("p", str(i), Record(name=str(i))) for i in range(MAX_TRANSACTION_SIZE + 1)
+        )
+        names = [r.name async for r in table.iter_query("PartitionKey eq 'p'")]
+
+    assert count == 2
+    assert [len(t) for t in client.transactions] == [MAX_TRANSACTION_SIZE, 1]
+    assert names == ["0", "1", "2"]
@@ -0,0 +1,85 @@
+import datetime
+import json
+import os
+from pathlib import Path
+
+import pystac
+import pytest
+
+from pctasks.core.utils.stac import STACValidationError, STACValidator
+
+EXTENSION_URI = "https://example.com/test-extension/v1.0.0/schema.json"
+EXTENSION_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "$id": EXTENSION_URI,
+    "type": "object",
+    "required": ["properties"],
+    "properties": {
+        "properties": {
+            "type": "object",
+            "required": ["test:value"],
+            "properties": {"test:value": {"type": "integer"}},
+        }
+    },
+}
+
+
+def make_item(id: str = "test") -> pystac.Item:
+    return pystac.Item(
+        id,
+        geometry={"type": "Point", "coordinates": [0, 0]},
+        bbox=[0, 0, 0, 0],
+        datetime=datetime.datetime(2020, 1, 1),
+        properties={},
+    )
+
+
+def test_validate_dict_and_item():
+    validator = STACValidator()
+    item = make_item()
+    validator.validate(item)
+    validator.validate(item.to_dict())
+
+
+def test_validate_invalid():
+    validator = STACValidator()
+    item_dict = make_item().to_dict()
+    item_dict["properties"]["datetime"] = None
+
+    with pytest.raises(STACValidationError) as exc_info:
+        validator.validate(item_dict)
+    assert exc_info.value.detail
+    assert isinstance(exc_info.value, pystac.errors.STACValidationError)
+
+
+def test_validate_many():
+    validator = STACValidator()
+    items = [make_item(f"item-{i}").to_dict() for i in range(3)]
+    validator.validate_many(items)
+
+    items[1]["properties"]["datetime"] = None
+    with pytest.raises(STACValidationError) as exc_info:
+        validator.validate_many(items)
+    assert [d["id"] for d in exc_info.value.detail] == ["item-1"]
+
+
+def test_schema_cache_dir(tmp_path: Path):
+    validator = STACValidator(schema_cache_dir=str(tmp_path))
+    # Pre-populate the on-disk cache so no request is made.
+    cache_path = validator._cache_path(EXTENSION_URI)
+    assert cache_path
+    with open(cache_path, "w") as f:
+        json.dump(EXTENSION_SCHEMA, f)
+
+    item_dict = make_item().to_dict()
+    item_dict["stac_extensions"] = [EXTENSION_URI]
+    item_dict["properties"]["test:value"] = 1
+    validator.validate(item_dict)
+
+    item_dict["properties"]["test:value"] = "one"
+    with pytest.raises(STACValidationError):
+        validator.validate(item_dict)
+
+    # Compiled once
+    assert list(validator._validators).count(EXTENSION_URI) == 1
+    assert os.listdir(tmp_path) == [os.path.basename(cache_path)]
@@ -127,3 +127,31 @@ def test_local_path_template_glob(tmp_path: pathlib.Path) -> None:
     tmp_path.joinpath("file-2.json").touch()
     with pytest.raises(TemplateError, match="2"):
         templated_dict = LocalTemplater(base_dir=tmp_path).template_dict(yaml_dict)
+
+
+def test_find_value_list_projection() -> None:
+    data = {
+        "job": [
+            {"tasks": {"task": {"output": {"uri": "a", "uris": ["b", "c"]}}}},
+            {"tasks": {"task": {"output": {"uri": "d", "uris": ["e"]}}}},
+        ]
+    }
+    assert find_value(data, ["job", "tasks", "task", "output", "uri"]) == ["a", "d"]
+    assert find_value(data, ["job", "tasks", "task", "output", "uris"]) == [
+        ["b", "c"],
+        ["e"],
+    ]
+
+    with pytest.raises(TemplateError, match="Element 'missing' not found"):
+        find_value(data, ["job", "tasks", "task", "output", "missing"])
+
+    # Elements with nested lists are resolved per element
+    data = {"job": [{"tasks": [{"uri": "a"}, {"uri": "b"}]}, {"tasks": {"uri": "c"}}]}
+    assert find_value(data, ["job", "tasks", "uri"]) == [["a", "b"], "c"]
+
+
+def test_split_path_cached() -> None:
+    path = "foo.bar(test.json).baz"
+    result = split_path(path)
+    result.append("modified")
+    assert split_path(path) == ["foo", "bar(test.json)", "baz"]
@@ -12,6 +12,7 @@ from pctasks.core.utils import map_opt
 from pctasks.core.yaml import YamlValidationError
 from pctasks.dataset.chunks.models import ChunkOptions
 from pctasks.dataset.constants import DEFAULT_DATASET_YAML_PATH
+from pctasks.dataset.items.models import CreateItemsOptions
 from pctasks.dataset.models import MultipleCollectionsError
 from pctasks.dataset.splits.models import CreateSplitsOptions
 from pctasks.dataset.template import template_dataset_file
@@ -182,6 +183,8 @@ def process_items_cmd(
     upsert: bool = False,
     workflow_id: Optional[str] = None,
     is_update_workflow: bool = False,
+    ingest_batch_size: Optional[int] = None,
+    fingerprint_index: Optional[str] = None,
 ) -> None:
     """Generate the workflow to create and ingest items.
 
@@ -217,11 +220,16 @@ def process_items_cmd(
         ingest=not no_ingest,
         create_splits_options=CreateSplitsOptions(limit=limit),
         chunk_options=ChunkOptions(since=map_opt(str_to_datetime, since), limit=limit),
-        create_items_options=None,
+        create_items_options=(
+            CreateItemsOptions(fingerprint_index_uri=fingerprint_index)
+            if fingerprint_index
+            else None
+        ),
         ingest_options=None,
         target=target,
         tags=None,
         is_update_workflow=is_update_workflow,
+        ingest_batch_size=ingest_batch_size,
     )
 
     cli_handle_workflow(
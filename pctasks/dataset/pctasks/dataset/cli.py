@@ -171,6 +171,21 @@ def create_chunks_cmd(
     is_flag=True,
     help="Make an 'update' workflow by adding 'since' to the runtime arguments.",
 )
+@click.option(
+    "--ingest-batch-size",
+    type=int,
+    help=(
+        "Ingest items in a separate job after all chunks are processed, "
+        "with this many item chunks per ingest task."
+    ),
+)
+@click.option(
+    "--fingerprint-index",
+    help=(
+        "Storage URI of an index of asset fingerprints. Assets unchanged "
+        "since their items were last ingested are skipped."
+    ),
+)
 @opt_submit
 @opt_confirm
 @opt_upsert
@@ -192,6 +207,8 @@ def process_items_cmd(
     upsert: bool = False,
     workflow_id: Optional[str] = None,
     is_update_workflow: bool = False,
+    ingest_batch_size: Optional[int] = None,
+    fingerprint_index: Optional[str] = None,
 ) -> None:
     """Generate the workflow to create and ingest items.
 
@@ -223,6 +240,8 @@ def process_items_cmd(
         upsert=upsert,
         workflow_id=workflow_id,
         is_update_workflow=is_update_workflow,
+        ingest_batch_size=ingest_batch_size,
+        fingerprint_index=fingerprint_index,
         auto_confirm=confirm,
     )
 
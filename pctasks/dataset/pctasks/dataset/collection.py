@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
+from concurrent import futures
 from typing import List, Union
 
+import orjson
 import pystac
 
 from pctasks.core.models.task import WaitTaskResult
@@ -64,6 +66,9 @@ class Collection(ABC):
 
 
 class PremadeItemCollection(Collection):
+    max_concurrency: int = 10
+    """The number of item JSON files to fetch concurrently in create_items."""
+
     @classmethod
     def create_item(
         cls, asset_uri: str, storage_factory: StorageFactory
@@ -78,3 +83,37 @@ class PremadeItemCollection(Collection):
         asset_storage, path = storage_factory.get_storage_for_file(asset_uri)
         item_href = asset_storage.get_authenticated_url(path)
         return [pystac.Item.from_file(item_href)]
+
+    @classmethod
+    def create_items(
+        cls, asset_uris: List[str], storage_factory: StorageFactory
+    ) -> List[Union[List[pystac.Item], WaitTaskResult, Exception]]:
+        """
+        Create items from a chunk of URLs to GeoJSON files.
+
+        The files are fetched concurrently through the storage factory's
+        cached Storage objects, so connections are reused across files.
+        """
+
+        def _read_item(i: int) -> List[pystac.Item]:
+            asset_uri = asset_uris[i]
+            storage, path = storage_factory.get_storage_for_file(asset_uri)
+            item_dict = orjson.loads(storage.read_bytes(path))
+            return [
+                pystac.Item.from_dict(
+                    item_dict, href=asset_uri, migrate=True, preserve_dict=False
+                )
+            ]
+
+        results: List[Union[List[pystac.Item], WaitTaskResult, Exception]] = []
+        with futures.ThreadPoolExecutor(max_workers=cls.max_concurrency) as pool:
+            for future in [pool.submit(_read_item, i) for i in range(len(asset_uris))]:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+        return results
+
+    @classmethod
+    def create_items_task(cls) -> Task:
+        return CreateItemsTask(cls.create_item, create_items=cls.create_items)
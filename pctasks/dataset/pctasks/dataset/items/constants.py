@@ -1,2 +1,4 @@
 PROCESS_ITEMS_JOB_ID = "process-items"
 CREATE_ITEMS_TASK_ID = "create-items"
+COMMIT_FINGERPRINTS_TASK_ID = "commit-fingerprints"
+COMMIT_FINGERPRINTS_TASK_PATH = "pctasks.dataset.items.task:commit_fingerprints_task"
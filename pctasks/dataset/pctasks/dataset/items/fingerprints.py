@@ -0,0 +1,243 @@
+"""
+An index of the source assets items were created from.
+
+Update workflows re-process every asset listed since the last run. When
+the create items options set a ``fingerprint_index_uri``, the
+:class:`~pctasks.dataset.items.task.CreateItemsTask` records a fingerprint
+for each asset it creates items from: the asset's etag and size, and a hash
+of the items created. On later runs, assets whose etag and size are
+unchanged are skipped, and items that hash the same as before are left out
+of the NDJSON so they aren't ingested again.
+
+Fingerprints are stored in blob storage as one JSON file per asset URI.
+Create items only stages the fingerprints of a chunk as pending, keyed by
+the NDJSON the items were written to. They are committed to the index by
+the :class:`~pctasks.dataset.items.task.CommitFingerprintsTask` once that
+NDJSON is ingested. Fingerprints of assets with items that failed to
+ingest are not committed, so those assets are processed again on the next
+run.
+"""
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AbstractSet, Dict, Iterable, List, Optional, Set
+
+import orjson
+import pystac
+
+from pctasks.core.models.base import PCBaseModel
+from pctasks.core.storage import Storage, StorageFactory
+from pctasks.core.storage.base import StorageFileInfo
+from pctasks.ingest.constants import FAILED_ITEMS_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 16
+
+PENDING_PREFIX = "pending"
+
+
+class AssetFingerprint(PCBaseModel):
+    asset_uri: str
+    """URI of the asset items were created from."""
+
+    etag: Optional[str] = None
+    """Entity tag of the asset when the items were created."""
+
+    size: int
+    """Size in bytes of the asset when the items were created."""
+
+    item_hash: str
+    """Hash of the items created from the asset. See :func:`hash_items`."""
+
+    def matches(self, info: StorageFileInfo) -> bool:
+        """Whether the asset described by ``info`` is unchanged.
+
+        Assets without an etag are always considered changed.
+        """
+        return self.etag is not None and (self.etag, self.size) == (
+            info.etag,
+            info.size,
+        )
+
+
+class PendingFingerprints(PCBaseModel):
+    ndjson_uri: str
+    """URI of the NDJSON the items of these assets were written to."""
+
+    fingerprints: List[AssetFingerprint]
+
+    item_ids: Dict[str, List[str]] = {}
+    """IDs of the items written to the NDJSON, by asset URI."""
+
+
+def hash_items(items: Iterable[pystac.Item]) -> str:
+    """A hash of the JSON of ``items``, independent of key order."""
+    sha = hashlib.sha256()
+    for item in items:
+        sha.update(
+            orjson.dumps(
+                item.to_dict(include_self_link=False),
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            )
+        )
+        sha.update(b"\n")
+    return sha.hexdigest()
+
+
+def get_failed_item_ids(
+    ndjson_uris: List[str], storage_factory: StorageFactory
+) -> Set[str]:
+    """IDs of the items of ``ndjson_uris`` that failed to ingest, read from
+    the failed items NDJSON the ingest task writes beside each NDJSON."""
+    item_ids: Set[str] = set()
+    for ndjson_uri in ndjson_uris:
+        storage, path = storage_factory.get_storage_for_file(
+            f"{ndjson_uri}{FAILED_ITEMS_SUFFIX}"
+        )
+        try:
+            text = storage.read_text(path)
+        except FileNotFoundError:
+            continue
+        item_ids.update(
+            orjson.loads(line)["id"] for line in text.splitlines() if line.strip()
+        )
+    return item_ids
+
+
+def get_file_infos(
+    asset_uris: List[str],
+    storage_factory: StorageFactory,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Dict[str, StorageFileInfo]:
+    """Get the file info of each asset, concurrently.
+
+    Assets whose info can't be read are left out of the result.
+    """
+
+    def _get(asset_uri: str) -> Optional[StorageFileInfo]:
+        try:
+            storage, path = storage_factory.get_storage_for_file(asset_uri)
+            return storage.get_file_info(path)
+        except Exception:
+            logger.warning(f"Could not read file info of {asset_uri}", exc_info=True)
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        infos = list(pool.map(_get, asset_uris))
+    return {uri: info for uri, info in zip(asset_uris, infos) if info is not None}
+
+
+class FingerprintIndex:
+    """Asset fingerprints stored as JSON files in ``storage``."""
+
+    def __init__(
+        self, storage: Storage, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> None:
+        self.storage = storage
+        self.max_workers = max_workers
+
+    @classmethod
+    def from_uri(cls, uri: str, storage_factory: StorageFactory) -> "FingerprintIndex":
+        return cls(storage_factory.get_storage(uri))
+
+    @staticmethod
+    def get_path(asset_uri: str) -> str:
+        key = hashlib.sha256(asset_uri.encode("utf-8")).hexdigest()
+        return f"{key[:2]}/{key}.json"
+
+    def _get(self, asset_uri: str) -> Optional[AssetFingerprint]:
+        try:
+            data = self.storage.read_bytes(self.get_path(asset_uri))
+        except FileNotFoundError:
+            return None
+        fingerprint = AssetFingerprint.model_validate_json(data)
+        if fingerprint.asset_uri != asset_uri:
+            # Hash collision; treat as missing.
+            return None
+        return fingerprint
+
+    def get_many(self, asset_uris: List[str]) -> Dict[str, AssetFingerprint]:
+        """Get the fingerprints of the given assets that are in the index."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            fingerprints = list(pool.map(self._get, asset_uris))
+        return {
+            uri: fingerprint
+            for uri, fingerprint in zip(asset_uris, fingerprints)
+            if fingerprint is not None
+        }
+
+    def _put(self, fingerprint: AssetFingerprint) -> None:
+        self.storage.write_text(
+            self.get_path(fingerprint.asset_uri), fingerprint.model_dump_json()
+        )
+
+    def put_many(self, fingerprints: List[AssetFingerprint]) -> None:
+        """Write fingerprints to the index, replacing existing ones."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(self._put, fingerprints))
+
+    @staticmethod
+    def get_pending_path(ndjson_uri: str) -> str:
+        key = hashlib.sha256(ndjson_uri.encode("utf-8")).hexdigest()
+        return f"{PENDING_PREFIX}/{key}.json"
+
+    def put_pending(
+        self,
+        ndjson_uri: str,
+        fingerprints: List[AssetFingerprint],
+        item_ids: Dict[str, List[str]],
+    ) -> None:
+        """Stage the fingerprints of the assets whose items were written to
+        ``ndjson_uri``, replacing any staged by an earlier run of the chunk.
+
+        Staged fingerprints aren't used to skip assets until they're
+        committed with :meth:`commit_pending`. ``item_ids`` are the IDs of
+        the items written to the NDJSON, by asset URI.
+        """
+        self.storage.write_text(
+            self.get_pending_path(ndjson_uri),
+            PendingFingerprints(
+                ndjson_uri=ndjson_uri, fingerprints=fingerprints, item_ids=item_ids
+            ).model_dump_json(),
+        )
+
+    def commit_pending(
+        self,
+        ndjson_uris: List[str],
+        failed_item_ids: AbstractSet[str] = frozenset(),
+    ) -> int:
+        """Write the fingerprints staged for each NDJSON to the index.
+
+        Call only once the NDJSONs are ingested. Fingerprints of assets with
+        any item in ``failed_item_ids`` are dropped instead, so those assets
+        aren't skipped on the next run. Returns the number of fingerprints
+        committed.
+        """
+        committed = 0
+        for ndjson_uri in ndjson_uris:
+            path = self.get_pending_path(ndjson_uri)
+            try:
+                data = self.storage.read_bytes(path)
+            except FileNotFoundError:
+                logger.info(f"No pending fingerprints for {ndjson_uri}")
+                continue
+            pending = PendingFingerprints.model_validate_json(data)
+            if pending.ndjson_uri != ndjson_uri:
+                # Hash collision; leave it for its own NDJSON.
+                continue
+            fingerprints: List[AssetFingerprint] = []
+            for fingerprint in pending.fingerprints:
+                item_ids = pending.item_ids.get(fingerprint.asset_uri, [])
+                if failed_item_ids.isdisjoint(item_ids):
+                    fingerprints.append(fingerprint)
+                else:
+                    logger.warning(
+                        f"Not committing the fingerprint of {fingerprint.asset_uri}; "
+                        "some of its items failed to ingest"
+                    )
+            self.put_many(fingerprints)
+            self.storage.delete_file(path)
+            committed += len(fingerprints)
+        return committed
@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
 
 from pydantic import model_validator
 from typing_extensions import Self
@@ -9,6 +9,10 @@ from pctasks.core.models.task import TaskDefinition
 from pctasks.dataset.chunks.constants import ITEM_CHUNKS_PREFIX
 from pctasks.dataset.chunks.models import ChunkInfo
 from pctasks.dataset.constants import CREATE_ITEMS_TASK_ID
+from pctasks.dataset.items.constants import (
+    COMMIT_FINGERPRINTS_TASK_ID,
+    COMMIT_FINGERPRINTS_TASK_PATH,
+)
 from pctasks.dataset.models import CollectionDefinition, DatasetDefinition
 
 
@@ -19,6 +23,16 @@ class CreateItemsOptions(PCBaseModel):
     skip_validation: bool = False
     """Skip validation through PySTAC of the STAC Items."""
 
+    fingerprint_index_uri: Optional[str] = None
+    """URI of the storage holding the fingerprint index of source assets.
+
+    If set, assets in the chunk whose etag and size are unchanged since
+    items were last created from them are skipped, and items that are
+    identical to the last items created from an asset are not written
+    to the output NDJSON. Fingerprints are only recorded in the index once
+    the NDJSON is ingested. See :mod:`pctasks.dataset.items.fingerprints`.
+    """
+
 
 class CreateItemsInput(PCBaseModel):
     asset_uri: Optional[str] = None
@@ -67,6 +81,33 @@ class CreateItemsOutput(PCBaseModel):
     ndjson_uri: str
     """NDJSON of Items."""
 
+    skipped_asset_count: int = 0
+    """Number of assets skipped as unchanged according to the fingerprint index."""
+
+    unchanged_item_count: int = 0
+    """Number of items left out of the NDJSON as unchanged according to the
+    fingerprint index."""
+
+
+class CommitFingerprintsInput(PCBaseModel):
+    fingerprint_index_uri: str
+    """URI of the storage holding the fingerprint index."""
+
+    ndjson_uris: Union[str, List[str]]
+    """NDJSON(s) that were ingested, whose pending fingerprints to commit."""
+
+    failed_item_count: Union[int, str] = 0
+    """Number of items of the NDJSONs that failed to ingest, from the ingest
+    task output.
+
+    Fingerprints of the assets of failed items aren't committed.
+    """
+
+
+class CommitFingerprintsOutput(PCBaseModel):
+    committed_count: int
+    """Number of asset fingerprints committed to the index."""
+
 
 class CreateItemsTaskConfig(TaskDefinition):
     @classmethod
@@ -118,3 +159,24 @@ class CreateItemsTaskConfig(TaskDefinition):
             environment=environment,
             tags=tags,
         )
+
+
+class CommitFingerprintsTaskConfig(TaskDefinition):
+    @classmethod
+    def create(
+        cls,
+        image: str,
+        args: CommitFingerprintsInput,
+        code: Optional[CodeConfig] = None,
+        environment: Optional[Dict[str, str]] = None,
+        tags: Optional[Dict[str, str]] = None,
+    ) -> "CommitFingerprintsTaskConfig":
+        return CommitFingerprintsTaskConfig(
+            id=COMMIT_FINGERPRINTS_TASK_ID,
+            image=image,
+            code=code,
+            args=args.dict(),
+            task=COMMIT_FINGERPRINTS_TASK_PATH,
+            environment=environment,
+            tags=tags,
+        )
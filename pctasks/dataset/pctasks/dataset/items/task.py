@@ -1,9 +1,11 @@
 import contextlib
+import contextvars
 import logging
 import os
 import time
 import traceback
-from typing import Callable, Iterator, List, Optional, Union
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import orjson
 import pystac
@@ -11,8 +13,22 @@ from opencensus.ext.azure.log_exporter import AzureLogHandler
 
 from pctasks.core.models.task import FailedTaskResult, WaitTaskResult
 from pctasks.core.storage import StorageFactory
+from pctasks.core.storage.base import StorageFileInfo
+from pctasks.core.utils.stac import validate_many, validate_stac
 from pctasks.dataset.chunks.chunkset import ChunkSet
-from pctasks.dataset.items.models import CreateItemsInput, CreateItemsOutput
+from pctasks.dataset.items.fingerprints import (
+    AssetFingerprint,
+    FingerprintIndex,
+    get_failed_item_ids,
+    get_file_infos,
+    hash_items,
+)
+from pctasks.dataset.items.models import (
+    CommitFingerprintsInput,
+    CommitFingerprintsOutput,
+    CreateItemsInput,
+    CreateItemsOutput,
+)
 from pctasks.task.context import TaskContext
 from pctasks.task.task import Task
 
@@ -21,6 +37,13 @@ azlogger = logging.getLogger("monitor.pctasks.dataset.items.task")
 azlogger.setLevel(logging.INFO)
 azhandler = None  # initialized later in `_init_azlogger`
 
+_stage_seconds: contextvars.ContextVar[Optional[Dict[str, float]]] = (
+    contextvars.ContextVar("pctasks_create_item_stages", default=None)
+)
+_in_stage: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "pctasks_create_item_in_stage", default=False
+)
+
 
 class CreateItemsError(Exception):
     pass
@@ -30,6 +53,16 @@ CreateItemFunc = Callable[
     [str, StorageFactory], Union[List[pystac.Item], WaitTaskResult]
 ]
 
+CreateItemsFunc = Callable[
+    [List[str], StorageFactory],
+    List[Union[List[pystac.Item], WaitTaskResult, Exception]],
+]
+"""Create items from a chunk of asset URIs.
+
+Returns one result per asset URI, in order: the items created from the
+asset, a WaitTaskResult, or the exception raised creating items from it.
+"""
+
 
 class OutputNDJSONRequired(Exception):
     pass
@@ -51,6 +84,9 @@ def validate_item(item: pystac.Item, collection_id: Optional[str]) -> pystac.Ite
        ``collection_id`` if that's provided. If it's set in both places,
        then they must match.
 
+    The item is validated as a dictionary; it's not copied or modified,
+    other than setting its collection ID.
+
     Parameters
     ----------
     item: pystac.Item
@@ -62,37 +98,30 @@ def validate_item(item: pystac.Item, collection_id: Optional[str]) -> pystac.Ite
     item: pystac.Item
         The validated STAC item.
     """
+    _check_collection_id(item, collection_id)
+    validate_stac(_item_dict_for_validation(item))
+    return item
+
+
+def _check_collection_id(item: pystac.Item, collection_id: Optional[str]) -> None:
     if collection_id:
         if item.collection_id and item.collection_id != collection_id:
             raise CreateItemsError(
                 f"Item {item.id} has collection {item.collection_id} "
                 f"but expected {collection_id}"
             )
-        else:
-            item = item.clone()  # only copy if needed
-            item.collection_id = collection_id
-    else:
-        if not item.collection_id:
-            raise CreateItemsError(f"Item {item.id} has no collection ID set.")
+        item.collection_id = collection_id
+    elif not item.collection_id:
+        raise CreateItemsError(f"Item {item.id} has no collection ID set.")
 
-    # Avoid validation error for missing collection link
-    remove_collection_link = False
-
-    if item.collection_id and not item.get_single_link("collection"):
-        item.add_link(pystac.Link(rel="collection", target="http://example.com"))
-        remove_collection_link = True
-
-    try:
-        item.validate()
-    finally:
-        if remove_collection_link:
-            with contextlib.suppress(Exception):
-                item.remove_links("collection")
 
-    if remove_collection_link:
-        item.remove_links("collection")
-
-    return item
+def _item_dict_for_validation(item: pystac.Item) -> Dict[str, Any]:
+    item_dict = item.to_dict(include_self_link=False, transform_hrefs=False)
+    # Avoid validation error for missing collection link
+    links = item_dict.setdefault("links", [])
+    if not any(link.get("rel") == "collection" for link in links):
+        links.append({"rel": "collection", "href": "http://example.com"})
+    return item_dict
 
 
 def validate_create_items_result(
@@ -100,8 +129,17 @@ def validate_create_items_result(
     collection_id: Optional[str],
     skip_validation: bool = False,
 ) -> List[pystac.Item]:
+    """
+    Validate the items created from an asset.
+
+    Every item's collection ID is checked before the items are validated
+    against their JSON schemas in one batch. Items are validated as plain
+    dictionaries with the process-wide, pre-compiled STAC validator.
+    """
     if not skip_validation:
-        items = [validate_item(item, collection_id=collection_id) for item in items]
+        for item in items:
+            _check_collection_id(item, collection_id)
+        validate_many(_item_dict_for_validation(item) for item in items)
     return items
 
 
@@ -123,6 +161,28 @@ def _init_azlogger() -> None:
             azlogger.addHandler(azhandler)
 
 
+@contextlib.contextmanager
+def record_stage(name: str) -> Iterator[None]:
+    """Record the time spent in a stage of creating an item.
+
+    Stage durations are summed per name and reported with the enclosing
+    ``traced_create_item``. Outside of ``traced_create_item`` this does
+    nothing. Nested stages are only counted once, in the outermost stage.
+    """
+    stages = _stage_seconds.get()
+    if stages is None or _in_stage.get():
+        yield
+        return
+
+    token = _in_stage.set(True)
+    start_time = time.monotonic()
+    try:
+        yield
+    finally:
+        _in_stage.reset(token)
+        stages[name] = stages.get(name, 0.0) + time.monotonic() - start_time
+
+
 @contextlib.contextmanager
 def traced_create_item(
     asset_uri: str,
@@ -131,9 +191,15 @@ def traced_create_item(
     asset_count: Optional[int] = None,
 ) -> Iterator[None]:
     _init_azlogger()
+    stages: Dict[str, float] = {}
+    token = _stage_seconds.set(stages)
     start_time = time.monotonic()
-    yield
+    try:
+        yield
+    finally:
+        _stage_seconds.reset(token)
     end_time = time.monotonic()
+    stage_summary = ", ".join(f"{k}: {v:.2f}s" for k, v in stages.items())
 
     if i is not None and asset_count is not None:
         # asset_chunk_info case
@@ -146,16 +212,33 @@ def traced_create_item(
     else:
         # asset_uri case
         logger.info(f"Created items from {asset_uri} in {end_time - start_time:.2f}s")
-
-    properties = {
-        "custom_dimensions": {
-            "type": "pctasks.create_item",
-            "collection_id": collection_id,
-            "asset_uri": asset_uri,
-            "duration_seconds": end_time - start_time,
-        }
+    if stage_summary:
+        logger.info(f"Stages for {asset_uri}: {stage_summary}")
+
+    custom_dimensions: Dict[str, Any] = {
+        "type": "pctasks.create_item",
+        "collection_id": collection_id,
+        "asset_uri": asset_uri,
+        "duration_seconds": end_time - start_time,
     }
-    azlogger.info("Created item", extra=properties)
+    if stages:
+        custom_dimensions["stage_seconds"] = stages
+    azlogger.info("Created item", extra={"custom_dimensions": custom_dimensions})
+
+
+@dataclass
+class _CreatedItems:
+    items: List[pystac.Item]
+    fingerprints: List[AssetFingerprint] = field(default_factory=list)
+    """Fingerprints of the assets the items were created from, if a
+    fingerprint index is configured."""
+    item_ids: Dict[str, List[str]] = field(default_factory=dict)
+    """IDs of the items returned, by the URI of the asset they were created
+    from, for the assets with fingerprints."""
+    skipped_asset_uris: List[str] = field(default_factory=list)
+    """Assets skipped as unchanged according to the fingerprint index."""
+    unchanged_item_count: int = 0
+    """Items left out as unchanged according to the fingerprint index."""
 
 
 class CreateItemsTask(Task[CreateItemsInput, CreateItemsOutput]):
@@ -165,15 +248,35 @@ class CreateItemsTask(Task[CreateItemsInput, CreateItemsOutput]):
     def __init__(
         self,
         create_item: CreateItemFunc,
+        create_items: Optional[CreateItemsFunc] = None,
     ) -> None:
         super().__init__()
         self._create_item = create_item
+        self._create_items = create_items
 
     def create_items(
         self, args: CreateItemsInput, context: TaskContext
     ) -> Union[List[pystac.Item], WaitTaskResult]:
+        result = self._create_items_with_fingerprints(args, context)
+        if isinstance(result, WaitTaskResult):
+            return result
+        return result.items
+
+    def _create_items_with_fingerprints(
+        self, args: CreateItemsInput, context: TaskContext
+    ) -> Union[_CreatedItems, WaitTaskResult]:
+        """Create items, along with the fingerprints of the assets they were
+        created from if a fingerprint index is configured.
+
+        The fingerprints should be committed to the index only once the
+        items are ingested.
+        """
         storage_factory = context.storage_factory
-        results: List[pystac.Item] = []
+        created: List[Tuple[str, List[pystac.Item]]] = []
+        index: Optional[FingerprintIndex] = None
+        previous: Dict[str, AssetFingerprint] = {}
+        file_infos: Dict[str, StorageFileInfo] = {}
+        skipped_asset_uris: List[str] = []
         if args.asset_uri:
             try:
                 with traced_create_item(args.asset_uri, args.collection_id):
@@ -187,11 +290,14 @@ class CreateItemsTask(Task[CreateItemsInput, CreateItemsOutput]):
             elif result is None:
                 logger.warning(f"No items created from {args.asset_uri}")
             else:
-                results.extend(
-                    validate_create_items_result(
-                        result,
-                        collection_id=args.collection_id,
-                        skip_validation=args.options.skip_validation,
+                created.append(
+                    (
+                        args.asset_uri,
+                        validate_create_items_result(
+                            result,
+                            collection_id=args.collection_id,
+                            skip_validation=args.options.skip_validation,
+                        ),
                     )
                 )
         elif args.asset_chunk_info:
@@ -199,31 +305,57 @@ class CreateItemsTask(Task[CreateItemsInput, CreateItemsOutput]):
                 args.asset_chunk_info.uri
             )
             chunk_lines = chunk_storage.read_text(chunk_path).splitlines()
+            if args.options.fingerprint_index_uri:
+                index = FingerprintIndex.from_uri(
+                    args.options.fingerprint_index_uri, storage_factory
+                )
+                previous = index.get_many(chunk_lines)
+                file_infos = get_file_infos(
+                    [uri for uri in chunk_lines if uri in previous], storage_factory
+                )
+                skipped_asset_uris = [
+                    uri
+                    for uri in chunk_lines
+                    if uri in file_infos and previous[uri].matches(file_infos[uri])
+                ]
+                if skipped_asset_uris:
+                    for uri in skipped_asset_uris:
+                        logger.info(f"Skipping unchanged asset {uri}")
+                    logger.info(
+                        f"Skipping {len(skipped_asset_uris)} of {len(chunk_lines)} "
+                        "assets unchanged since items were last ingested"
+                    )
+                    skipped = set(skipped_asset_uris)
+                    chunk_lines = [u for u in chunk_lines if u not in skipped]
             asset_count = len(chunk_lines)
             if args.options.limit:
                 chunk_lines = chunk_lines[: args.options.limit]
-            for i, asset_uri in enumerate(chunk_lines):
-                try:
-                    with traced_create_item(
-                        asset_uri, args.collection_id, i=i, asset_count=asset_count
-                    ):
-                        result = self._create_item(asset_uri, storage_factory)
-                except Exception as e:
-                    tb_str = traceback.format_exc()
+            for asset_uri, asset_result in self._iter_chunk_results(
+                chunk_lines, args, storage_factory, asset_count
+            ):
+                if isinstance(asset_result, Exception):
+                    tb_str = "".join(
+                        traceback.format_exception(
+                            type(asset_result), asset_result, asset_result.__traceback__
+                        )
+                    )
                     logger.error(
-                        f"Failed to create item from {asset_uri}: {type(e).__name__}: {str(e)}\n{tb_str}"  # noqa: E501
+                        f"Failed to create item from {asset_uri}: {type(asset_result).__name__}: {str(asset_result)}\n{tb_str}"  # noqa: E501
                     )
-                if isinstance(result, WaitTaskResult):
-                    return result
+                elif isinstance(asset_result, WaitTaskResult):
+                    return asset_result
                 else:
-                    if not result:
+                    if not asset_result:
                         logger.warning(f"No items created from {asset_uri}")
                     else:
-                        results.extend(
-                            validate_create_items_result(
-                                result,
-                                collection_id=args.collection_id,
-                                skip_validation=args.options.skip_validation,
+                        created.append(
+                            (
+                                asset_uri,
+                                validate_create_items_result(
+                                    asset_result,
+                                    collection_id=args.collection_id,
+                                    skip_validation=args.options.skip_validation,
+                                ),
                             )
                         )
 
@@ -231,22 +363,104 @@ class CreateItemsTask(Task[CreateItemsInput, CreateItemsOutput]):
             # Should be prevented by validator
             raise ValueError("Neither asset_uri nor chunk_uri specified")
 
-        if args.collection_id:
-            for item in results:
-                item.collection_id = args.collection_id
+        if index is not None:
+            # Assets that weren't in the index still need their file info
+            file_infos.update(
+                get_file_infos(
+                    [uri for uri, _ in created if uri not in file_infos],
+                    storage_factory,
+                )
+            )
 
-        return results
+        results: List[pystac.Item] = []
+        fingerprints: List[AssetFingerprint] = []
+        item_ids: Dict[str, List[str]] = {}
+        unchanged_item_count = 0
+        for asset_uri, items in created:
+            if args.collection_id:
+                for item in items:
+                    item.collection_id = args.collection_id
+
+            info = file_infos.get(asset_uri)
+            if index is not None and info is not None:
+                item_hash = hash_items(items)
+                fingerprints.append(
+                    AssetFingerprint(
+                        asset_uri=asset_uri,
+                        etag=info.etag,
+                        size=info.size,
+                        item_hash=item_hash,
+                    )
+                )
+                last = previous.get(asset_uri)
+                if last is not None and last.item_hash == item_hash:
+                    # Same items as last time; no need to ingest them again.
+                    logger.info(
+                        f"Leaving out {len(items)} unchanged items "
+                        f"created from {asset_uri}"
+                    )
+                    unchanged_item_count += len(items)
+                    continue
+                item_ids[asset_uri] = [item.id for item in items]
+
+            results.extend(items)
+
+        if unchanged_item_count:
+            logger.info(
+                f"Leaving out {unchanged_item_count} items unchanged "
+                "since they were last ingested"
+            )
+
+        return _CreatedItems(
+            items=results,
+            fingerprints=fingerprints,
+            item_ids=item_ids,
+            skipped_asset_uris=skipped_asset_uris,
+            unchanged_item_count=unchanged_item_count,
+        )
+
+    def _iter_chunk_results(
+        self,
+        asset_uris: List[str],
+        args: CreateItemsInput,
+        storage_factory: StorageFactory,
+        asset_count: int,
+    ) -> Iterator[Tuple[str, Union[List[pystac.Item], WaitTaskResult, Exception]]]:
+        """Create items from each asset in a chunk, one asset at a time or
+        with the batched ``create_items`` function if one was provided."""
+        if self._create_items:
+            chunk_uri = args.asset_chunk_info.uri if args.asset_chunk_info else ""
+            with traced_create_item(chunk_uri, args.collection_id):
+                batch_results = self._create_items(asset_uris, storage_factory)
+            if len(batch_results) != len(asset_uris):
+                raise CreateItemsError(
+                    f"Expected {len(asset_uris)} results from create_items, "
+                    f"got {len(batch_results)}"
+                )
+            yield from zip(asset_uris, batch_results)
+            return
+
+        for i, asset_uri in enumerate(asset_uris):
+            result: Union[List[pystac.Item], WaitTaskResult, Exception]
+            try:
+                with traced_create_item(
+                    asset_uri, args.collection_id, i=i, asset_count=asset_count
+                ):
+                    result = self._create_item(asset_uri, storage_factory)
+            except Exception as e:
+                result = e
+            yield asset_uri, result
 
     def run(
         self, input: CreateItemsInput, context: TaskContext
     ) -> Union[CreateItemsOutput, WaitTaskResult, FailedTaskResult]:
         logger.info("Creating items...")
-        results = self.create_items(input, context)
+        created = self._create_items_with_fingerprints(input, context)
 
-        if isinstance(results, WaitTaskResult):
-            return results
-        elif isinstance(results, FailedTaskResult):
-            return results
+        if isinstance(created, WaitTaskResult):
+            return created
+        elif isinstance(created, FailedTaskResult):
+            return created
         else:
             output: CreateItemsOutput
             # Save ndjson
@@ -267,12 +481,64 @@ class CreateItemsTask(Task[CreateItemsInput, CreateItemsOutput]):
                 items_chunk_id,
                 [
                     orjson.dumps(item.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
-                    for item in results
+                    for item in created.items
                 ],
             )
+            ndjson_uri = chunkset.get_chunk_uri(items_chunk_id)
+
+            # Only stage the fingerprints; they're committed once the
+            # NDJSON is ingested, so that assets are never skipped before
+            # their items are in the database.
+            if input.options.fingerprint_index_uri and created.fingerprints:
+                FingerprintIndex.from_uri(
+                    input.options.fingerprint_index_uri, context.storage_factory
+                ).put_pending(ndjson_uri, created.fingerprints, created.item_ids)
 
             output = CreateItemsOutput(
-                ndjson_uri=chunkset.get_chunk_uri(items_chunk_id)
+                ndjson_uri=ndjson_uri,
+                skipped_asset_count=len(created.skipped_asset_uris),
+                unchanged_item_count=created.unchanged_item_count,
             )
 
         return output
+
+
+class CommitFingerprintsTask(Task[CommitFingerprintsInput, CommitFingerprintsOutput]):
+    """Commit the fingerprints staged by create items for NDJSONs that have
+    been ingested. See :mod:`pctasks.dataset.items.fingerprints`."""
+
+    _input_model = CommitFingerprintsInput
+    _output_model = CommitFingerprintsOutput
+
+    def run(
+        self, input: CommitFingerprintsInput, context: TaskContext
+    ) -> Union[CommitFingerprintsOutput, WaitTaskResult, FailedTaskResult]:
+        ndjson_uris = (
+            [input.ndjson_uris]
+            if isinstance(input.ndjson_uris, str)
+            else input.ndjson_uris
+        )
+        failed_item_count = int(input.failed_item_count)
+        failed_item_ids: Set[str] = set()
+        if failed_item_count:
+            failed_item_ids = get_failed_item_ids(ndjson_uris, context.storage_factory)
+            if len(failed_item_ids) < failed_item_count:
+                # Can't tell which assets the other failed items are from
+                logger.warning(
+                    f"Found {len(failed_item_ids)} of {failed_item_count} failed "
+                    "items; not committing any fingerprints"
+                )
+                return CommitFingerprintsOutput(committed_count=0)
+
+        index = FingerprintIndex.from_uri(
+            input.fingerprint_index_uri, context.storage_factory
+        )
+        committed_count = index.commit_pending(ndjson_uris, failed_item_ids)
+        logger.info(
+            f"Committed {committed_count} fingerprints "
+            f"for {len(ndjson_uris)} NDJSONs"
+        )
+        return CommitFingerprintsOutput(committed_count=committed_count)
+
+
+commit_fingerprints_task = CommitFingerprintsTask()
@@ -0,0 +1,187 @@
+"""
+Process pools for CPU-heavy or crash-prone work during item creation.
+
+Creating an item from some assets (converting to COGs, reading HDF files
+that may segfault) is CPU-bound and runs on a single core if done in the
+task's process. A :class:`WorkerPool` runs that work in worker processes
+that are shared by every item created in the task process:
+
+- A worker crashing (e.g. a segfault in a native library) raises
+  :class:`WorkerCrashedError` for the work it broke, and the pool is
+  recreated for subsequent work.
+- Workers are recycled after a number of tasks to bound memory growth
+  in long-running processes.
+- Time spent waiting on work is recorded as a stage of the current
+  ``traced_create_item`` call (see :func:`record_stage`).
+
+Example:
+
+    pool = get_worker_pool("cogify")
+    futures = [pool.submit(cogify, path, variable) for variable in variables]
+    results = pool.results(futures, stage="cogify")
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from pctasks.dataset.items.task import record_stage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_TASKS_PER_WORKER = 100
+
+
+class WorkerCrashedError(Exception):
+    """A worker process exited unexpectedly while running the work."""
+
+
+class WorkerPool:
+    """A process pool that isolates crashes and recycles its workers.
+
+    Parameters
+    ----------
+    name: str
+        Name of the pool, used in logging.
+    max_workers: int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+    max_tasks_per_worker: int, optional
+        Recycle the pool after it has run, on average, this many tasks per
+        worker. Work in flight finishes on the old workers. Set to ``None``
+        to never recycle workers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: Optional[int] = None,
+        max_tasks_per_worker: Optional[int] = DEFAULT_MAX_TASKS_PER_WORKER,
+    ) -> None:
+        self.name = name
+        self.max_workers = max_workers or multiprocessing.cpu_count() or 1
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._executor: Optional[futures.ProcessPoolExecutor] = None
+        self._task_count = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> futures.ProcessPoolExecutor:
+        if self._executor is not None and self.max_tasks_per_worker:
+            if self._task_count >= self.max_tasks_per_worker * self.max_workers:
+                logger.info(
+                    f"Recycling workers of pool {self.name} "
+                    f"after {self._task_count} tasks"
+                )
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+        if self._executor is None:
+            self._executor = futures.ProcessPoolExecutor(max_workers=self.max_workers)
+            self._task_count = 0
+        return self._executor
+
+    def _reset(self, executor: futures.ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                logger.warning(f"Worker pool {self.name} is broken; recreating")
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def submit(
+        self, fn: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> "futures.Future[T]":
+        """Submit ``fn(*args, **kwargs)`` to run in a worker process.
+
+        ``fn`` and its arguments must be picklable.
+        """
+        with self._lock:
+            executor = self._get_executor()
+            self._task_count += 1
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool as e:
+            self._reset(executor)
+            raise WorkerCrashedError(f"Worker pool {self.name} is broken") from e
+        setattr(future, "_pctasks_executor", executor)
+        return future
+
+    def result(self, future: "futures.Future[T]", stage: Optional[str] = None) -> T:
+        """Wait for the result of submitted work.
+
+        Raises WorkerCrashedError if a worker exited while running the
+        work. If ``stage`` is set, the time spent waiting is recorded as
+        that stage of the current ``traced_create_item``.
+        """
+        with record_stage(stage or self.name):
+            try:
+                return future.result()
+            except BrokenProcessPool as e:
+                executor = getattr(future, "_pctasks_executor", None)
+                if executor is not None:
+                    self._reset(executor)
+                raise WorkerCrashedError(
+                    f"A worker of pool {self.name} exited unexpectedly"
+                ) from e
+
+    def results(
+        self, fs: Iterable["futures.Future[T]"], stage: Optional[str] = None
+    ) -> List[T]:
+        """Wait for the results of submitted work, in order."""
+        with record_stage(stage or self.name):
+            return [self.result(f) for f in fs]
+
+    def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        stage: Optional[str] = None,
+        **kwargs: Any,
+    ) -> T:
+        """Run ``fn(*args, **kwargs)`` in a worker process and return the result."""
+        return self.result(self.submit(fn, *args, **kwargs), stage=stage)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+_pools: Dict[str, WorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(
+    name: str,
+    max_workers: Optional[int] = None,
+    max_tasks_per_worker: Optional[int] = DEFAULT_MAX_TASKS_PER_WORKER,
+) -> WorkerPool:
+    """Get the process-wide WorkerPool named ``name``, creating it if needed.
+
+    Use separate pools for work that is likely to crash workers, so that a
+    crash doesn't fail unrelated work in flight on the same pool.
+    ``max_workers`` and ``max_tasks_per_worker`` only apply when the pool
+    is created.
+    """
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = WorkerPool(
+                name,
+                max_workers=max_workers,
+                max_tasks_per_worker=max_tasks_per_worker,
+            )
+            _pools[name] = pool
+        return pool
+
+
+def shutdown_worker_pools(wait: bool = True) -> None:
+    """Shut down every pool created with :func:`get_worker_pool`."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=wait)
+        _pools.clear()
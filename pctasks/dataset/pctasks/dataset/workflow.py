@@ -1,6 +1,6 @@
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from pctasks.core.models.base import ForeachConfig
 from pctasks.core.models.task import TaskDefinition
@@ -12,7 +12,12 @@ from pctasks.dataset.chunks.models import (
     CreateChunksTaskConfig,
     ListChunksTaskConfig,
 )
-from pctasks.dataset.items.models import CreateItemsOptions, CreateItemsTaskConfig
+from pctasks.dataset.items.models import (
+    CommitFingerprintsInput,
+    CommitFingerprintsTaskConfig,
+    CreateItemsOptions,
+    CreateItemsTaskConfig,
+)
 from pctasks.dataset.models import ChunkOptions, CollectionDefinition, DatasetDefinition
 from pctasks.dataset.splits.models import CreateSplitsOptions, CreateSplitsTaskConfig
 from pctasks.ingest.models import IngestNdjsonInput, IngestTaskConfig
@@ -165,7 +170,32 @@ def create_process_items_workflow(
     target: Optional[str] = None,
     tags: Optional[Dict[str, str]] = None,
     is_update_workflow: bool = False,
+    ingest_batch_size: Optional[int] = None,
 ) -> WorkflowDefinition:
+    """
+    Create a workflow that creates items from chunks of assets and ingests them.
+
+    Parameters
+    ----------
+    ingest_batch_size: int, optional
+        By default, each ``process-chunk`` job partition ingests the items
+        it created. If set, items are instead ingested in a separate
+        ``ingest-items`` job once every chunk has been processed, with each
+        ingest task loading the item NDJSONs of ``ingest_batch_size``
+        chunks. This results in fewer, larger loads into the database, with
+        insert groups sized by ``ingest_options.insert_group_size`` items.
+
+    If ``create_items_options`` sets a ``fingerprint_index_uri`` and items
+    are ingested, a ``commit-fingerprints`` task follows each ingest task to
+    record the fingerprints of the assets whose items were ingested. Without
+    ingest, fingerprints are left pending and assets are not skipped on
+    later runs.
+
+    See :func:`modify_for_update` for ``is_update_workflow``.
+    """
+    if ingest_batch_size is not None and ingest_batch_size < 1:
+        raise ValueError("'ingest_batch_size' must be a positive integer.")
+
     chunks_job_id: str
     chunks_jobs: Dict[str, JobDefinition] = {}
     if use_existing_chunks:
@@ -239,18 +269,45 @@ def create_process_items_workflow(
     )
     items_tasks.append(create_items_task)
 
-    if ingest:
+    fingerprint_index_uri = (
+        create_items_options.fingerprint_index_uri if create_items_options else None
+    )
+
+    def _commit_fingerprints_task(
+        ndjson_uris: Union[str, List[str]], ingest_task_id: str
+    ) -> Optional[TaskDefinition]:
+        if not fingerprint_index_uri:
+            return None
+        return CommitFingerprintsTaskConfig.create(
+            image=dataset.image,
+            code=dataset.code,
+            args=CommitFingerprintsInput(
+                fingerprint_index_uri=fingerprint_index_uri,
+                ndjson_uris=ndjson_uris,
+                failed_item_count=(
+                    "${{ " + f"tasks.{ingest_task_id}.output.failed_item_count" + " }}"
+                ),
+            ),
+            environment=dataset.environment,
+            tags=task_tags(
+                collection.id, "commit-fingerprints", tags, dataset.task_config
+            ),
+        )
+
+    if ingest and not ingest_batch_size:
+        ndjson_uris = ["${{" + f"tasks.{create_items_task.id}.output.ndjson_uri" + "}}"]
         ingest_items_task = IngestTaskConfig.create(
             "ingest-items",
-            content=IngestNdjsonInput(
-                uris=["${{" + f"tasks.{create_items_task.id}.output.ndjson_uri" + "}}"],
-            ),
+            content=IngestNdjsonInput(uris=ndjson_uris),
             target=target,
             environment=dataset.environment,
             tags=task_tags(collection.id, "ingest-items", tags, dataset.task_config),
             options=ingest_options,
         )
         items_tasks.append(ingest_items_task)
+        commit_task = _commit_fingerprints_task(ndjson_uris, ingest_items_task.id)
+        if commit_task:
+            items_tasks.append(commit_task)
 
     process_items_job = JobDefinition(
         id="process-chunk",
@@ -263,6 +320,36 @@ def create_process_items_workflow(
         ),
     )
 
+    ingest_jobs: Dict[str, JobDefinition] = {}
+    if ingest and ingest_batch_size:
+        ingest_items_task = IngestTaskConfig.create(
+            "ingest-items",
+            content=IngestNdjsonInput(uris="${{ item }}"),
+            target=target,
+            environment=dataset.environment,
+            tags=task_tags(collection.id, "ingest-items", tags, dataset.task_config),
+            options=ingest_options,
+        )
+        ingest_tasks: List[TaskDefinition] = [ingest_items_task]
+        commit_task = _commit_fingerprints_task("${{ item }}", ingest_items_task.id)
+        if commit_task:
+            ingest_tasks.append(commit_task)
+        ingest_items_job = JobDefinition(
+            id="ingest-items",
+            needs=process_items_job.get_id(),
+            tasks=ingest_tasks,
+            foreach=ForeachConfig(
+                items="${{ "
+                + (
+                    f"jobs.{process_items_job.get_id()}."
+                    f"tasks.{create_items_task.id}.output.ndjson_uri"
+                )
+                + " }}",
+                batch_size=ingest_batch_size,
+            ),
+        )
+        ingest_jobs = {ingest_items_job.get_id(): ingest_items_job}
+
     id = f"{collection.id}-process-items"
     if collection.id != dataset.id:
         id = f"{dataset.id}-{id}"
@@ -275,6 +362,7 @@ def create_process_items_workflow(
         jobs={
             **chunks_jobs,
             process_items_job.get_id(): process_items_job,
+            **ingest_jobs,
         },
         target_environment=target,
     )
@@ -1,5 +1,6 @@
 import json
 import logging
+import os
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import List, Union
@@ -12,11 +13,19 @@ from pystac.utils import str_to_datetime
 import pctasks.dataset.items.task
 from pctasks.core.models.task import CompletedTaskResult, WaitTaskResult
 from pctasks.core.storage import StorageFactory
+from pctasks.core.storage.base import StorageFileInfo
 from pctasks.core.storage.local import LocalStorage
 from pctasks.core.utils.stac import validate_stac
 from pctasks.dataset.chunks.models import ChunkInfo
-from pctasks.dataset.items.models import CreateItemsOutput
+from pctasks.dataset.collection import PremadeItemCollection
+from pctasks.dataset.items.models import (
+    CommitFingerprintsInput,
+    CommitFingerprintsOutput,
+    CreateItemsOptions,
+    CreateItemsOutput,
+)
 from pctasks.dataset.items.task import (
+    CommitFingerprintsTask,
     CreateItemsError,
     CreateItemsInput,
     CreateItemsTask,
@@ -25,6 +34,7 @@ from pctasks.dataset.items.task import (
     validate_item,
 )
 from pctasks.dev.test_utils import run_test_task
+from pctasks.task.context import TaskContext
 from pctasks.task.utils import get_task_path
 
 HERE = Path(__file__)
@@ -189,3 +199,178 @@ def test_log_to_monitor(monkeypatch, caplog):
 
     azlogger = logging.getLogger("monitor.pctasks.dataset.items.task")
     assert len(azlogger.handlers) == 1
+
+
+def test_premade_items_create_items(tmp_path: Path):
+    asset_uris = []
+    for asset_uri in TEST_ASSET_URIS[:3]:
+        (item,) = create_mock_item(asset_uri, storage_factory=None)
+        path = tmp_path / f"{item.id}.json"
+        path.write_text(json.dumps(item.to_dict()))
+        asset_uris.append(str(path))
+    asset_uris.append(str(tmp_path / "missing.json"))
+
+    results = PremadeItemCollection.create_items(asset_uris, StorageFactory())
+    assert [r[0].id for r in results[:3]] == ["asset0", "asset1", "asset2"]
+    assert results[0][0].get_self_href() == asset_uris[0]
+    assert isinstance(results[3], FileNotFoundError)
+
+    chunk_path = tmp_path / "chunk.csv"
+    chunk_path.write_text("\n".join(asset_uris))
+    task = PremadeItemCollection.create_items_task()
+    assert isinstance(task, CreateItemsTask)
+    items = task.create_items(
+        CreateItemsInput(
+            asset_chunk_info=ChunkInfo(uri=str(chunk_path), chunk_id="chunk.csv"),
+            collection_id="test-collection",
+        ),
+        TaskContext(storage_factory=StorageFactory(), run_id="test"),
+    )
+    assert isinstance(items, list)
+    assert [item.id for item in items] == ["asset0", "asset1", "asset2"]
+
+
+def local_file_info(self: LocalStorage, file_path: str) -> StorageFileInfo:
+    """LocalStorage.get_file_info, with the modification time as the etag."""
+    stat = os.stat(os.path.join(self.base_dir, file_path))
+    return StorageFileInfo(size=stat.st_size, etag=str(stat.st_mtime_ns))
+
+
+def test_fingerprint_index_skips_unchanged_assets(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(LocalStorage, "get_file_info", local_file_info)
+
+    asset_dir = tmp_path / "assets"
+    asset_dir.mkdir()
+    asset_paths = []
+    for i in range(3):
+        path = asset_dir / f"asset{i}.txt"
+        path.write_text(f"version-{i}")
+        asset_paths.append(path)
+    chunk_path = tmp_path / "chunk.csv"
+    chunk_path.write_text("\n".join(str(p) for p in asset_paths))
+
+    created: List[str] = []
+
+    def create_item(asset_uri: str, storage_factory: StorageFactory):
+        created.append(asset_uri)
+        (item,) = create_mock_item(asset_uri, storage_factory)
+        item.properties["version"] = Path(asset_uri).read_text()
+        return [item]
+
+    task = CreateItemsTask(create_item)
+    args = CreateItemsInput(
+        asset_chunk_info=ChunkInfo(uri=str(chunk_path), chunk_id="chunk.csv"),
+        item_chunkset_uri=str(tmp_path / "items"),
+        collection_id="test-collection",
+        options=CreateItemsOptions(
+            fingerprint_index_uri=str(tmp_path / "fingerprints")
+        ),
+    )
+    context = TaskContext(storage_factory=StorageFactory(), run_id="test")
+
+    outputs: List[CreateItemsOutput] = []
+
+    def run() -> List[str]:
+        created.clear()
+        output = task.run(args, context)
+        assert isinstance(output, CreateItemsOutput)
+        outputs.append(output)
+        text = Path(output.ndjson_uri).read_text()
+        return [json.loads(line)["properties"]["version"] for line in text.split()]
+
+    def commit() -> int:
+        output = CommitFingerprintsTask().run(
+            CommitFingerprintsInput(
+                fingerprint_index_uri=str(tmp_path / "fingerprints"),
+                ndjson_uris=outputs[-1].ndjson_uri,
+            ),
+            context,
+        )
+        assert isinstance(output, CommitFingerprintsOutput)
+        return output.committed_count
+
+    assert run() == ["version-0", "version-1", "version-2"]
+    assert len(created) == 3
+
+    # Not ingested, so the fingerprints are still pending
+    assert run() == ["version-0", "version-1", "version-2"]
+    assert len(created) == 3
+    assert commit() == 3
+    assert commit() == 0
+
+    # Nothing changed
+    assert run() == []
+    assert created == []
+    assert outputs[-1].skipped_asset_count == 3
+    assert outputs[-1].unchanged_item_count == 0
+
+    # Content changed: recreated and written
+    asset_paths[0].write_text("version-0b")
+    # Etag changed but content is the same: recreated, but not written
+    asset_paths[1].write_text("version-1")
+    os.utime(asset_paths[1], ns=(1, 1))
+    assert run() == ["version-0b"]
+    assert created == [str(asset_paths[0]), str(asset_paths[1])]
+    assert outputs[-1].skipped_asset_count == 1
+    assert outputs[-1].unchanged_item_count == 1
+
+
+def test_commit_fingerprints_skips_failed_items(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(LocalStorage, "get_file_info", local_file_info)
+    asset_dir = tmp_path / "assets"
+    asset_dir.mkdir()
+    asset_paths = []
+    for i in range(2):
+        path = asset_dir / f"asset{i}.txt"
+        path.write_text(f"version-{i}")
+        asset_paths.append(path)
+    chunk_path = tmp_path / "chunk.csv"
+    chunk_path.write_text("\n".join(str(p) for p in asset_paths))
+
+    task = CreateItemsTask(create_mock_item)
+    args = CreateItemsInput(
+        asset_chunk_info=ChunkInfo(uri=str(chunk_path), chunk_id="chunk.csv"),
+        item_chunkset_uri=str(tmp_path / "items"),
+        collection_id="test-collection",
+        options=CreateItemsOptions(
+            fingerprint_index_uri=str(tmp_path / "fingerprints")
+        ),
+    )
+    context = TaskContext(storage_factory=StorageFactory(), run_id="test")
+
+    def commit(ndjson_uri: str, failed_item_count: int) -> int:
+        output = CommitFingerprintsTask().run(
+            CommitFingerprintsInput(
+                fingerprint_index_uri=str(tmp_path / "fingerprints"),
+                ndjson_uris=[ndjson_uri],
+                failed_item_count=failed_item_count,
+            ),
+            context,
+        )
+        assert isinstance(output, CommitFingerprintsOutput)
+        return output.committed_count
+
+    output = task.run(args, context)
+    assert isinstance(output, CreateItemsOutput)
+    lines = Path(output.ndjson_uri).read_text().split()
+    assert [json.loads(line)["id"] for line in lines] == ["asset0", "asset1"]
+
+    # More failed items than the ingest wrote: nothing is committed
+    assert commit(output.ndjson_uri, 1) == 0
+    output = task.run(args, context)
+    assert isinstance(output, CreateItemsOutput)
+    assert output.skipped_asset_count == 0
+
+    # The item of asset1 failed to ingest
+    Path(f"{output.ndjson_uri}.failed").write_text(lines[1])
+    assert commit(output.ndjson_uri, 1) == 1
+
+    output = task.run(args, context)
+    assert isinstance(output, CreateItemsOutput)
+    assert output.skipped_asset_count == 1
+    lines = Path(output.ndjson_uri).read_text().split()
+    assert [json.loads(line)["id"] for line in lines] == ["asset1"]
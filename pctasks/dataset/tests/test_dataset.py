@@ -12,6 +12,7 @@ from pctasks.core.storage import StorageFactory
 from pctasks.core.storage.blob import BlobUri
 from pctasks.core.tokens import Tokens
 from pctasks.core.utils.stac import validate_stac
+from pctasks.dataset.items.models import CreateItemsOptions
 from pctasks.dataset.template import template_dataset_file
 from pctasks.dataset.workflow import create_process_items_workflow
 from pctasks.dev.blob import (
@@ -189,3 +190,72 @@ def test_process_items_is_update_use_existing_chunks_raises():
             is_update_workflow=True,
             use_existing_chunks=True,
         )
+
+
+def test_process_items_ingest_batch_size() -> None:
+    ds_config = template_dataset_file(DATASET_PATH)
+    collection_config = ds_config.collections[0]
+
+    workflow = create_process_items_workflow(
+        ds_config,
+        collection_config,
+        chunkset_id="test",
+        ingest_batch_size=10,
+    )
+
+    assert [task.id for task in workflow.jobs["process-chunk"].tasks] == [
+        "create-items"
+    ]
+    ingest_job = workflow.jobs["ingest-items"]
+    assert ingest_job.needs == "process-chunk"
+    assert ingest_job.foreach
+    assert ingest_job.foreach.batch_size == 10
+    assert ingest_job.foreach.items == (
+        "${{ jobs.process-chunk.tasks.create-items.output.ndjson_uri }}"
+    )
+    assert ingest_job.tasks[0].args["content"]["uris"] == "${{ item }}"
+
+
+def test_process_items_commits_fingerprints_after_ingest() -> None:
+    ds_config = template_dataset_file(DATASET_PATH)
+    collection_config = ds_config.collections[0]
+    options = CreateItemsOptions(fingerprint_index_uri="blob://account/fingerprints")
+
+    workflow = create_process_items_workflow(
+        ds_config,
+        collection_config,
+        chunkset_id="test",
+        create_items_options=options,
+    )
+    tasks = workflow.jobs["process-chunk"].tasks
+    assert [task.id for task in tasks] == [
+        "create-items",
+        "ingest-items",
+        "commit-fingerprints",
+    ]
+    assert tasks[2].args["ndjson_uris"] == tasks[1].args["content"]["uris"]
+    assert tasks[2].args["failed_item_count"] == (
+        "${{ tasks.ingest-items.output.failed_item_count }}"
+    )
+
+    workflow = create_process_items_workflow(
+        ds_config,
+        collection_config,
+        chunkset_id="test",
+        create_items_options=options,
+        ingest_batch_size=10,
+    )
+    tasks = workflow.jobs["ingest-items"].tasks
+    assert [task.id for task in tasks] == ["ingest-items", "commit-fingerprints"]
+    assert tasks[1].args["ndjson_uris"] == "${{ item }}"
+
+    workflow = create_process_items_workflow(
+        ds_config,
+        collection_config,
+        chunkset_id="test",
+        create_items_options=options,
+        ingest=False,
+    )
+    assert [task.id for task in workflow.jobs["process-chunk"].tasks] == [
+        "create-items"
+    ]
@@ -0,0 +1,77 @@
+import logging
+import os
+
+import pytest
+
+from pctasks.dataset.items.task import record_stage, traced_create_item
+from pctasks.dataset.workers import WorkerCrashedError, WorkerPool
+
+
+def _pid(value: int) -> int:
+    return os.getpid()
+
+
+def _square(value: int) -> int:
+    return value * value
+
+
+def _crash(value: int) -> int:
+    os._exit(1)
+
+
+def test_worker_pool_run():
+    pool = WorkerPool("test", max_workers=2)
+    try:
+        assert pool.run(_square, 3) == 9
+        fs = [pool.submit(_square, i) for i in range(5)]
+        assert pool.results(fs) == [0, 1, 4, 9, 16]
+    finally:
+        pool.shutdown()
+
+
+def test_worker_pool_crash_isolation():
+    pool = WorkerPool("test", max_workers=1)
+    try:
+        with pytest.raises(WorkerCrashedError):
+            pool.run(_crash, 1)
+        # The pool is recreated for subsequent work
+        assert pool.run(_square, 2) == 4
+    finally:
+        pool.shutdown()
+
+
+def test_worker_pool_recycles_workers():
+    pool = WorkerPool("test", max_workers=1, max_tasks_per_worker=2)
+    try:
+        pids = [pool.run(_pid, i) for i in range(4)]
+        assert pids[0] == pids[1]
+        assert pids[2] == pids[3]
+        assert pids[1] != pids[2]
+    finally:
+        pool.shutdown()
+
+
+def test_record_stage(caplog: pytest.LogCaptureFixture):
+    # No-op outside of traced_create_item
+    with record_stage("outside"):
+        pass
+
+    with caplog.at_level(logging.INFO):
+        with traced_create_item("blob://test/test/asset.tif", "test-collection"):
+            with record_stage("download"):
+                # Nested stages are counted in the outer stage only
+                with record_stage("inner"):
+                    pass
+            with record_stage("download"):
+                pass
+            with record_stage("cogify"):
+                pass
+
+    stage_records = [
+        r
+        for r in caplog.records
+        if "stage_seconds" in getattr(r, "custom_dimensions", {})
+    ]
+    assert len(stage_records) == 1
+    stages = stage_records[0].custom_dimensions["stage_seconds"]
+    assert set(stages) == {"download", "cogify"}
@@ -3,10 +3,15 @@ DEFAULT_INSERT_GROUP_SIZE = 5000
 INGEST_TASK = "pctasks.ingest_task.task:ingest_task"
 INGEST_TASK_ID = "ingest-items"
 ITEM_TASK_ID = "ingest-item"
+ITEMS_TASK_ID = "ingest-item-batch"
 COLLECTION_TASK_ID = "ingest-collection"
 NDJSON_TASK_ID = "ingest-ndjson"
 
 NDJSON_MESSAGE_TYPE = "Ndjson"
 COLLECTIONS_MESSAGE_TYPE = "Collections"
+ITEMS_MESSAGE_TYPE = "Items"
 
 DB_CONNECTION_STRING_ENV_VAR = "DB_CONNECTION_STRING"
+
+# Items that fail to ingest from <uri> are written to <uri><FAILED_ITEMS_SUFFIX>
+FAILED_ITEMS_SUFFIX = ".failed"
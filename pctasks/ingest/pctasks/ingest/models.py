@@ -12,6 +12,8 @@ from pctasks.ingest.constants import (
     DB_CONNECTION_STRING_ENV_VAR,
     INGEST_TASK,
     ITEM_TASK_ID,
+    ITEMS_MESSAGE_TYPE,
+    ITEMS_TASK_ID,
     NDJSON_MESSAGE_TYPE,
     NDJSON_TASK_ID,
 )
@@ -43,6 +45,16 @@ class IngestNdjsonInput(PCBaseModel):
         return self
 
 
+class IngestItemsInput(PCBaseModel):
+    """Many STAC Items to ingest in a single load.
+
+    Each Item must contain an id, a geometry and a collection.
+    """
+
+    type: str = Field(default=ITEMS_MESSAGE_TYPE, frozen=True)
+    items: List[Dict[str, Any]]
+
+
 class IngestCollectionsInput(PCBaseModel):
     type: str = Field(default=COLLECTIONS_MESSAGE_TYPE, frozen=True)
     collections: List[Dict[str, Any]]
@@ -53,12 +65,16 @@ def _get_discriminator_tag(v: Any) -> str:
         return NDJSON_MESSAGE_TYPE
     elif isinstance(v, IngestCollectionsInput):
         return COLLECTIONS_MESSAGE_TYPE
+    elif isinstance(v, IngestItemsInput):
+        return ITEMS_MESSAGE_TYPE
     elif isinstance(v, dict):
         type_value = v.get("type")
         if type_value == NDJSON_MESSAGE_TYPE:
             return NDJSON_MESSAGE_TYPE
         elif type_value == COLLECTIONS_MESSAGE_TYPE:
             return COLLECTIONS_MESSAGE_TYPE
+        elif type_value == ITEMS_MESSAGE_TYPE:
+            return ITEMS_MESSAGE_TYPE
     return "Any"
 
 
@@ -67,13 +83,15 @@ class IngestTaskInput(PCBaseModel):
         Union[
             Annotated[IngestNdjsonInput, Tag(NDJSON_MESSAGE_TYPE)],
             Annotated[IngestCollectionsInput, Tag(COLLECTIONS_MESSAGE_TYPE)],
+            Annotated[IngestItemsInput, Tag(ITEMS_MESSAGE_TYPE)],
             Annotated[Dict[str, Any], Tag("Any")],
         ],
         Discriminator(_get_discriminator_tag),
     ]
     """The content of the message.
 
-    Can be a STAC Collection or Item JSON dict, or a NdjsonMessageData object.
+    Can be a STAC Collection or Item JSON dict, an IngestNdjsonInput,
+    IngestCollectionsInput or IngestItemsInput object.
     """
 
     options: IngestOptions = Field(default_factory=IngestOptions)
@@ -98,6 +116,14 @@ class IngestTaskOutput(PCBaseModel):
     """List of collections created by the ingest task."""
     items: Optional[List[ItemIngestTaskOutput]] = None
     """List of items created by the ingest task."""
+    failed_item_count: int = 0
+    """Number of items that failed to bulk load, within the error budget."""
+    error_uris: Optional[List[str]] = None
+    """URIs of the NDJSONs holding the items that failed to bulk load."""
+    insert_group_sizes: Optional[List[int]] = None
+    """The number of items in each insert group of a bulk load."""
+    items_per_second: Optional[float] = None
+    """The throughput of a bulk load."""
 
     @model_validator(mode="after")
     def _validate_items(self) -> Any:
@@ -111,7 +137,12 @@ class IngestTaskConfig(TaskDefinition):
     def create(
         cls,
         task_id: str,
-        content: Union[IngestNdjsonInput, IngestCollectionsInput, Dict[str, Any]],
+        content: Union[
+            IngestNdjsonInput,
+            IngestCollectionsInput,
+            IngestItemsInput,
+            Dict[str, Any],
+        ],
         image_key: Optional[str] = None,
         target: Optional[str] = None,
         tags: Optional[Dict[str, str]] = None,
@@ -181,6 +212,35 @@ class IngestTaskConfig(TaskDefinition):
             add_service_principal=add_service_principal,
         )
 
+    @classmethod
+    def from_items(
+        cls,
+        items: List[Dict[str, Any]],
+        target: Optional[str] = None,
+        tags: Optional[Dict[str, str]] = None,
+        environment: Optional[Dict[str, str]] = None,
+        options: Optional[IngestOptions] = None,
+        ingest_settings: Optional[IngestSettings] = None,
+        add_service_principal: bool = False,
+    ) -> TaskDefinition:
+        """Create a task that ingests many items in a single load."""
+        for item in items:
+            if "collection" not in item:
+                raise InvalidSTACException(
+                    f"Item {item.get('id')} is missing a collection."
+                )
+
+        return cls.create(
+            task_id=ITEMS_TASK_ID,
+            content=IngestItemsInput(items=items),
+            target=target,
+            tags=tags,
+            environment=environment,
+            options=options,
+            ingest_settings=ingest_settings,
+            add_service_principal=add_service_principal,
+        )
+
     @classmethod
     def from_collection(
         cls,
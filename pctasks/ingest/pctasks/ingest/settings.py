@@ -13,12 +13,28 @@ DEFAULT_INGEST_IMAGE_KEY = "ingest"
 class IngestOptions(PCBaseModel):
     insert_group_size: int = DEFAULT_INSERT_GROUP_SIZE
     """Number of items to insert into the database per bulk load."""
+    target_transaction_seconds: Optional[float] = None
+    """If set, adjust the insert group size to load each group in about this time.
+
+    ``insert_group_size`` is used as the initial size.
+    """
     insert_only: bool = False
     """If your sure you're only doing inserts, use this flag for performance gains."""
     num_workers: Optional[int] = None
     """The number of workers to use for ingest. Defaults to the number of cores."""
     work_mem: Optional[int] = None
     """The work_mem setting (in MB) to use for this ingest."""
+    load_concurrency: int = 1
+    """The number of insert groups to load into the database in parallel.
+
+    Each group is loaded in its own transaction on its own pooled connection.
+    """
+    max_item_errors: int = 0
+    """The number of items that may fail to ingest before the ingest fails.
+
+    Failed insert groups are bisected so that only the offending items are
+    skipped; those items are written to an error NDJSON.
+    """
 
 
 class ImageKeys(PCBaseModel):
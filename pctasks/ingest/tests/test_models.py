@@ -1,7 +1,7 @@
 import pytest
 import yaml
 
-from pctasks.ingest.models import IngestNdjsonInput, IngestTaskInput
+from pctasks.ingest.models import IngestItemsInput, IngestNdjsonInput, IngestTaskInput
 
 
 def test_ingest_task_input_model_validate_from_yaml() -> None:
@@ -28,3 +28,18 @@ options:
 def test_ingest_ndjson_input_requires_uris_or_folder() -> None:
     with pytest.raises(ValueError, match="Either ndjson_folder or uris must be"):
         IngestNdjsonInput(type="Ndjson")
+
+
+def test_ingest_items_input_model_validate() -> None:
+    items = [
+        {"type": "Feature", "id": f"item-{i}", "collection": "test"} for i in range(2)
+    ]
+    input = IngestTaskInput.model_validate(
+        {"content": {"type": "Items", "items": items}}
+    )
+    assert isinstance(input.content, IngestItemsInput)
+    assert input.content.items == items
+
+    # Single items are still passed through as dicts
+    input = IngestTaskInput.model_validate({"content": items[0]})
+    assert input.content == items[0]
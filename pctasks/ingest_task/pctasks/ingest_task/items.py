@@ -1,20 +1,25 @@
 import logging
 import os
 import time
+import traceback
+from collections import defaultdict
 from concurrent import futures
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from tempfile import TemporaryDirectory
-from typing import Any, Dict, Iterator, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import orjson
+import psycopg
 
 # from pypgstac.pypgstac import loadopt
 from pypgstac.load import Methods
 
+from pctasks.core.models.event import IngestErrorType, IngestItemErrorRecord
 from pctasks.core.storage import StorageFactory
 from pctasks.core.storage.local import LocalStorage
+from pctasks.ingest.constants import FAILED_ITEMS_SUFFIX
 from pctasks.ingest.models import IngestOptions
-from pctasks.ingest_task.pgstac import PgSTAC
+from pctasks.ingest_task.pgstac import InsertGroupSizer, PgSTAC
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +32,28 @@ def ingest_item(pgstac: PgSTAC, item: Dict[str, Any]) -> None:
     pgstac.ingest_items([orjson.dumps(item, option=orjson.OPT_SERIALIZE_NUMPY)])
 
 
+def ingest_items(pgstac: PgSTAC, items: List[Dict[str, Any]]) -> None:
+    """Ingest several items in a single load."""
+    pgstac.ingest_items(
+        [orjson.dumps(item, option=orjson.OPT_SERIALIZE_NUMPY) for item in items]
+    )
+
+
+def ingest_items_with_status(pgstac: PgSTAC, items: List[Dict[str, Any]]) -> List[bool]:
+    """Ingest several items in a single load.
+
+    Which items already exist is looked up with one query for all items
+    before they are loaded in a single transaction.
+
+    Returns, for each item, whether it was newly created (rather than
+    updating an existing item).
+    """
+    keys = [(item["collection"], item["id"]) for item in items]
+    existing = pgstac.existing_item_keys(keys)
+    ingest_items(pgstac, items)
+    return [key not in existing for key in keys]
+
+
 @dataclass
 class PreparedNdjson:
     uri: str
@@ -34,11 +61,122 @@ class PreparedNdjson:
     line_count: int
 
 
+@dataclass
+class FailedItem:
+    """An item that could not be ingested on its own."""
+
+    ndjson_uri: str
+    line: bytes
+    error_type: IngestErrorType
+    traceback: str
+
+
+@dataclass
+class IngestNdjsonsResult:
+    failed_items: List[FailedItem] = field(default_factory=list)
+    error_records: List[IngestItemErrorRecord] = field(default_factory=list)
+    """Error records for the failed items, if a run_id was provided."""
+    error_uris: List[str] = field(default_factory=list)
+    """URIs of the NDJSONs the failed items were written to."""
+    insert_group_sizes: List[int] = field(default_factory=list)
+    """The number of items in each insert group that was loaded."""
+    items_per_second: Optional[float] = None
+    """The load throughput of the insert groups."""
+
+
+def _read_prepared_lines(insert_group: List[PreparedNdjson]) -> List[Tuple[str, bytes]]:
+    """Read the non-empty lines of prepared NDJSONs, with their source URI."""
+    lines: List[Tuple[str, bytes]] = []
+    for ndjson in insert_group:
+        with open(ndjson.prepared_path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    lines.append((ndjson.uri, line))
+    return lines
+
+
+def bisect_ingest(
+    pgstac: PgSTAC,
+    lines: List[Tuple[str, bytes]],
+    mode: Methods,
+    failed_items: List[FailedItem],
+) -> int:
+    """
+    Ingest ``lines``, bisecting on failure to isolate the offending items.
+
+    Each load is a single transaction. If a load fails, the two halves are
+    retried separately, down to single items. Items that fail on their own
+    are appended to ``failed_items``; every other item is committed.
+
+    Returns the number of items ingested.
+    """
+    if not lines:
+        return 0
+    try:
+        pgstac.ingest_items((line for _, line in lines), mode=mode)
+        return len(lines)
+    except psycopg.OperationalError:
+        # Not caused by the items; don't bisect a lost database.
+        raise
+    except Exception:
+        if len(lines) == 1:
+            uri, line = lines[0]
+            try:
+                orjson.loads(line)
+                error_type = IngestErrorType.ITEM_INGEST
+            except orjson.JSONDecodeError:
+                error_type = IngestErrorType.INVALID_DATA
+            logger.warning(f"Failed to ingest item from {uri}")
+            failed_items.append(
+                FailedItem(
+                    ndjson_uri=uri,
+                    line=line,
+                    error_type=error_type,
+                    traceback=traceback.format_exc(),
+                )
+            )
+            return 0
+
+    mid = len(lines) // 2
+    logger.info(f"  ...Bisecting {len(lines)} items into {mid} and {len(lines) - mid}")
+    return bisect_ingest(pgstac, lines[:mid], mode, failed_items) + bisect_ingest(
+        pgstac, lines[mid:], mode, failed_items
+    )
+
+
+def write_failed_items(
+    failed_items: List[FailedItem], storage_factory: StorageFactory
+) -> List[str]:
+    """
+    Write failed items to an error NDJSON beside each source NDJSON.
+
+    Items from ``<uri>`` are written to ``<uri>.failed``, so the errors
+    aren't picked up by listings of ``.ndjson`` files.
+
+    Returns the URIs of the error NDJSONs.
+    """
+    by_uri: Dict[str, List[bytes]] = defaultdict(list)
+    for failed_item in failed_items:
+        by_uri[failed_item.ndjson_uri].append(failed_item.line)
+
+    error_uris: List[str] = []
+    for uri, lines in by_uri.items():
+        error_uri = f"{uri}{FAILED_ITEMS_SUFFIX}"
+        storage, path = storage_factory.get_storage_for_file(error_uri)
+        storage.write_bytes(path, b"\n".join(lines))
+        logger.warning(f"Wrote {len(lines)} failed items to {error_uri}")
+        error_uris.append(error_uri)
+    return error_uris
+
+
 def ingest_item_paths(
     prepared_paths: Iterator[str],
     db: PgSTAC,
     insert_group_size: int,
     upsert: bool = True,
+    sizer: Optional[InsertGroupSizer] = None,
+    concurrency: int = 1,
 ) -> None:
     logger.info("=== Ingesting into the database...")
 
@@ -56,13 +194,24 @@ def ingest_item_paths(
         with open(target_path, "w") as target:
             for path in prepared_paths:
                 with open(path) as source:
-                    if path_count > 0:
-                        target.write("\n")
-                    target.write(source.read().strip("\n"))
-                    path_count += 1
+                    content = source.read().strip("\n")
+                # Skip empty chunks, e.g. with only unchanged items, which
+                # would otherwise add a blank line.
+                if not content:
+                    continue
+                if path_count > 0:
+                    target.write("\n")
+                target.write(content)
+                path_count += 1
         try:
             with open(target_path, "rb") as f:
-                db.ingest_items(f, mode=mode, insert_group_size=insert_group_size)
+                db.ingest_items(
+                    f,
+                    mode=mode,
+                    insert_group_size=insert_group_size,
+                    sizer=sizer,
+                    concurrency=concurrency,
+                )
             toc_ingest = time.perf_counter()
             logger.info(
                 f"--- Ingested items from {path_count} chunksfiles."
@@ -108,8 +257,27 @@ def ingest_ndjsons(
     ndjsons: List[str],
     storage_factory: StorageFactory,
     ingest_config: Optional[IngestOptions] = None,
-) -> None:
+    run_id: Optional[str] = None,
+) -> IngestNdjsonsResult:
+    """
+    Ingest the items in the NDJSONs at ``ndjsons``.
+
+    If an insert group fails to load, it is bisected to isolate the items
+    that fail (see :func:`bisect_ingest`). The remaining items are
+    committed, and the failed items are written to error NDJSONs (see
+    :func:`write_failed_items`). If more than
+    ``ingest_config.max_item_errors`` items fail, an
+    :class:`IngestFailedException` is raised once all groups are processed.
+
+    If ``run_id`` is provided, an :class:`IngestItemErrorRecord` is created for
+    each failed item and included in the result.
+
+    If ``ingest_config.target_transaction_seconds`` is set, the insert group
+    size starts at ``ingest_config.insert_group_size`` and is adjusted after
+    each load to target that transaction time (see :class:`InsertGroupSizer`).
+    """
     ingest_config = ingest_config or IngestOptions()
+    result = IngestNdjsonsResult()
 
     # Pool that executes the chunk download and preperation steps
     pool = futures.ProcessPoolExecutor()
@@ -126,12 +294,16 @@ def ingest_ndjsons(
         logger.info("===== Ingesting ndjsons =====")
         target_insert_group_size = ingest_config.insert_group_size
         upsert = not ingest_config.insert_only
+        sizer = InsertGroupSizer(
+            target_insert_group_size,
+            target_seconds=ingest_config.target_transaction_seconds,
+        )
 
         logger.info(f"--- Starting to process {len(ndjsons)} chunks.")
 
         total_ndjsons = len(ndjsons)
         success_ndjsons: List[str] = []
-        failed_ndjsons: List[str] = []
+        bisected_ndjsons: List[str] = []
 
         try:
             with TemporaryDirectory() as tmp_dir:
@@ -139,9 +311,8 @@ def ingest_ndjsons(
 
                 logger.info(" -- Preparing chunkset...")
 
-                # Clear the storage factory cache to avoid pickle errors.
-                storage_factory.clear_cache()
-
+                # The storage factory is pickled without its clients; the
+                # workers reuse its generated SAS tokens.
                 prepared_ndjsons = [
                     pool.submit(
                         prepare_chunk,
@@ -171,19 +342,36 @@ def ingest_ndjsons(
                             pgstac,
                             target_insert_group_size,
                             upsert=upsert,
+                            sizer=sizer,
+                            concurrency=ingest_config.load_concurrency,
                         )
 
                         success_ndjsons.extend(insert_group_ids)
 
                         logger.info(" -- INSERT GROUP SUCCESS --")
                     except Exception:
-                        failed_ndjsons.extend(insert_group_ids)
-                        logger.info(" -- INSERT GROUP FAILED --")
+                        logger.info(" -- INSERT GROUP FAILED, BISECTING --")
+                        # Part of the group may have been committed before
+                        # the failure, so don't fail on those items when
+                        # retrying an insert-only load.
+                        mode = Methods.upsert if upsert else Methods.insert_ignore
+                        failed_count = len(result.failed_items)
+                        ingested = bisect_ingest(
+                            pgstac,
+                            _read_prepared_lines(insert_group),
+                            mode,
+                            result.failed_items,
+                        )
+                        bisected_ndjsons.extend(insert_group_ids)
+                        logger.info(
+                            f" -- INSERT GROUP BISECTED: {ingested} items ingested, "
+                            f"{len(result.failed_items) - failed_count} items failed --"
+                        )
 
                     num_ok = len(success_ndjsons)
-                    num_bad = len(failed_ndjsons)
+                    num_bad = len(bisected_ndjsons)
                     logger.info(f"Success: ({(num_ok/total_ndjsons)*100:06.2f}%)")
-                    logger.info(f"Failure: ({(num_bad/total_ndjsons)*100:06.2f}%)")
+                    logger.info(f"Bisected: ({(num_bad/total_ndjsons)*100:06.2f}%)")
                     logger.info(
                         f"Total:   ({((num_ok+num_bad)/total_ndjsons)*100:06.2f}%)"
                     )
@@ -205,7 +393,10 @@ def ingest_ndjsons(
                             f"({insert_group_line_count} lines queued)"
                         )
 
-                        if insert_group_line_count >= target_insert_group_size:
+                        # Queue at least one (possibly grown) insert group
+                        if insert_group_line_count >= max(
+                            target_insert_group_size, sizer.size
+                        ):
                             cleanup_files = flush()
                             insert_group = []
                             insert_group_line_count = 0
@@ -232,11 +423,41 @@ def ingest_ndjsons(
             pool.shutdown(wait=True)
             logger.info("...pool shut down.")
 
-            if any(failed_ndjsons):
+        result.insert_group_sizes = sizer.sizes
+        result.items_per_second = sizer.items_per_second
+        if sizer.items_per_second:
+            logger.info(
+                f"Loaded {sizer.item_count} items in {len(sizer.sizes)} groups "
+                f"({sizer.items_per_second:.1f} items/s)"
+            )
+
+        if result.failed_items:
+            result.error_uris = write_failed_items(result.failed_items, storage_factory)
+            if run_id:
+                result.error_records = [
+                    IngestItemErrorRecord(
+                        type=failed_item.error_type,
+                        input=failed_item.line.decode("utf-8", errors="replace"),
+                        run_id=run_id,
+                        attempt=1,
+                        traceback=failed_item.traceback,
+                    )
+                    for failed_item in result.failed_items
+                ]
+
+            if len(result.failed_items) > ingest_config.max_item_errors:
                 raise IngestFailedException(
-                    f" Found {len(failed_ndjsons)} failed chunks!"
+                    f" Found {len(result.failed_items)} failed items, exceeding "
+                    f"the error budget of {ingest_config.max_item_errors}! "
+                    f"Failed items written to {', '.join(result.error_uris)}"
                 )
+            logger.warning(
+                f"{len(result.failed_items)} items failed to ingest, within the "
+                f"error budget of {ingest_config.max_item_errors}."
+            )
 
     except Exception as e:
         logger.exception(e)
         raise
+
+    return result
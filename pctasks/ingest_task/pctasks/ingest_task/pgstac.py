@@ -1,9 +1,30 @@
+import atexit
+import contextlib
+import itertools
 import logging
 import os
-from typing import Any, Callable, Dict, Iterable, Optional, Set, TypeVar
+import threading
+import time
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
 
 import orjson
 import psycopg
+from psycopg_pool import ConnectionPool
 from pypgstac.db import PgstacDB
 from pypgstac.load import Loader, Methods
 
@@ -13,18 +34,238 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+DEFAULT_POOL_MAX_SIZE = 4
+DEFAULT_POOL_CHECK_INTERVAL = 60.0
+
+
+class InsertGroupSizer:
+    """
+    Chooses the number of items to load per transaction.
+
+    Records the latency and size of each group load. If ``target_seconds``
+    is set, the size of the next group is adjusted towards the number of
+    items expected to load in ``target_seconds``, based on the throughput of
+    the last load. Each adjustment is limited to a factor of ``max_factor``
+    and kept within ``[min_size, max_size]``.
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        target_seconds: Optional[float] = None,
+        min_size: int = 100,
+        max_size: int = 100_000,
+        max_factor: float = 2.0,
+    ) -> None:
+        self.size = initial_size
+        self.target_seconds = target_seconds
+        self.min_size = min(min_size, initial_size)
+        self.max_size = max(max_size, initial_size)
+        self.max_factor = max_factor
+
+        self.sizes: List[int] = []
+        self.item_count = 0
+        self.byte_count = 0
+        self.seconds = 0.0
+
+    def record(self, item_count: int, byte_count: int, seconds: float) -> None:
+        """Record a group load and choose the size of the next group."""
+        self.sizes.append(item_count)
+        self.item_count += item_count
+        self.byte_count += byte_count
+        self.seconds += seconds
+
+        if not self.target_seconds or not item_count or seconds <= 0:
+            return
+
+        target = item_count / seconds * self.target_seconds
+        target = min(target, self.size * self.max_factor)
+        target = max(target, self.size / self.max_factor)
+        new_size = int(min(max(target, self.min_size), self.max_size))
+        if new_size != self.size:
+            logger.info(
+                f"  ...Group of {item_count} items ({byte_count} bytes) loaded in "
+                f"{seconds:.2f}s; adjusting insert group size to {new_size}"
+            )
+        self.size = new_size
+
+    @property
+    def items_per_second(self) -> Optional[float]:
+        if not self.seconds:
+            return None
+        return self.item_count / self.seconds
+
+
+def _item_key(item: bytes) -> Tuple[Optional[str], str]:
+    item_dict = orjson.loads(item)
+    return item_dict.get("collection"), item_dict["id"]
+
+
+class PgSTACMetrics:
+    """Latencies of acquiring connections, running queries and loading items."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self.max_seconds: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.max_seconds[name] = max(self.max_seconds.get(name, 0.0), seconds)
+
+    @contextlib.contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Count, total, mean and max seconds of each kind of operation."""
+        with self._lock:
+            return {
+                name: {
+                    "count": count,
+                    "total_seconds": self.seconds[name],
+                    "mean_seconds": self.seconds[name] / count,
+                    "max_seconds": self.max_seconds[name],
+                }
+                for name, count in self.counts.items()
+            }
+
+
+class PooledPgstacDB(PgstacDB):
+    """A PgstacDB that takes its connection from a shared PgSTAC pool.
+
+    Connecting acquires a connection from the pool; disconnecting returns
+    it. Connection acquire and query latencies are recorded in the
+    PgSTAC's metrics.
+    """
+
+    def __init__(self, pgstac: "PgSTAC", debug: bool = False) -> None:
+        super().__init__(dsn=None, debug=debug)
+        self._pgstac = pgstac
+
+    def get_pool(self) -> ConnectionPool:
+        self.pool = self._pgstac.get_pool()
+        return self.pool
+
+    def connect(self) -> psycopg.Connection:
+        if self.connection is None:
+            with self._pgstac.metrics.timed("acquire"):
+                return super().connect()
+        return super().connect()
+
+    def disconnect(self) -> None:
+        # PgstacDB registers disconnect to run at exit on every connect
+        atexit.unregister(self.disconnect)
+        super().disconnect()
+
+    def query(self, *args: Any, **kwargs: Any) -> Generator:
+        with self._pgstac.metrics.timed("query"):
+            yield from super().query(*args, **kwargs)
+
+    def close(self) -> None:
+        self._pgstac.close()
+
 
 class PgSTAC:
-    db: PgstacDB
+    """
+    Client for a PgSTAC database, backed by a pool of connections.
+
+    ``db`` is a :class:`PooledPgstacDB` for the current thread, so threads
+    sharing a PgSTAC each work on their own connection. Idle connections are
+    health checked at most every ``check_interval`` seconds, and broken
+    connections are replaced.
+
+    Parameters
+    ----------
+    pg_connection_string: str
+        The connection string of the database.
+    min_size: int
+        The number of connections the pool keeps open.
+    max_size: int
+        The maximum number of connections in the pool. Loading groups
+        in parallel uses up to this many connections.
+    check_interval: float
+        Minimum number of seconds between health checks of idle connections.
+    debug: bool
+        Log PostgreSQL notices.
+    """
+
+    def __init__(
+        self,
+        pg_connection_string: str,
+        min_size: int = 1,
+        max_size: int = DEFAULT_POOL_MAX_SIZE,
+        check_interval: float = DEFAULT_POOL_CHECK_INTERVAL,
+        debug: bool = True,
+    ) -> None:
+        self.pg_connection_string = pg_connection_string
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.check_interval = check_interval
+        self.debug = debug
+        self.metrics = PgSTACMetrics()
+
+        self._pool: Optional[ConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._local = threading.local()
+
+    def get_pool(self) -> ConnectionPool:
+        """Get the connection pool, opening it if needed."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ConnectionPool(
+                    conninfo=self.pg_connection_string,
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    open=False,
+                )
+                self._pool.open()
+                self._last_check = time.monotonic()
+            elif time.monotonic() - self._last_check > self.check_interval:
+                self._last_check = time.monotonic()
+                self._pool.check()
+            return self._pool
 
-    def __init__(self, pg_connection_string: str) -> None:
-        self.db = PgstacDB(pg_connection_string, debug=True)
-        # self.db.connect()
-        self.loader = Loader(self.db)
+    def close(self) -> None:
+        """Close every connection in the pool."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
 
-    def _with_connection_retry(self, func: Callable[[], T], retries: int = 0) -> T:
+    @property
+    def db(self) -> PooledPgstacDB:
+        """The PgstacDB of the current thread."""
+        db: Optional[PooledPgstacDB] = getattr(self._local, "db", None)
+        if db is None:
+            db = PooledPgstacDB(self, debug=self.debug)
+            self._local.db = db
+            self._local.loader = Loader(db)
+        return db
+
+    @property
+    def loader(self) -> Loader:
+        """The Loader of the current thread."""
+        self.db
+        return cast(Loader, self._local.loader)
+
+    def _with_connection_retry(
+        self,
+        func: Callable[[], T],
+        retries: int = 0,
+        db: Optional[PgstacDB] = None,
+    ) -> T:
         """Tries a function against the DB, retires on connection timeout."""
         MAX_RETRIES = 1
+        db = db or self.db
         try:
             return func()
         except psycopg.OperationalError as e:
@@ -32,12 +273,18 @@ class PgSTAC:
                 logger.warning(f"  ...Connection broken; retrying connection: {e}")
                 if retries >= MAX_RETRIES:
                     raise
-                self.db.disconnect()
-                self.db.connect()
-                return self._with_connection_retry(func, retries + 1)
+                # Returning a broken connection discards it from the pool
+                db.disconnect()
+                db.connect()
+                return self._with_connection_retry(func, retries + 1, db=db)
             else:
                 raise
 
+    def _query(self, query: str, args: List[Any]) -> List[Any]:
+        return self._with_connection_retry(
+            lambda: list(self.db.query(query, args=args))
+        )
+
     def unique_items(
         self, items: Iterable[bytes], key_func: Callable[[bytes], Any]
     ) -> Iterable[bytes]:
@@ -53,21 +300,118 @@ class PgSTAC:
         items: Iterable[bytes],
         mode: Methods = Methods.upsert,
         insert_group_size: Optional[int] = None,
+        sizer: Optional[InsertGroupSizer] = None,
+        concurrency: int = 1,
     ) -> None:
+        """
+        Load items into the database, one transaction per group.
+
+        If ``sizer`` is provided, it chooses the size of each group, and
+        ``insert_group_size`` is ignored.
+
+        If ``concurrency`` is more than 1, up to that many groups are loaded
+        in parallel, each on its own connection from the pool. Items with
+        the same ID should then be in the same group.
+        """
+        concurrency = max(1, min(concurrency, self.max_size))
+        items = (item for item in items if item.strip())
+        if sizer:
+            self._ingest_sized_groups(items, mode, sizer, concurrency)
+            return
+
         if insert_group_size:
-            groups = grouped(items, insert_group_size)
+            groups: Iterable[Iterable[bytes]] = grouped(items, insert_group_size)
         else:
             groups = [items]
 
-        for i, group in enumerate(groups):
-            logger.info(f"  ...Loading group {i + 1}")
+        if concurrency == 1:
+            for i, group in enumerate(groups):
+                logger.info(f"  ...Loading group {i + 1}")
+                self._load_group(group, mode)
+            return
+
+        groups_iter = iter(groups)
+        i = 0
+        while True:
+            batch = [list(g) for g in itertools.islice(groups_iter, concurrency)]
+            if not batch:
+                break
+            logger.info(f"  ...Loading groups {i + 1}-{i + len(batch)} in parallel")
+            i += len(batch)
+            self._load_groups_parallel(batch, mode)
+
+    def _load_group(
+        self,
+        group: Iterable[bytes],
+        mode: Methods,
+        db: Optional[PooledPgstacDB] = None,
+    ) -> None:
+        if db is None or db is self.db:
+            db, loader = self.db, self.loader
+        else:
+            loader = Loader(db)
+        with self.metrics.timed("load"):
             self._with_connection_retry(
-                lambda: self.loader.load_items(
-                    iter(self.unique_items(group, lambda b: orjson.loads(b)["id"])),
+                lambda: loader.load_items(
+                    iter(self.unique_items(group, _item_key)),
                     insert_mode=mode,
-                )
+                ),
+                db=db,
             )
 
+    def _load_group_on_own_connection(self, group: List[bytes], mode: Methods) -> float:
+        db = PooledPgstacDB(self, debug=self.debug)
+        start = time.perf_counter()
+        with db:
+            self._load_group(group, mode, db=db)
+        return time.perf_counter() - start
+
+    def _load_groups_parallel(
+        self, groups: List[List[bytes]], mode: Methods
+    ) -> List[float]:
+        """Load groups in parallel, each in its own transaction and connection.
+
+        Returns the seconds taken to load each group.
+        """
+        if len(groups) == 1:
+            start = time.perf_counter()
+            self._load_group(groups[0], mode)
+            return [time.perf_counter() - start]
+
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            fs = [
+                pool.submit(self._load_group_on_own_connection, group, mode)
+                for group in groups
+            ]
+            # Raise the first error only after all loads have finished.
+            futures.wait(fs)
+            return [f.result() for f in fs]
+
+    def _ingest_sized_groups(
+        self,
+        items: Iterable[bytes],
+        mode: Methods,
+        sizer: InsertGroupSizer,
+        concurrency: int = 1,
+    ) -> None:
+        items_iter = iter(items)
+        i = 0
+        while True:
+            groups = []
+            for _ in range(concurrency):
+                group = list(itertools.islice(items_iter, sizer.size))
+                if not group:
+                    break
+                groups.append(group)
+            if not groups:
+                break
+            for group in groups:
+                i += 1
+                logger.info(f"  ...Loading group {i} ({len(group)} items)")
+            seconds = self._load_groups_parallel(groups, mode)
+            for group, group_seconds in zip(groups, seconds):
+                sizer.record(len(group), sum(len(b) for b in group), group_seconds)
+
     def ingest_collections(
         self,
         collections: Iterable[Dict[str, Any]],
@@ -87,24 +431,41 @@ class PgSTAC:
 
     def existing_items(self, collection_id: str, item_ids: Set[str]) -> Set[str]:
         """The IDs of Items that already exist in the database."""
-        rows = self._with_connection_retry(
-            lambda: self.db.query(
-                """
-                SELECT id from items where id = ANY(%s) and collection = %s
+        rows = self._query(
+            """
+            SELECT id from items where id = ANY(%s) and collection = %s
             """,
-                args=[list(item_ids), collection_id],
-            )
+            [list(item_ids), collection_id],
+        )
+        return set([row[0] for row in rows if row])
+
+    def existing_item_keys(
+        self, keys: Iterable[Tuple[str, str]]
+    ) -> Set[Tuple[str, str]]:
+        """The (collection ID, item ID) pairs that already exist in the database.
+
+        Looks up items across any number of collections in a single query.
+        """
+        keys = set(keys)
+        if not keys:
+            return set()
+        collection_ids = list({collection_id for collection_id, _ in keys})
+        item_ids = list({item_id for _, item_id in keys})
+        rows = self._query(
+            """
+            SELECT collection, id from items
+            where id = ANY(%s) and collection = ANY(%s)
+            """,
+            [item_ids, collection_ids],
         )
-        return set([row[0] for row in rows])
+        return {(row[0], row[1]) for row in rows if row} & keys
 
     def collection_exists(self, collection_id: str) -> bool:
-        rows = self._with_connection_retry(
-            lambda: self.db.query(
-                """
-                SELECT id from collections where id = %s
+        rows = self._query(
+            """
+            SELECT id from collections where id = %s
             """,
-                args=[collection_id],
-            )
+            [collection_id],
         )
 
         return any(rows)
@@ -2,7 +2,7 @@ import json
 import logging
 import os
 import traceback
-from typing import Any, Dict, List, Optional, Tuple, TypedDict
+from typing import Any, Dict, List, Optional, Tuple, TypedDict, Union
 
 import azure.storage.queue
 
@@ -12,8 +12,8 @@ from pctasks.core.cosmos.containers.process_item_errors import (
 from pctasks.core.models.base import PCBaseModel
 from pctasks.core.models.event import IngestErrorType, IngestItemErrorRecord
 from pctasks.ingest.constants import DB_CONNECTION_STRING_ENV_VAR
+from pctasks.ingest_task.items import ingest_item, ingest_items
 from pctasks.ingest_task.pgstac import PgSTAC
-from pctasks.ingest_task.task import ingest_item
 from pctasks.task.context import TaskContext
 from pctasks.task.streaming import (
     NoOutput,
@@ -69,6 +69,7 @@ class StreamingIngestItemsTask(
         pgstac: Optional[PgSTAC] = extra_options["pgstac"]
         if pgstac:
             pgstac.db.close()
+            pgstac.close()
         extra_options["process_item_errors_container"].__exit__(None, None, None)
 
     def process_message(
@@ -77,17 +78,25 @@ class StreamingIngestItemsTask(
         input: StreamingTaskInput,
         context: TaskContext,
         extra_options: ExtraOptions,
-    ) -> Tuple[Optional[Dict[str, Any]], Any]:
+    ) -> Tuple[Optional[Union[Dict[str, Any], List[Dict[str, Any]]]], Any]:
+        """
+        Ingest the STAC item(s) in ``message``.
+
+        The message is either a single STAC item or, when items are packed
+        by the publisher, a JSON array of STAC items. A packed message is
+        loaded in a single transaction.
+        """
         assert isinstance(input, StreamingIngestItemsInput)
 
         pgstac = extra_options["pgstac"]
         # What errors can occur here?
         # 1. This message might not be valid JSON.
         # 2. The pgstac ingest might fail.
-        item = err = None
+        item: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None
+        err = None
         error_id = f"{message.id}:{context.run_id}:{message.dequeue_count}"
         try:
-            item = json.loads(message.content)
+            data = json.loads(message.content)
         except json.JSONDecodeError:
             logger.exception("Error decoding message for ingest")
             err = IngestItemErrorRecord(
@@ -99,12 +108,18 @@ class StreamingIngestItemsTask(
                 traceback=traceback.format_exc(),
             )
         else:
-            logger.info(
-                "Loading item collection=%s id=%s", item["collection"], item["id"]
-            )
+            item = data
+            items: List[Dict[str, Any]] = data if isinstance(data, list) else [data]
+            for i in items:
+                logger.info(
+                    "Loading item collection=%s id=%s", i["collection"], i["id"]
+                )
 
             try:
-                ingest_item(pgstac, item)
+                if isinstance(data, list):
+                    ingest_items(pgstac, items)
+                else:
+                    ingest_item(pgstac, data)
             except Exception:
                 logger.exception("Error during ingest")
                 err = IngestItemErrorRecord(
@@ -122,7 +137,7 @@ class StreamingIngestItemsTask(
         self,
         message: azure.storage.queue.QueueMessage,
         context: TaskContext,
-        result: Tuple[Dict[str, Any], Any],
+        result: Tuple[Any, Any],
         extra_options: ExtraOptions,
     ) -> None:
         _, err = result
@@ -1,8 +1,16 @@
+import json
 import logging
 import os
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
-from pctasks.core.models.event import STACCollectionEventType, STACItemEventType
+from pctasks.core.cosmos.containers.process_item_errors import (
+    ProcessItemErrorsContainer,
+)
+from pctasks.core.models.event import (
+    IngestItemErrorRecord,
+    STACCollectionEventType,
+    STACItemEventType,
+)
 from pctasks.core.models.task import FailedTaskResult, WaitTaskResult
 from pctasks.ingest.constants import (
     COLLECTIONS_MESSAGE_TYPE,
@@ -12,13 +20,14 @@ from pctasks.ingest.constants import (
 from pctasks.ingest.models import (
     CollectionIngestTaskOutput,
     IngestCollectionsInput,
+    IngestItemsInput,
     IngestNdjsonInput,
     IngestTaskInput,
     IngestTaskOutput,
     ItemIngestTaskOutput,
 )
 from pctasks.ingest_task.collection import ingest_collection, ingest_collections
-from pctasks.ingest_task.items import ingest_item, ingest_ndjsons
+from pctasks.ingest_task.items import ingest_items_with_status, ingest_ndjsons
 from pctasks.ingest_task.pgstac import PgSTAC
 from pctasks.task.context import TaskContext
 from pctasks.task.task import Task
@@ -40,6 +49,47 @@ class IngestError(Exception):
     pass
 
 
+def record_item_errors(error_records: List[IngestItemErrorRecord]) -> None:
+    """
+    Write error records for items that failed to ingest.
+
+    Failing to record the errors doesn't fail the ingest; the failed items
+    are also written to error NDJSONs.
+    """
+    try:
+        with ProcessItemErrorsContainer(IngestItemErrorRecord) as container:
+            container.bulk_put(error_records)
+    except Exception:
+        logger.exception(f"Failed to record {len(error_records)} item errors")
+
+
+def ingest_features(
+    pgstac: PgSTAC, items: List[Dict[str, Any]]
+) -> List[ItemIngestTaskOutput]:
+    """Ingest STAC Items in a single load, with an output for each item."""
+    for item in items:
+        if not item.get("id"):
+            raise IngestError("Item must contain an id")
+        if not item.get("geometry"):
+            raise IngestError(f"Item {item['id']} must contain a geometry")
+        if not item.get("collection"):
+            raise IngestError(f"Item {item['id']} must contain a collection")
+
+    created = ingest_items_with_status(pgstac, items)
+
+    return [
+        ItemIngestTaskOutput(
+            collection_id=item["collection"],
+            item_id=item["id"],
+            geometry=item["geometry"],
+            event_type=(
+                STACItemEventType.CREATED if is_new else STACItemEventType.UPDATED
+            ),
+        )
+        for item, is_new in zip(items, created)
+    ]
+
+
 class IngestTask(Task[IngestTaskInput, IngestTaskOutput]):
     _input_model = IngestTaskInput
     _output_model = IngestTaskOutput
@@ -54,74 +104,67 @@ class IngestTask(Task[IngestTaskInput, IngestTaskOutput]):
 
         conn_str = os.environ[DB_CONNECTION_STRING_ENV_VAR]
 
-        pgstac = PgSTAC(conn_str)
-
-        with pgstac.db:
-
-            item_id: Optional[str] = None
-
-            if isinstance(content, IngestNdjsonInput):
-                ndjson_uris: List[str]
-                uris = content.uris
-                if uris:
-                    if isinstance(uris, str):
-                        ndjson_uris = [uris]
+        # One connection for the task, plus one per parallel group load
+        pgstac = PgSTAC(conn_str, max_size=input.options.load_concurrency + 1)
+
+        try:
+            with pgstac.db:
+                if isinstance(content, IngestNdjsonInput):
+                    ndjson_uris: List[str]
+                    uris = content.uris
+                    if uris:
+                        if isinstance(uris, str):
+                            ndjson_uris = [uris]
+                        else:
+                            ndjson_uris = uris
                     else:
-                        ndjson_uris = uris
-                else:
-                    folder_config = content.ndjson_folder
-                    if not folder_config:
-                        # Should be caught by the validator
-                        raise IngestError(
-                            "Either ndjson_folder or uris must be provided."
+                        folder_config = content.ndjson_folder
+                        if not folder_config:
+                            # Should be caught by the validator
+                            raise IngestError(
+                                "Either ndjson_folder or uris must be provided."
+                            )
+                        ndjson_storage = context.storage_factory.get_storage(
+                            folder_config.uri
                         )
-                    ndjson_storage = context.storage_factory.get_storage(
-                        folder_config.uri
+                        ndjson_uris = [
+                            ndjson_storage.get_uri(path)
+                            for path in ndjson_storage.list_files(
+                                name_starts_with=folder_config.name_starts_with,
+                                extensions=folder_config.extensions,
+                                ends_with=folder_config.ends_with,
+                                matches=folder_config.matches,
+                            )
+                        ]
+                        if folder_config.limit:
+                            ndjson_uris = ndjson_uris[: folder_config.limit]
+
+                    ndjsons_result = ingest_ndjsons(
+                        pgstac,
+                        ndjson_uris,
+                        storage_factory=context.storage_factory,
+                        ingest_config=input.options,
+                        run_id=context.run_id,
+                    )
+                    if ndjsons_result.error_records:
+                        record_item_errors(ndjsons_result.error_records)
+                    result = IngestTaskOutput(
+                        bulk_load=True,
+                        failed_item_count=len(ndjsons_result.failed_items),
+                        error_uris=ndjsons_result.error_uris or None,
+                        insert_group_sizes=ndjsons_result.insert_group_sizes,
+                        items_per_second=ndjsons_result.items_per_second,
+                    )
+
+                elif isinstance(content, IngestItemsInput):
+                    result = IngestTaskOutput(
+                        items=ingest_features(pgstac, content.items)
                     )
-                    ndjson_uris = [
-                        ndjson_storage.get_uri(path)
-                        for path in ndjson_storage.list_files(
-                            name_starts_with=folder_config.name_starts_with,
-                            extensions=folder_config.extensions,
-                            ends_with=folder_config.ends_with,
-                            matches=folder_config.matches,
-                        )
-                    ]
-                    if folder_config.limit:
-                        ndjson_uris = ndjson_uris[: folder_config.limit]
-
-                ingest_ndjsons(
-                    pgstac, ndjson_uris, storage_factory=context.storage_factory
-                )
-                result = IngestTaskOutput(bulk_load=True)
-
-            elif isinstance(content, IngestCollectionsInput):
-                collections_to_status = ingest_collections(pgstac, content.collections)
-                result = IngestTaskOutput(
-                    collections=[
-                        CollectionIngestTaskOutput(
-                            collection_id=collection_id,
-                            event_type=(
-                                STACCollectionEventType.CREATED
-                                if inserted
-                                else STACCollectionEventType.UPDATED
-                            ),
-                        )
-                        for collection_id, inserted in collections_to_status.items()
-                    ]
-                )
-            else:
-                assert isinstance(content, dict)
-                ingest_type = content.get("type")
-                if not ingest_type:
-                    raise Exception("Ingest task data must contain a type")
-
-                if ingest_type == "Collection":
-                    collection_id = content.get("id")
-                    if not collection_id:
-                        raise IngestError("Collection must contain an id")
-                    inserted = ingest_collection(pgstac, content)
 
+                elif isinstance(content, IngestCollectionsInput):
+                    collections_to_status = ingest_collections(
+                        pgstac, content.collections
+                    )
                     result = IngestTaskOutput(
                         collections=[
                             CollectionIngestTaskOutput(
@@ -132,52 +175,52 @@ class IngestTask(Task[IngestTaskInput, IngestTaskOutput]):
                                     else STACCollectionEventType.UPDATED
                                 ),
                             )
-                        ]
-                    )
-
-                elif ingest_type == "Feature":
-                    item_id = content.get("id")
-                    if not item_id:
-                        raise IngestError("Item must contain an id")
-                    geometry = content.get("geometry")
-                    if not geometry:
-                        raise IngestError("Item must contain a geometry")
-                    collection_id = content.get("collection")
-                    if not collection_id:
-                        raise IngestError("Item must contain a collection")
-
-                    inserted = item_id not in pgstac.existing_items(
-                        collection_id, {item_id or ""}
-                    )
-
-                    # Ingest item
-                    ingest_item(pgstac, content)
-
-                    result = IngestTaskOutput(
-                        items=[
-                            ItemIngestTaskOutput(
-                                collection_id=collection_id,
-                                item_id=item_id,
-                                geometry=geometry,
-                                event_type=(
-                                    STACItemEventType.CREATED
-                                    if not inserted
-                                    else STACItemEventType.UPDATED
-                                ),
-                            )
+                            for collection_id, inserted in collections_to_status.items()
                         ]
                     )
                 else:
-                    # Check for message validation errors that
-                    # caused fallback to Dict[str, Any]
-                    if ingest_type == COLLECTIONS_MESSAGE_TYPE:
-                        IngestCollectionsInput(**content)
-                    if ingest_type == NDJSON_MESSAGE_TYPE:
-                        IngestNdjsonInput(**content)
-
-                    raise ValueError(f"Unknown type {ingest_type}")
+                    assert isinstance(content, dict)
+                    ingest_type = content.get("type")
+                    if not ingest_type:
+                        raise Exception("Ingest task data must contain a type")
+
+                    if ingest_type == "Collection":
+                        collection_id = content.get("id")
+                        if not collection_id:
+                            raise IngestError("Collection must contain an id")
+                        inserted = ingest_collection(pgstac, content)
+
+                        result = IngestTaskOutput(
+                            collections=[
+                                CollectionIngestTaskOutput(
+                                    collection_id=collection_id,
+                                    event_type=(
+                                        STACCollectionEventType.CREATED
+                                        if inserted
+                                        else STACCollectionEventType.UPDATED
+                                    ),
+                                )
+                            ]
+                        )
 
-            return result
+                    elif ingest_type == "Feature":
+                        result = IngestTaskOutput(
+                            items=ingest_features(pgstac, [content])
+                        )
+                    else:
+                        # Check for message validation errors that
+                        # caused fallback to Dict[str, Any]
+                        if ingest_type == COLLECTIONS_MESSAGE_TYPE:
+                            IngestCollectionsInput(**content)
+                        if ingest_type == NDJSON_MESSAGE_TYPE:
+                            IngestNdjsonInput(**content)
+
+                        raise ValueError(f"Unknown type {ingest_type}")
+        finally:
+            logger.info(f"Database metrics: {json.dumps(pgstac.metrics.as_dict())}")
+            pgstac.close()
+
+        return result
 
 
 ingest_task = IngestTask()
@@ -2,8 +2,12 @@ import json
 import pathlib
 
 import orjson
+import pytest
+from pypgstac.load import Methods
 
+from pctasks.core.models.event import IngestErrorType, STACItemEventType
 from pctasks.core.models.task import FailedTaskResult
+from pctasks.core.storage import StorageFactory
 from pctasks.dev.mocks import MockTaskContext
 from pctasks.ingest.models import (
     IngestNdjsonInput,
@@ -11,8 +15,16 @@ from pctasks.ingest.models import (
     IngestTaskInput,
     NdjsonFolder,
 )
-from pctasks.ingest_task.pgstac import PgSTAC
-from pctasks.ingest_task.task import ingest_task
+from pctasks.ingest.settings import IngestOptions
+from pctasks.ingest_task.items import (
+    FailedItem,
+    IngestFailedException,
+    bisect_ingest,
+    ingest_ndjsons,
+    write_failed_items,
+)
+from pctasks.ingest_task.pgstac import InsertGroupSizer, PgSTAC
+from pctasks.ingest_task.task import IngestError, ingest_features, ingest_task
 from tests.conftest import ingest_test_environment
 
 HERE = pathlib.Path(__file__).parent
@@ -168,3 +180,186 @@ def test_unique_items_deduplication():
     unique_ids = [orjson.loads(item)["id"] for item in unique_items]
     assert len(set(unique_ids)) == 3
     assert set(unique_ids) == {"item1", "item2", "item3"}
+
+
+class BadItemPgSTAC:
+    """Fails any load containing an item with a "bad" ID."""
+
+    def __init__(self):
+        self.committed = []
+
+    def ingest_items(
+        self, items, mode=Methods.upsert, insert_group_size=None, sizer=None
+    ):
+        ids = [orjson.loads(item)["id"] for item in items]
+        if any(id.startswith("bad") for id in ids):
+            raise ValueError("bad item")
+        self.committed.extend(ids)
+
+
+def test_bisect_ingest():
+    ids = [f"item-{i}" for i in range(10)]
+    ids[3] = "bad-1"
+    ids[7] = "bad-2"
+    lines = [("test.ndjson", orjson.dumps({"id": id})) for id in ids]
+    lines.append(("other.ndjson", b"not json"))
+    pgstac = BadItemPgSTAC()
+    failed_items = []
+
+    ingested = bisect_ingest(pgstac, lines, Methods.upsert, failed_items)
+
+    assert ingested == 8
+    assert sorted(pgstac.committed) == sorted(
+        id for id in ids if not id.startswith("bad")
+    )
+    assert [orjson.loads(f.line)["id"] for f in failed_items[:2]] == [
+        "bad-1",
+        "bad-2",
+    ]
+    assert failed_items[2].ndjson_uri == "other.ndjson"
+    assert failed_items[2].error_type == IngestErrorType.INVALID_DATA
+    assert failed_items[0].error_type == IngestErrorType.ITEM_INGEST
+
+
+def test_write_failed_items(tmp_path):
+    uri = str(tmp_path / "items.ndjson")
+    failed_items = [
+        FailedItem(
+            ndjson_uri=uri,
+            line=line,
+            error_type=IngestErrorType.ITEM_INGEST,
+            traceback="",
+        )
+        for line in [b'{"id": "a"}', b'{"id": "b"}']
+    ]
+
+    error_uris = write_failed_items(failed_items, StorageFactory())
+
+    assert error_uris == [f"{uri}.failed"]
+    with open(error_uris[0]) as f:
+        assert f.read().splitlines() == ['{"id": "a"}', '{"id": "b"}']
+
+
+def test_ingest_ndjsons_error_budget(tmp_path):
+    ndjsons = []
+    for chunk in range(2):
+        path = tmp_path / f"chunk-{chunk}.ndjson"
+        ids = [f"item-{chunk}-{i}" for i in range(5)]
+        if chunk == 1:
+            ids[2] = "bad-item"
+        path.write_bytes(b"\n".join(orjson.dumps({"id": id}) for id in ids))
+        ndjsons.append(str(path))
+
+    pgstac = BadItemPgSTAC()
+    result = ingest_ndjsons(
+        pgstac,  # type: ignore[arg-type]
+        ndjsons,
+        StorageFactory(),
+        IngestOptions(max_item_errors=1),
+        run_id="test-run",
+    )
+    assert len(pgstac.committed) == 9
+    assert [r.run_id for r in result.error_records] == ["test-run"]
+    assert result.error_uris == [f"{ndjsons[1]}.failed"]
+
+    with pytest.raises(IngestFailedException):
+        ingest_ndjsons(
+            BadItemPgSTAC(),  # type: ignore[arg-type]
+            ndjsons,
+            StorageFactory(),
+            IngestOptions(max_item_errors=0),
+        )
+
+
+def test_insert_group_sizer():
+    sizer = InsertGroupSizer(1000, target_seconds=10, max_size=3000)
+    # Fast loads grow the group size, at most doubling each time
+    sizer.record(1000, 1_000_000, 1.0)
+    assert sizer.size == 2000
+    sizer.record(2000, 2_000_000, 1.0)
+    assert sizer.size == 3000
+    # Slow loads shrink it
+    sizer.record(3000, 3_000_000, 20.0)
+    assert sizer.size == 1500
+    assert sizer.sizes == [1000, 2000, 3000]
+    assert sizer.items_per_second == 6000 / 22.0
+
+    fixed = InsertGroupSizer(1000)
+    fixed.record(1000, 1_000_000, 1.0)
+    assert fixed.size == 1000
+
+
+class ExistingItemsPgSTAC:
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.queries = 0
+        self.loads = []
+
+    def existing_item_keys(self, keys):
+        self.queries += 1
+        return set(keys) & self.existing
+
+    def ingest_items(self, items, mode=Methods.upsert, **kwargs):
+        self.loads.append([orjson.loads(item)["id"] for item in items])
+
+
+def test_ingest_features():
+    items = [
+        {
+            "type": "Feature",
+            "id": f"item-{i}",
+            "collection": "test",
+            "geometry": {"type": "Point", "coordinates": [0, 0]},
+        }
+        for i in range(3)
+    ]
+    pgstac = ExistingItemsPgSTAC({("test", "item-1")})
+
+    outputs = ingest_features(pgstac, items)
+
+    assert pgstac.queries == 1
+    assert pgstac.loads == [["item-0", "item-1", "item-2"]]
+    assert [(o.item_id, o.event_type) for o in outputs] == [
+        ("item-0", STACItemEventType.CREATED),
+        ("item-1", STACItemEventType.UPDATED),
+        ("item-2", STACItemEventType.CREATED),
+    ]
+
+    with pytest.raises(IngestError):
+        ingest_features(pgstac, [{"id": "no-geometry", "collection": "test"}])
+
+
+def test_ingest_ndjsons_skips_empty_chunks(tmp_path):
+    class RecordingPgSTAC:
+        def __init__(self):
+            self.attempts = 0
+            self.loads = []
+
+        def ingest_items(self, items, **kwargs):
+            self.attempts += 1
+            self.loads.append([orjson.loads(item)["id"] for item in items])
+
+    ndjsons = []
+    for chunk in range(5):
+        path = tmp_path / f"chunk-{chunk}.ndjson"
+        ids = [] if chunk % 2 == 0 else [f"item-{chunk}-{i}" for i in range(2)]
+        path.write_bytes(b"\n".join(orjson.dumps({"id": id}) for id in ids))
+        ndjsons.append(str(path))
+
+    pgstac = RecordingPgSTAC()
+    result = ingest_ndjsons(
+        pgstac,  # type: ignore[arg-type]
+        ndjsons,
+        StorageFactory(),
+        IngestOptions(),
+    )
+
+    # Loaded in one attempt, without blank lines for the empty chunks
+    assert pgstac.attempts == 1
+    assert sorted(pgstac.loads[0]) == [
+        "item-1-0",
+        "item-1-1",
+        "item-3-0",
+        "item-3-1",
+    ]
+    assert not result.failed_items
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import orjson
+from pypgstac.load import Methods
+
+from pctasks.ingest_task.pgstac import InsertGroupSizer, PgSTAC, PgSTACMetrics
+
+
+def test_metrics():
+    metrics = PgSTACMetrics()
+    metrics.record("query", 1.0)
+    metrics.record("query", 3.0)
+    with metrics.timed("acquire"):
+        pass
+
+    result = metrics.as_dict()
+    assert result["query"] == {
+        "count": 2,
+        "total_seconds": 4.0,
+        "mean_seconds": 2.0,
+        "max_seconds": 3.0,
+    }
+    assert result["acquire"]["count"] == 1
+
+
+def test_db_per_thread():
+    pgstac = PgSTAC("postgresql://localhost/not-connected")
+    main_db = pgstac.db
+    assert pgstac.db is main_db
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(pgstac.db))
+    thread.start()
+    thread.join()
+    assert other[0] is not main_db
+
+
+class ParallelLoadPgSTAC(PgSTAC):
+    def __init__(self) -> None:
+        super().__init__("postgresql://localhost/not-connected", max_size=3)
+        self.loaded = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _load_group_on_own_connection(self, group, mode):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+            self.loaded.append([orjson.loads(b)["id"] for b in group])
+        return 0.05
+
+    def _load_group(self, group, mode, db=None):
+        self._load_group_on_own_connection(group, mode)
+
+
+def test_parallel_group_loads():
+    items = [orjson.dumps({"id": f"item-{i}"}) for i in range(10)]
+
+    pgstac = ParallelLoadPgSTAC()
+    pgstac.ingest_items(items, Methods.upsert, insert_group_size=2, concurrency=3)
+    assert sorted(sum(pgstac.loaded, [])) == sorted(f"item-{i}" for i in range(10))
+    assert pgstac.max_active > 1
+    assert pgstac.max_active <= 3
+
+    pgstac = ParallelLoadPgSTAC()
+    sizer = InsertGroupSizer(4)
+    pgstac.ingest_items(items, Methods.upsert, sizer=sizer, concurrency=2)
+    assert sizer.sizes == [4, 4, 2]
+    assert pgstac.max_active == 2
@@ -1,6 +1,7 @@
 import json
 import pathlib
 
+import azure.storage.queue
 import pytest
 from pypgstac.db import PgstacDB
 
@@ -121,3 +122,36 @@ def test_streaming_ingest_items_task_errors(
                 assert record.run_id == "test"
                 assert record.attempt == 1
                 assert "JSONDecodeError" in record.traceback
+
+
+def test_process_message_packed_items(document):
+    class FakePgSTAC:
+        def __init__(self):
+            self.loads = []
+
+        def ingest_items(self, items):
+            self.loads.append([json.loads(item)["id"] for item in items])
+
+    item = document["data"]["item"]
+    items = [{**item, "id": f"item-{i}"} for i in range(3)]
+    message = azure.storage.queue.QueueMessage(content=json.dumps(items))
+    message.dequeue_count = 1
+    pgstac = FakePgSTAC()
+
+    task = streaming.StreamingIngestItemsTask()
+    result, err = task.process_message(
+        message,
+        input=streaming.StreamingIngestItemsInput(
+            streaming_options=StreamingTaskOptions(
+                queue_url="http://example.com/queue",
+                visibility_timeout=10,
+                resources={"limits": {}, "requests": {}},
+            )
+        ),
+        context=TaskContext(run_id="test", storage_factory=StorageFactory()),
+        extra_options={"pgstac": pgstac},  # type: ignore
+    )
+
+    assert err is None
+    assert result == items
+    assert pgstac.loads == [["item-0", "item-1", "item-2"]]
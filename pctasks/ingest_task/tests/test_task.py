@@ -0,0 +1,42 @@
+import contextlib
+from typing import Any, Iterator, List
+
+import pytest
+
+import pctasks.ingest_task.task
+from pctasks.core.storage import StorageFactory
+from pctasks.ingest.constants import DB_CONNECTION_STRING_ENV_VAR
+from pctasks.ingest.models import IngestTaskInput
+from pctasks.ingest_task.pgstac import PgSTACMetrics
+from pctasks.ingest_task.task import IngestTask
+from pctasks.task.context import TaskContext
+
+
+def test_pgstac_closed_when_ingest_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    closed: List[bool] = []
+
+    class FakePgSTAC:
+        def __init__(self, conn_str: str, **kwargs: Any) -> None:
+            self.metrics = PgSTACMetrics()
+
+        @property
+        def db(self) -> Any:
+            @contextlib.contextmanager
+            def _db() -> Iterator[None]:
+                yield
+
+            return _db()
+
+        def close(self) -> None:
+            closed.append(True)
+
+    monkeypatch.setattr(pctasks.ingest_task.task, "PgSTAC", FakePgSTAC)
+    monkeypatch.setenv(DB_CONNECTION_STRING_ENV_VAR, "postgresql://localhost/test")
+
+    with pytest.raises(ValueError, match="Unknown type"):
+        IngestTask().run(
+            IngestTaskInput(content={"type": "Unknown"}),
+            TaskContext(run_id="test", storage_factory=StorageFactory()),
+        )
+
+    assert closed == [True]
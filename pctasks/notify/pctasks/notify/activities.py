@@ -1,8 +1,10 @@
-from typing import List
-from urllib import request
+import asyncio
+import logging
+from threading import Lock
+from typing import List, Optional
 
 from pctasks.core.logging import RunLogger
-from pctasks.core.models.registration import STACItemEventRegistration
+from pctasks.notify.dispatcher import dispatch_webhooks
 from pctasks.notify.models import (
     NotifyEventGridChannelMessage,
     NotifyFetchMessage,
@@ -10,35 +12,49 @@ from pctasks.notify.models import (
     NotifyResult,
     NotifyWebhookMessage,
 )
+from pctasks.notify.registrations import WebhookRegistrationCache
 from pctasks.notify.settings import NotificationSettings
 
+logger = logging.getLogger(__name__)
+
+_registration_cache: Optional[WebhookRegistrationCache] = None
+_registration_cache_lock = Lock()
+
+
+def get_registration_cache(settings: NotificationSettings) -> WebhookRegistrationCache:
+    global _registration_cache
+    with _registration_cache_lock:
+        if _registration_cache is None:
+            _registration_cache = WebhookRegistrationCache(
+                settings.get_webhook_registration_table,
+                ttl_seconds=settings.registration_cache_seconds,
+            )
+        return _registration_cache
+
 
 def fetch_listeners(
     msg: NotifyFetchMessage, event_logger: RunLogger
 ) -> NotifyFetchResult:
     settings = NotificationSettings.get()
+    registrations = get_registration_cache(settings).get_matching(
+        msg.notification, msg.target_environment
+    )
+    return NotifyFetchResult(registrations=registrations)
 
-    registrations: List[STACItemEventRegistration] = []
-    with settings.get_webhook_registration_table() as table:
-        registration_key = table.get_registration_key(
-            msg.notification, msg.target_environment
-        )
-        if registration_key:
-            for registration in table.get_registrations(registration_key):
-                if registration.matches(msg.notification.event):
-                    registrations.append(registration)
 
-    return NotifyFetchResult(registrations=registrations)
+def send_to_webhooks(
+    msgs: List[NotifyWebhookMessage], event_logger: RunLogger
+) -> List[NotifyResult]:
+    """Send events to webhooks, batching and pooling requests per endpoint."""
+    results = asyncio.run(dispatch_webhooks(msgs))
+    for msg, result in zip(msgs, results):
+        if not result.success:
+            logger.warning(f"Notify failed to send to webhook: {msg.endpoint}")
+    return results
 
 
 def send_to_webhook(msg: NotifyWebhookMessage, event_logger: RunLogger) -> NotifyResult:
-    try:
-        req = request.Request(msg.endpoint, data=msg.event.json().encode("utf-8"))
-        resp = request.urlopen(req)
-        return NotifyResult(success=resp.status == 200)
-    except Exception:
-        event_logger.log(f"Notify failed to send to webhook: {msg.endpoint}")
-        return NotifyResult(success=False)
+    return send_to_webhooks([msg], event_logger)[0]
 
 
 def send_to_eventgrid(
@@ -46,8 +62,8 @@ def send_to_eventgrid(
 ) -> NotifyResult:
     # TODO
     try:
-        event_logger.log(f"TODO: send to eventgrid: {msg.channel_info}")
+        logger.info(f"TODO: send to eventgrid: {msg.channel_info}")
         return NotifyResult()
     except Exception:
-        event_logger.log("Notify failed to send to eventgrid!")
+        logger.exception("Notify failed to send to eventgrid!")
         return NotifyResult(success=False)
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import aiohttp
+
+from pctasks.core.models.event import CloudEvent
+from pctasks.core.utils import grouped
+from pctasks.notify.models import NotifyResult, NotifyWebhookMessage
+from pctasks.notify.settings import NotificationSettings
+
+logger = logging.getLogger(__name__)
+
+CLOUDEVENTS_CONTENT_TYPE = "application/cloudevents+json"
+CLOUDEVENTS_BATCH_CONTENT_TYPE = "application/cloudevents-batch+json"
+
+# Responses that are retried; other errors are reported as failures.
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class EndpointMetrics:
+    requests: int = 0
+    events: int = 0
+    failures: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def _percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "requests": self.requests,
+            "events": self.events,
+            "failures": self.failures,
+            "latency_p50": round(_percentile(0.5), 4),
+            "latency_p95": round(_percentile(0.95), 4),
+            "latency_max": round(latencies[-1] if latencies else 0.0, 4),
+        }
+
+
+class DeliveryMetrics:
+    """Webhook delivery counts and latencies (including retries) per endpoint."""
+
+    def __init__(self) -> None:
+        self.endpoints: Dict[str, EndpointMetrics] = defaultdict(EndpointMetrics)
+
+    def record(self, endpoint: str, events: int, success: bool, seconds: float) -> None:
+        metrics = self.endpoints[endpoint]
+        metrics.requests += 1
+        metrics.events += events
+        if not success:
+            metrics.failures += 1
+        metrics.latencies.append(seconds)
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {endpoint: m.as_dict() for endpoint, m in self.endpoints.items()}
+
+
+class WebhookDispatcher:
+    """Delivers CloudEvents to webhook endpoints.
+
+    Requests share a pooled HTTP session. Each endpoint gets at most
+    ``endpoint_concurrency`` concurrent requests. Events for the same
+    endpoint are batched into requests of up to ``batch_size`` events. A
+    batch of one is posted as a single structured CloudEvent; larger
+    batches use the CloudEvents JSON batch format. Connection errors,
+    timeouts and throttling or server error responses are retried with
+    exponential backoff.
+
+    Use as an async context manager.
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: float = 10,
+        max_connections: int = 100,
+        endpoint_concurrency: int = 4,
+        batch_size: int = 1,
+        max_retries: int = 3,
+        retry_wait_seconds: float = 0.5,
+    ) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.max_connections = max_connections
+        self.endpoint_concurrency = endpoint_concurrency
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.retry_wait_seconds = retry_wait_seconds
+        self.metrics = DeliveryMetrics()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def from_settings(cls, settings: NotificationSettings) -> "WebhookDispatcher":
+        return cls(
+            timeout_seconds=settings.webhook_timeout_seconds,
+            max_connections=settings.webhook_max_connections,
+            endpoint_concurrency=settings.webhook_endpoint_concurrency,
+            batch_size=settings.webhook_batch_size,
+            max_retries=settings.webhook_max_retries,
+        )
+
+    async def __aenter__(self) -> "WebhookDispatcher":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+        )
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if not self._session:
+            raise ValueError("Session not initialized. Use as a context manager.")
+        return self._session
+
+    def _get_semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        if endpoint not in self._semaphores:
+            self._semaphores[endpoint] = asyncio.Semaphore(self.endpoint_concurrency)
+        return self._semaphores[endpoint]
+
+    async def send(self, endpoint: str, events: Sequence[CloudEvent]) -> bool:
+        """Send events to an endpoint in a single request.
+
+        Returns True if the endpoint accepted the request.
+        """
+        session = self._ensure_session()
+        if len(events) == 1:
+            body = events[0].json()
+            content_type = CLOUDEVENTS_CONTENT_TYPE
+        else:
+            body = "[" + ",".join(event.json(indent=None) for event in events) + "]"
+            content_type = CLOUDEVENTS_BATCH_CONTENT_TYPE
+
+        start = time.perf_counter()
+        success = False
+        for attempt in range(self.max_retries + 1):
+            retry = False
+            try:
+                async with self._get_semaphore(endpoint):
+                    async with session.post(
+                        endpoint,
+                        data=body.encode("utf-8"),
+                        headers={"Content-Type": content_type},
+                    ) as resp:
+                        success = 200 <= resp.status < 300
+                        retry = resp.status in RETRY_STATUSES
+                        if not success:
+                            logger.warning(
+                                f"Webhook {endpoint} responded with {resp.status}"
+                            )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Failed to send to webhook {endpoint}: {e!r}")
+                retry = True
+
+            if success or not retry or attempt == self.max_retries:
+                break
+            await asyncio.sleep(self.retry_wait_seconds * 2**attempt)
+
+        self.metrics.record(endpoint, len(events), success, time.perf_counter() - start)
+        return success
+
+    async def dispatch(
+        self, messages: Sequence[NotifyWebhookMessage]
+    ) -> List[NotifyResult]:
+        """Deliver each message's event to its endpoint.
+
+        Returns a result for each message, in order.
+        """
+        by_endpoint: Dict[str, List[int]] = defaultdict(list)
+        for i, msg in enumerate(messages):
+            by_endpoint[msg.endpoint].append(i)
+
+        results = [NotifyResult(success=False) for _ in messages]
+
+        async def _send_batch(endpoint: str, indexes: Sequence[int]) -> None:
+            success = await self.send(endpoint, [messages[i].event for i in indexes])
+            for i in indexes:
+                results[i] = NotifyResult(success=success)
+
+        await asyncio.gather(
+            *(
+                _send_batch(endpoint, list(batch))
+                for endpoint, indexes in by_endpoint.items()
+                for batch in grouped(indexes, self.batch_size)
+            )
+        )
+        return results
+
+
+async def dispatch_webhooks(
+    messages: Sequence[NotifyWebhookMessage],
+    settings: Optional[NotificationSettings] = None,
+) -> List[NotifyResult]:
+    """Deliver webhook messages with a dispatcher configured from settings."""
+    settings = settings or NotificationSettings.get()
+    async with WebhookDispatcher.from_settings(settings) as dispatcher:
+        results = await dispatcher.dispatch(messages)
+    for endpoint, metrics in dispatcher.metrics.as_dict().items():
+        logger.info(f"Webhook delivery to {endpoint}: {metrics}")
+    return results
@@ -0,0 +1,70 @@
+import logging
+from threading import Lock
+from typing import Callable, List, Optional
+
+from cachetools import TTLCache
+
+from pctasks.core.models.event import NotificationMessage
+from pctasks.core.models.registration import STACItemEventRegistration
+from pctasks.core.tables.registration import STACWebHookEventRegistrationTable
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookRegistrationCache:
+    """In-process cache of STAC item webhook registrations.
+
+    Registrations are loaded from the registration table per registration
+    key (collection and target environment) on first use, and reloaded
+    after ``ttl_seconds``. Keys without registrations are cached too.
+
+    Call :meth:`invalidate` when registrations are known to have changed.
+    """
+
+    def __init__(
+        self,
+        get_table: Callable[[], STACWebHookEventRegistrationTable],
+        ttl_seconds: float = 60,
+        max_keys: int = 10_000,
+    ) -> None:
+        self._get_table = get_table
+        self._cache: TTLCache = TTLCache(maxsize=max_keys, ttl=ttl_seconds)
+        self._lock = Lock()
+
+    def get_registrations(
+        self, registration_key: str
+    ) -> List[STACItemEventRegistration]:
+        with self._lock:
+            registrations = self._cache.get(registration_key)
+            if registrations is None:
+                with self._get_table() as table:
+                    registrations = table.get_registrations(registration_key)
+                logger.debug(
+                    f"Loaded {len(registrations)} webhook registrations "
+                    f"for {registration_key}"
+                )
+                self._cache[registration_key] = registrations
+            return registrations
+
+    def get_matching(
+        self, notification: NotificationMessage, target_environment: Optional[str]
+    ) -> List[STACItemEventRegistration]:
+        """Get the registrations that match the notification's event."""
+        registration_key = self._get_table().get_registration_key(
+            notification, target_environment
+        )
+        if not registration_key:
+            return []
+        return [
+            registration
+            for registration in self.get_registrations(registration_key)
+            if registration.matches(notification.event)
+        ]
+
+    def invalidate(self, registration_key: Optional[str] = None) -> None:
+        """Drop cached registrations for a key, or for all keys."""
+        with self._lock:
+            if registration_key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(registration_key, None)
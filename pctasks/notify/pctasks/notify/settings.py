@@ -1,6 +1,6 @@
 from typing import Optional
 
-from cachetools import cachedmethod
+from cachetools import Cache, LRUCache, cachedmethod
 
 from pctasks.core.constants import DEFAULT_WEBHOOKS_TABLE_NAME
 from pctasks.core.settings import PCTasksSettings
@@ -11,6 +11,9 @@ class TableNames:
     WEBHOOKS_TABLE_NAME: str = DEFAULT_WEBHOOKS_TABLE_NAME
 
 
+_table_cache: Cache = LRUCache(maxsize=10)
+
+
 class NotificationSettings(PCTasksSettings):
     @classmethod
     def section_name(cls) -> str:
@@ -21,13 +24,26 @@ class NotificationSettings(PCTasksSettings):
     tables_account_name: str
     tables_account_key: Optional[str] = None
     stac_webhooks_table_name: str = DEFAULT_WEBHOOKS_TABLE_NAME
+    # How long webhook registrations are cached in process
+    registration_cache_seconds: int = 60
+
+    # Webhook delivery
+    webhook_timeout_seconds: float = 10
+    webhook_max_connections: int = 100
+    # Maximum number of concurrent requests to a single endpoint
+    webhook_endpoint_concurrency: int = 4
+    # Maximum number of events sent to an endpoint in one request.
+    # Batches of more than one event are sent in CloudEvents batch mode,
+    # which the endpoint must support.
+    webhook_batch_size: int = 1
+    webhook_max_retries: int = 3
 
     @cachedmethod(
-        lambda self: self._cache,
-        key=lambda self, target: (
+        lambda self: _table_cache,
+        key=lambda self: (
             self.section_name(),
-            DEFAULT_WEBHOOKS_TABLE_NAME,
-            target,
+            self.tables_account_url,
+            self.stac_webhooks_table_name,
         ),
     )
     def get_webhook_registration_table(self) -> STACWebHookEventRegistrationTable:
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pctasks.core.models.event import CloudEvent
+from pctasks.notify.dispatcher import (
+    CLOUDEVENTS_BATCH_CONTENT_TYPE,
+    CLOUDEVENTS_CONTENT_TYPE,
+    WebhookDispatcher,
+)
+from pctasks.notify.models import NotifyWebhookMessage
+
+
+def make_event(i: int) -> CloudEvent:
+    return CloudEvent(
+        type="Microsoft.PlanetaryComputer.ItemCreated",
+        source="/microsoft/collections/test",
+        subject=f"/items/item-{i}",
+        data={"collection_id": "test", "item_id": f"item-{i}"},
+    )
+
+
+async def start_server(
+    received: Dict[str, List[Any]], fail_first: int = 0
+) -> TestServer:
+    failures = {"remaining": fail_first}
+
+    async def _handle(request: web.Request) -> web.Response:
+        if request.match_info["name"] == "broken":
+            return web.Response(status=400)
+        if failures["remaining"] > 0:
+            failures["remaining"] -= 1
+            return web.Response(status=503)
+        received[request.match_info["name"]].append(
+            (request.content_type, await request.json())
+        )
+        return web.Response(status=200)
+
+    app = web.Application()
+    app.router.add_post("/{name}", _handle)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+async def test_dispatch_batches_per_endpoint() -> None:
+    received: Dict[str, List[Any]] = {"a": [], "b": []}
+    server = await start_server(received)
+    try:
+        url_a = str(server.make_url("/a"))
+        url_b = str(server.make_url("/b"))
+        messages = [
+            NotifyWebhookMessage(
+                endpoint=url_a if i % 2 else url_b, event=make_event(i)
+            )
+            for i in range(7)
+        ]
+        async with WebhookDispatcher(batch_size=2) as dispatcher:
+            results = await dispatcher.dispatch(messages)
+
+        assert all(r.success for r in results)
+        assert len(received["a"]) == 2  # 3 events
+        assert len(received["b"]) == 2  # 4 events
+        content_types = {ct for ct, _ in received["a"] + received["b"]}
+        assert content_types == {
+            CLOUDEVENTS_BATCH_CONTENT_TYPE,
+            CLOUDEVENTS_CONTENT_TYPE,
+        }
+        subjects = sorted(
+            e["subject"]
+            for _, body in received["a"] + received["b"]
+            for e in (body if isinstance(body, list) else [body])
+        )
+        assert subjects == sorted(f"/items/item-{i}" for i in range(7))
+
+        metrics = dispatcher.metrics.as_dict()
+        assert metrics[url_a]["events"] == 3
+        assert metrics[url_b]["requests"] == 2
+    finally:
+        await server.close()
+
+
+async def test_dispatch_retries_and_reports_failures() -> None:
+    received: Dict[str, List[Any]] = {"ok": []}
+    server = await start_server(received, fail_first=1)
+    try:
+        ok = NotifyWebhookMessage(
+            endpoint=str(server.make_url("/ok")), event=make_event(0)
+        )
+        broken = NotifyWebhookMessage(
+            endpoint=str(server.make_url("/broken")), event=make_event(1)
+        )
+        async with WebhookDispatcher(retry_wait_seconds=0) as dispatcher:
+            results = await dispatcher.dispatch([ok, broken])
+
+        assert [r.success for r in results] == [True, False]
+        assert len(received["ok"]) == 1
+        assert dispatcher.metrics.as_dict()[broken.endpoint]["failures"] == 1
+    finally:
+        await server.close()
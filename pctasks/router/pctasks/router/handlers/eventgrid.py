@@ -1,12 +1,28 @@
-from typing import Any, Dict, List
+from threading import Lock
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 from pctasks.core.message_handler import MessageHandler
 from pctasks.core.models.event import CloudEvent
 from pctasks.core.models.workflow import Workflow, WorkflowSubmitMessage
-from pctasks.core.queues import QueueService
+from pctasks.router.queues import get_queue_client
+from pctasks.router.registrations import BlobTriggerRegistrationIndex
 from pctasks.router.settings import RouterSettings
 
+_registration_index: Optional[BlobTriggerRegistrationIndex] = None
+_registration_index_lock = Lock()
+
+
+def get_registration_index(settings: RouterSettings) -> BlobTriggerRegistrationIndex:
+    global _registration_index
+    with _registration_index_lock:
+        if _registration_index is None:
+            _registration_index = BlobTriggerRegistrationIndex(
+                settings.get_blob_trigger_registration_table,
+                ttl_seconds=settings.registration_cache_seconds,
+            )
+        return _registration_index
+
 
 def handle_blob_event(event: CloudEvent) -> bool:
     if not event.type.startswith("Microsoft.Storage"):
@@ -14,29 +30,23 @@ def handle_blob_event(event: CloudEvent) -> bool:
     if not event.subject:
         return False
 
-    submit_messages: List[WorkflowSubmitMessage] = []
     settings = RouterSettings.get()
 
-    with settings.get_blob_trigger_registration_table() as table:
-        registration_key = table.get_registration_key(event)
-        if registration_key:
-            for reg in table.get_registrations(registration_key=registration_key):
-                if reg.matches(event):
-                    submit_messages.append(
-                        WorkflowSubmitMessage(
-                            run_id=uuid4().hex,
-                            workflow=Workflow.from_definition(reg.workflow),
-                            trigger_event=event,
-                        )
-                    )
+    submit_messages: List[WorkflowSubmitMessage] = [
+        WorkflowSubmitMessage(
+            run_id=uuid4().hex,
+            workflow=Workflow.from_definition(reg.workflow),
+            trigger_event=event,
+        )
+        for reg in get_registration_index(settings).get_matching(event)
+    ]
 
     if submit_messages:
-        with QueueService.from_connection_string(
-            connection_string=settings.queues_connection_string,
-            queue_name=settings.workflow_queue_name,
-        ) as queue:
-            for submit_message in submit_messages:
-                queue.send_message(submit_message.json().encode())
+        queue = get_queue_client(
+            settings.queues_connection_string, settings.workflow_queue_name
+        )
+        for submit_message in submit_messages:
+            queue.send_message(submit_message.json().encode())
 
     return True
 
@@ -3,7 +3,7 @@ from typing import Any, Callable, Dict
 import orjson
 
 from pctasks.core.message_handler import MessageHandler
-from pctasks.core.queues import QueueService
+from pctasks.router.queues import get_queue_client
 from pctasks.router.settings import RouterSettings
 
 
@@ -13,8 +13,7 @@ class ForwardingMessageHandler(MessageHandler):
 
     def handle(self, message: Dict[str, Any]) -> None:
         settings = RouterSettings.get()
-        with QueueService.from_connection_string(
-            connection_string=settings.queues_connection_string,
-            queue_name=self.get_queue_name(settings),
-        ) as queue:
-            queue.send_message(orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY))
+        queue = get_queue_client(
+            settings.queues_connection_string, self.get_queue_name(settings)
+        )
+        queue.send_message(orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY))
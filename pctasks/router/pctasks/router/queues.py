@@ -0,0 +1,39 @@
+import atexit
+import logging
+from threading import Lock
+from typing import Dict, Tuple
+
+from azure.storage.queue import QueueClient
+
+from pctasks.core.queues import QueueService
+
+logger = logging.getLogger(__name__)
+
+_queues: Dict[Tuple[str, str], Tuple[QueueService, QueueClient]] = {}
+_queues_lock = Lock()
+
+
+def get_queue_client(connection_string: str, queue_name: str) -> QueueClient:
+    """Get a queue client that is reused across messages in this process."""
+    key = (connection_string, queue_name)
+    with _queues_lock:
+        if key not in _queues:
+            service = QueueService.from_connection_string(
+                connection_string=connection_string, queue_name=queue_name
+            )
+            _queues[key] = (service, service.__enter__())
+        return _queues[key][1]
+
+
+def close_queue_clients() -> None:
+    """Close the queue clients of this process. Runs at exit."""
+    with _queues_lock:
+        for (_, queue_name), (service, _) in _queues.items():
+            try:
+                service.__exit__()
+            except Exception:
+                logger.exception(f"Error closing queue client for {queue_name}")
+        _queues.clear()
+
+
+atexit.register(close_queue_clients)
@@ -0,0 +1,112 @@
+import logging
+import re
+from threading import Lock
+from typing import Callable, List, Optional, Pattern
+
+from cachetools import TTLCache
+
+from pctasks.core.models.event import CloudEvent
+from pctasks.core.models.registration import BlobTriggerEventRegistration
+from pctasks.core.tables.registration import BlobTriggerEventRegistrationTable
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledBlobTriggerRegistration:
+    """A BlobTriggerEventRegistration with its filter regexes compiled."""
+
+    __slots__ = ("registration", "event_type", "subject_pattern", "source_pattern")
+
+    def __init__(self, registration: BlobTriggerEventRegistration) -> None:
+        self.registration = registration
+        self.event_type = registration.event_type
+        self.subject_pattern: Optional[Pattern[str]] = None
+        self.source_pattern: Optional[Pattern[str]] = None
+        if f := registration.event_filter:
+            if f.subject_matches:
+                self.subject_pattern = re.compile(f.subject_matches)
+            if f.source_matches:
+                self.source_pattern = re.compile(f.source_matches)
+
+    def matches(self, event: CloudEvent) -> bool:
+        """Same as BlobTriggerEventRegistration.matches"""
+        if self.event_type != event.type:
+            return False
+        if self.subject_pattern:
+            if not event.subject or not self.subject_pattern.match(event.subject):
+                return False
+        if self.source_pattern:
+            if not self.source_pattern.match(event.source):
+                return False
+        return True
+
+
+class BlobTriggerRegistrationIndex:
+    """In-process index of blob trigger registrations.
+
+    Registrations are loaded from the registration table per registration
+    key (storage account and container) on first use, and reloaded after
+    ``ttl_seconds``. Keys without registrations are cached too, so events
+    for containers nobody registered don't hit the table.
+
+    Call :meth:`invalidate` when registrations are known to have changed.
+    """
+
+    def __init__(
+        self,
+        get_table: Callable[[], BlobTriggerEventRegistrationTable],
+        ttl_seconds: float = 60,
+        max_keys: int = 10_000,
+    ) -> None:
+        self._get_table = get_table
+        self._cache: TTLCache = TTLCache(maxsize=max_keys, ttl=ttl_seconds)
+        self._lock = Lock()
+        self._generation = 0
+
+    def get_registration_key(self, event: CloudEvent) -> Optional[str]:
+        return self._get_table().get_registration_key(event)
+
+    def get_registrations(
+        self, registration_key: str
+    ) -> List[CompiledBlobTriggerRegistration]:
+        # The lock only guards the cache; the table is queried outside it so
+        # a slow query doesn't hold up events for other keys.
+        with self._lock:
+            registrations = self._cache.get(registration_key)
+            generation = self._generation
+        if registrations is not None:
+            return registrations
+
+        with self._get_table() as table:
+            registrations = [
+                CompiledBlobTriggerRegistration(reg)
+                for reg in table.get_registrations(registration_key=registration_key)
+            ]
+        logger.debug(
+            f"Loaded {len(registrations)} registrations for {registration_key}"
+        )
+        with self._lock:
+            # Don't cache what was loaded before an invalidation
+            if generation == self._generation:
+                self._cache[registration_key] = registrations
+        return registrations
+
+    def get_matching(self, event: CloudEvent) -> List[BlobTriggerEventRegistration]:
+        """Get the registrations that match the event."""
+        registration_key = self.get_registration_key(event)
+        if not registration_key:
+            return []
+        return [
+            reg.registration
+            for reg in self.get_registrations(registration_key)
+            if reg.matches(event)
+        ]
+
+    def invalidate(self, registration_key: Optional[str] = None) -> None:
+        """Drop cached registrations for a key, or for all keys."""
+        with self._lock:
+            self._generation += 1
+            if registration_key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(registration_key, None)
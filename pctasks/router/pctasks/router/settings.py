@@ -1,6 +1,6 @@
 from typing import Optional
 
-from cachetools import cachedmethod
+from cachetools import Cache, LRUCache, cachedmethod
 
 from pctasks.core.constants import (
     DEFAULT_BLOB_TRIGGER_REGISTRATION_TABLE_NAME,
@@ -10,6 +10,8 @@ from pctasks.core.constants import (
 from pctasks.core.settings import PCTasksSettings
 from pctasks.core.tables.registration import BlobTriggerEventRegistrationTable
 
+_table_cache: Cache = LRUCache(maxsize=10)
+
 
 class RouterSettings(PCTasksSettings):
     @classmethod
@@ -28,12 +30,15 @@ class RouterSettings(PCTasksSettings):
     blob_trigger_registration_table_name: str = (
         DEFAULT_BLOB_TRIGGER_REGISTRATION_TABLE_NAME
     )
+    # How long blob trigger registrations are cached in process
+    registration_cache_seconds: int = 60
 
     @cachedmethod(
-        lambda self: self._settings_cache,
+        lambda self: _table_cache,
         key=lambda self: (
             self.section_name(),
-            DEFAULT_BLOB_TRIGGER_REGISTRATION_TABLE_NAME,
+            self.tables_account_url,
+            self.blob_trigger_registration_table_name,
         ),
     )
     def get_blob_trigger_registration_table(self) -> BlobTriggerEventRegistrationTable:
@@ -0,0 +1,38 @@
+from typing import Any, List
+
+import pytest
+
+from pctasks.router import queues
+
+
+class FakeQueueService:
+    def __init__(self, closed: List[str], queue_name: str) -> None:
+        self.closed = closed
+        self.queue_name = queue_name
+
+    def __enter__(self) -> str:
+        return self.queue_name
+
+    def __exit__(self, *args: Any) -> None:
+        if self.queue_name == "broken":
+            raise RuntimeError("boom")
+        self.closed.append(self.queue_name)
+
+
+def test_close_queue_clients(monkeypatch: pytest.MonkeyPatch) -> None:
+    closed: List[str] = []
+    monkeypatch.setattr(queues, "_queues", {})
+    monkeypatch.setattr(
+        queues.QueueService,
+        "from_connection_string",
+        lambda connection_string, queue_name: FakeQueueService(closed, queue_name),
+    )
+
+    assert queues.get_queue_client("conn", "a") == "a"
+    assert queues.get_queue_client("conn", "a") == "a"
+    queues.get_queue_client("conn", "broken")
+    queues.get_queue_client("conn", "b")
+
+    queues.close_queue_clients()
+    assert closed == ["a", "b"]
+    assert queues._queues == {}
@@ -0,0 +1,134 @@
+from typing import Any, List
+
+from pctasks.core.models.event import CloudEvent
+from pctasks.core.models.registration import BlobTriggerEventRegistration, EventFilter
+from pctasks.core.models.task import TaskDefinition
+from pctasks.core.models.workflow import JobDefinition, WorkflowDefinition
+from pctasks.core.tables.registration import BlobTriggerEventRegistrationTable
+from pctasks.router.registrations import BlobTriggerRegistrationIndex
+
+EVENT_TYPE = "Microsoft.Storage.BlobCreated"
+SOURCE = (
+    "/subscriptions/sub/resourceGroups/rg/providers"
+    "/Microsoft.Storage/storageAccounts/account"
+)
+
+
+class FakeTable(BlobTriggerEventRegistrationTable):
+    def __init__(self, registrations: List[BlobTriggerEventRegistration]) -> None:
+        self.registrations = registrations
+        self.queries: List[str] = []
+
+    def __enter__(self) -> "FakeTable":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def get_registrations(
+        self, registration_key: str
+    ) -> List[BlobTriggerEventRegistration]:
+        self.queries.append(registration_key)
+        return [
+            r
+            for r in self.registrations
+            if f"{r.storage_account}||{r.container}" == registration_key
+        ]
+
+
+def make_registration(
+    container: str, subject_matches: str
+) -> BlobTriggerEventRegistration:
+    return BlobTriggerEventRegistration(
+        event_type=EVENT_TYPE,
+        storage_account="account",
+        container=container,
+        event_filter=EventFilter(subject_matches=subject_matches, source_matches=None),
+        workflow=WorkflowDefinition(
+            name="workflow",
+            dataset="test",
+            jobs={
+                "job": JobDefinition(
+                    tasks=[TaskDefinition(id="task", task="task", image="image")]
+                )
+            },
+        ),
+    )
+
+
+def make_event(container: str, path: str) -> CloudEvent:
+    return CloudEvent(
+        type=EVENT_TYPE,
+        source=SOURCE,
+        subject=f"/blobServices/default/containers/{container}/blobs/{path}",
+        data={},
+    )
+
+
+def test_index_matches_and_caches_by_container() -> None:
+    tif = make_registration("data", ".*\\.tif$")
+    json_ = make_registration("data", ".*\\.json$")
+    table = FakeTable([tif, json_])
+    index = BlobTriggerRegistrationIndex(lambda: table, ttl_seconds=60)
+
+    assert index.get_matching(make_event("data", "a.tif")) == [tif]
+    assert index.get_matching(make_event("data", "b.json")) == [json_]
+    assert index.get_matching(make_event("data", "c.txt")) == []
+    assert index.get_matching(make_event("other", "a.tif")) == []
+    assert index.get_matching(make_event("other", "b.tif")) == []
+    assert table.queries == ["account||data", "account||other"]
+
+    # Compiled matching agrees with the registration model
+    for event in [make_event("data", "a.tif"), make_event("data", "c.txt")]:
+        assert [
+            r.registration
+            for r in index.get_registrations("account||data")
+            if r.matches(event)
+        ] == [r for r in [tif, json_] if r.matches(event)]
+
+
+def test_index_invalidate_reloads() -> None:
+    table = FakeTable([])
+    index = BlobTriggerRegistrationIndex(lambda: table, ttl_seconds=60)
+    assert index.get_matching(make_event("data", "a.tif")) == []
+
+    tif = make_registration("data", ".*\\.tif$")
+    table.registrations.append(tif)
+    assert index.get_matching(make_event("data", "a.tif")) == []
+
+    index.invalidate("account||data")
+    assert index.get_matching(make_event("data", "a.tif")) == [tif]
+
+
+def test_index_queries_outside_the_lock() -> None:
+    tif = make_registration("data", ".*\\.tif$")
+    table = FakeTable([tif])
+    index = BlobTriggerRegistrationIndex(lambda: table, ttl_seconds=60)
+
+    def _get_registrations(registration_key: str) -> List[Any]:
+        assert not index._lock.locked()
+        return FakeTable.get_registrations(table, registration_key)
+
+    table.get_registrations = _get_registrations  # type: ignore
+    assert index.get_matching(make_event("data", "a.tif")) == [tif]
+    assert index.get_matching(make_event("data", "a.tif")) == [tif]
+    assert table.queries == ["account||data"]
+
+
+def test_index_does_not_cache_loads_from_before_invalidate() -> None:
+    table = FakeTable([])
+    index = BlobTriggerRegistrationIndex(lambda: table, ttl_seconds=60)
+    tif = make_registration("data", ".*\\.tif$")
+
+    def _get_registrations(registration_key: str) -> List[Any]:
+        result = FakeTable.get_registrations(table, registration_key)
+        # Registrations change while the table is being queried
+        table.registrations.append(tif)
+        index.invalidate(registration_key)
+        return result
+
+    table.get_registrations = _get_registrations  # type: ignore
+    assert index.get_matching(make_event("data", "a.tif")) == []
+
+    del table.get_registrations
+    assert index.get_matching(make_event("data", "a.tif")) == [tif]
@@ -1,5 +1,7 @@
 import logging
-from datetime import datetime, timedelta
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, cast
 
 import azure.batch.models as batchmodels
@@ -28,6 +30,7 @@ from pctasks.core.utils.credential import get_credential
 from pctasks.run.batch.model import BatchJobInfo
 from pctasks.run.batch.task import BatchTask
 from pctasks.run.batch.utils import make_unique_job_id
+from pctasks.run.constants import MAX_TASKS_PER_COLLECTION
 from pctasks.run.settings import BatchSettings
 
 logger = logging.getLogger(__name__)
@@ -43,6 +46,29 @@ def cloud_task_to_add_task(
     )
 
 
+def task_failure_message(task: batchmodels.BatchTask) -> Optional[str]:
+    """The error message of a completed task that failed.
+
+    Returns None if the task didn't fail.
+    """
+    execution_info = task.execution_info
+    if (
+        not execution_info
+        or execution_info.result != batchmodels.BatchTaskExecutionResult.FAILURE
+    ):
+        return None
+    if execution_info.failure_info and execution_info.failure_info.message:
+        return execution_info.failure_info.message
+    return "Azure Batch task failed without error message"
+
+
+def format_odata_datetime(dt: datetime) -> str:
+    """Format a datetime for an OData filter on the Batch API."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return f"datetime'{dt.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]}Z'"
+
+
 class BatchClientError(Exception):
     pass
 
@@ -234,44 +260,107 @@ class BatchClient:
     ) -> List[Optional[batchmodels.BatchError]]:
         """Adds a collection of BatchTasks to the Batch job.
 
+        Tasks are split into collections of at most
+        MAX_TASKS_PER_COLLECTION, which are submitted concurrently on up to
+        ``submit_threads`` threads. Tasks that fail to be added with a
+        server error are resubmitted in their own collection.
+
         Returns an optional list of errors corresponding to each task.
         If no error occurred for a task, the list entry will be None.
         """
-        client = self._ensure_client()
+        self._ensure_client()
         params = [task.to_params() for task in tasks]
-        _tasks = batchmodels.BatchTaskGroup(value=params)
-        try:
-            result: batchmodels.BatchTaskAddCollectionResult = self._with_backoff(
-                lambda: client.create_task_collection(
-                    job_id=job_id,
-                    task_collection=_tasks,
-                )
-            )
-            task_results: List[batchmodels.TaskAddResult] = result.value  # type: ignore
-        except HttpResponseError:
-            logger.error("Failed to add tasks...")
-
-            # # for exc in e.error:
-            # #     exc = cast(Exception, exc)
-            # #     logger.error(" -- RETURNED EXCEPTION --")
-            # #     logger.error(exc)
+        chunks = [
+            params[i : i + MAX_TASKS_PER_COLLECTION]
+            for i in range(0, len(params), MAX_TASKS_PER_COLLECTION)
+        ]
 
-            # for task_add_result in e.failure_tasks:
-            #     task_add_result = cast(batchmodels.TaskAddResult, task_add_result)
+        start = time.perf_counter()
+        if len(chunks) > 1 and self.settings.submit_threads > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(self.settings.submit_threads, len(chunks))
+            ) as pool:
+                chunk_errors = list(
+                    pool.map(lambda c: self._add_chunk(job_id, c), chunks)
+                )
+        else:
+            chunk_errors = [self._add_chunk(job_id, chunk) for chunk in chunks]
+        elapsed = time.perf_counter() - start
+
+        errors = [e for c in chunk_errors for e in c]
+        submitted = sum(1 for e in errors if e is None)
+        logger.info(
+            f"(BATCH CLIENT) Submitted {submitted} of {len(params)} tasks to "
+            f"{job_id} in {len(chunks)} collections in {elapsed:.2f}s "
+            f"({submitted / elapsed if elapsed else 0:.1f} tasks/s)"
+        )
+        return errors
 
-            #     if task_add_result.error is None:
-            #         continue
+    def _add_chunk(
+        self,
+        job_id: str,
+        params: List[batchmodels.BatchTaskCreateContent],
+        max_retries: int = 3,
+    ) -> List[Optional[batchmodels.BatchError]]:
+        """Add a single task collection, retrying only tasks that hit
+        server errors.
 
-            #     batch_error = self._to_batch_error(task_add_result.error)
-            #     logger.error(
-            #         f"Failed to create task {task_add_result.task_id} with error: {batch_error.message.value}"  # noqa: E501
-            #     )
+        Errors raised for the whole collection are reported for each task,
+        so that one collection failing doesn't fail the others.
+        """
+        client = self._ensure_client()
+        errors: Dict[str, Optional[batchmodels.BatchError]] = {}
+        pending = params
+        for attempt in range(max_retries + 1):
+            try:
+                result: batchmodels.BatchTaskAddCollectionResult = self._with_backoff(
+                    lambda: client.create_task_collection(
+                        job_id=job_id,
+                        task_collection=batchmodels.BatchTaskGroup(value=pending),
+                    )
+                )
+            except Exception as e:
+                logger.exception(
+                    f"(BATCH CLIENT) Failed to add {len(pending)} tasks to {job_id}"
+                )
+                batch_error = self._to_batch_error(e)
+                for p in pending:
+                    errors[cast(str, p.id)] = batch_error
+                break
+
+            retry: List[batchmodels.BatchTaskCreateContent] = []
+            by_id = {cast(str, p.id): p for p in pending}
+            for r in result.value or []:
+                task_id = cast(str, r.task_id)
+                if r.status == batchmodels.BatchTaskAddStatus.SUCCESS:
+                    errors[task_id] = None
+                elif (
+                    attempt > 0 and r.error is not None and r.error.code == "TaskExists"
+                ):
+                    # Added by an earlier attempt that reported a server error.
+                    errors[task_id] = None
+                else:
+                    errors[task_id] = r.error
+                    if (
+                        r.status == batchmodels.BatchTaskAddStatus.SERVER_ERROR
+                        and task_id in by_id
+                    ):
+                        retry.append(by_id[task_id])
+
+            if not retry or attempt == max_retries:
+                break
+            logger.warning(
+                f"(BATCH CLIENT) Retrying {len(retry)} of {len(pending)} tasks "
+                f"added to {job_id} with server errors"
+            )
+            time.sleep(2**attempt)
+            pending = retry
 
-            #     if batch_error.values:
-            #         for detail in batch_error.values:
-            #             logger.error(f"  - {detail.key}: {detail.value}")
-            raise
-        return [r.error for r in task_results]
+        missing = batchmodels.BatchError(
+            code="TaskAddResultMissing",
+            message=BatchErrorMessage(value="No result returned for task"),
+        )
+        return [errors.get(cast(str, p.id), missing) for p in params]
 
     def get_job_info(self, job_id: str) -> BatchJobInfo:
         client = self._ensure_client()
@@ -493,28 +582,70 @@ class BatchClient:
             return (TaskRunStatus.SUBMITTED, None)
 
     def get_failed_tasks(self, job_id: str) -> Dict[str, str]:
-        client = self._ensure_client()
-        completed_tasks = client.list_tasks(job_id, filter="state eq 'completed'")
         result: Dict[str, str] = {}
-        for task in completed_tasks:
-            if execution_info := task.execution_info:
-                if (
-                    execution_info.result
-                    == batchmodels.BatchTaskExecutionResult.FAILURE
-                ):
-                    if task_id := task.id:
-                        if (
-                            execution_info.failure_info
-                            and execution_info.failure_info.message
-                        ):
-                            result[task_id] = execution_info.failure_info.message
-                        else:
-                            result[task_id] = (
-                                "Azure Batch task failed without error message"
-                            )
+        for task in self.list_completed_tasks(job_id):
+            if task.id and (message := task_failure_message(task)):
+                result[task.id] = message
 
         return result
 
+    def get_job_state(self, job_id: str) -> Optional[batchmodels.BatchJobState]:
+        """The state of a job, without listing its tasks.
+
+        Returns None if the job doesn't exist.
+        """
+        client = self._ensure_client()
+        try:
+            job = self._with_backoff(
+                lambda: client.get_job(job_id=job_id, select=["id", "state"])
+            )
+        except HttpResponseError as e:
+            if e.error and e.error.code == "JobNotFound":
+                return None
+            raise
+        return cast(Optional[batchmodels.BatchJobState], cast(BatchJob, job).state)
+
+    def list_completed_tasks(
+        self, job_id: str, since: Optional[datetime] = None
+    ) -> Iterable[batchmodels.BatchTask]:
+        """List the completed tasks of a job.
+
+        If ``since`` is set, only tasks that changed state at or after
+        ``since`` are listed. Only the ID, state transition time and
+        execution info of each task are fetched.
+        """
+        client = self._ensure_client()
+        filter = "state eq 'completed'"
+        if since is not None:
+            filter += f" and stateTransitionTime ge {format_odata_datetime(since)}"
+        return cast(
+            Iterable[batchmodels.BatchTask],
+            client.list_tasks(
+                job_id,
+                filter=filter,
+                select=["id", "stateTransitionTime", "executionInfo"],
+            ),
+        )
+
+    def list_changed_tasks(
+        self, job_id: str, since: datetime
+    ) -> Iterable[batchmodels.BatchTask]:
+        """List the tasks of a job, in any state, that changed state at or
+        after ``since``.
+
+        Only the ID, state, state transition time and execution info of
+        each task are fetched.
+        """
+        client = self._ensure_client()
+        return cast(
+            Iterable[batchmodels.BatchTask],
+            client.list_tasks(
+                job_id,
+                filter=f"stateTransitionTime ge {format_odata_datetime(since)}",
+                select=["id", "state", "stateTransitionTime", "executionInfo"],
+            ),
+        )
+
     def get_pool(self, pool_id: str) -> Optional[batchmodels.BatchPoolInfo]:
         client = self._ensure_client()
 
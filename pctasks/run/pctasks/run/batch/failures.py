@@ -0,0 +1,130 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+import azure.batch.models as batchmodels
+from azure.core.exceptions import HttpResponseError
+
+from pctasks.run.batch.client import BatchClient, task_failure_message
+from pctasks.run.batch.model import BatchJobState
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WATERMARK_OVERLAP = timedelta(minutes=1)
+
+
+@dataclass
+class JobFailures:
+    failed_tasks: Dict[str, str] = field(default_factory=dict)
+    """Batch task IDs of failed tasks to their error messages."""
+
+    watermark: Optional[datetime] = None
+    """The latest state transition time of the completed tasks seen."""
+
+
+class BatchFailureTracker:
+    """Tracks the failed tasks of Azure Batch jobs incrementally.
+
+    Each poll reads the job state with a single job request. The first poll
+    of a job lists its completed tasks; later polls list only the tasks that
+    changed state since the last poll, by state transition time. The
+    failures seen so far are kept in memory per job. Tasks that were
+    reactivated are removed until they fail again. Jobs that completed or
+    no longer exist are dropped after being polled, and :meth:`forget`
+    drops jobs that are terminated.
+
+    Tasks are listed from ``overlap`` before the latest transition time
+    seen, so that tasks whose completion is recorded late aren't missed.
+
+    Parameters
+    ----------
+    batch_client: BatchClient
+        An initialized BatchClient.
+    overlap: timedelta
+        How far before the watermark to list tasks from.
+    """
+
+    def __init__(
+        self,
+        batch_client: BatchClient,
+        overlap: timedelta = DEFAULT_WATERMARK_OVERLAP,
+    ) -> None:
+        self.batch_client = batch_client
+        self.overlap = overlap
+        self._jobs: Dict[str, JobFailures] = {}
+        self._lock = Lock()
+
+    def _update(self, job_id: str, failures: JobFailures) -> None:
+        since = failures.watermark - self.overlap if failures.watermark else None
+        watermark = failures.watermark
+        listed = 0
+        tasks = (
+            self.batch_client.list_completed_tasks(job_id)
+            if since is None
+            else self.batch_client.list_changed_tasks(job_id, since=since)
+        )
+        for task in tasks:
+            listed += 1
+            if not task.id:
+                continue
+            # Reactivated tasks keep the execution info of their last run
+            completed = (
+                since is None or task.state == batchmodels.BatchTaskState.COMPLETED
+            )
+            message = task_failure_message(task) if completed else None
+            if message:
+                failures.failed_tasks[task.id] = message
+            else:
+                failures.failed_tasks.pop(task.id, None)
+            if task.state_transition_time and (
+                watermark is None or task.state_transition_time > watermark
+            ):
+                watermark = task.state_transition_time
+        failures.watermark = watermark
+        logger.debug(f"(BATCH) Listed {listed} tasks in job {job_id} since {since}")
+
+    def get_failed_tasks(self, job_id: str) -> Tuple[Dict[str, str], bool]:
+        """Checks for failed tasks in a Job.
+
+        Returns a dictionary of task IDs to error messages for specific task
+        failures. Returns True in the second value if the job failed.
+        """
+        job_state = None
+        job_state_error = False
+        try:
+            job_state = self.batch_client.get_job_state(job_id)
+        except HttpResponseError:
+            # Keep tracking the job; its state is checked again next poll.
+            logger.exception(f"(BATCH) Error getting job state for {job_id}.")
+            job_state_error = True
+        job_missing = job_state is None and not job_state_error
+
+        with self._lock:
+            failures = self._jobs.setdefault(job_id, JobFailures())
+            try:
+                if not job_missing:
+                    self._update(job_id, failures)
+            except Exception:
+                # Don't let a Batch API error fail the job; report the
+                # failures seen so far.
+                logger.exception("(BATCH) Error getting failed tasks.")
+            failed_tasks = dict(failures.failed_tasks)
+            if job_missing or job_state == batchmodels.BatchJobState.COMPLETED:
+                # Nothing more will change
+                self._jobs.pop(job_id, None)
+
+        job_failed = job_missing
+        if job_state is not None:
+            job_failed = (
+                BatchJobState.from_batch(job_state, failed_tasks=bool(failed_tasks))
+                == BatchJobState.FAILED
+            )
+
+        return failed_tasks, job_failed
+
+    def forget(self, job_id: str) -> None:
+        """Drop the failures tracked for a job."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
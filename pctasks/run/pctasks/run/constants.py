@@ -38,6 +38,9 @@ class EventNames:
 
 MAX_MISSING_POLLS = 5
 
+# Azure Batch limit on the number of tasks added in a single request
+MAX_TASKS_PER_COLLECTION = 100
+
 # Template paths
 
 JOBS_TEMPLATE_PATH = "jobs"
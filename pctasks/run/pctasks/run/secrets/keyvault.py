@@ -1,16 +1,14 @@
-import threading
 from typing import Any, Optional, Union
 
 from azure.identity import ClientSecretCredential, DefaultAzureCredential
 from azure.keyvault.secrets import SecretClient
-from cachetools import Cache, LRUCache, TTLCache, cachedmethod
+from cachetools import Cache, LRUCache, cachedmethod
 
 from pctasks.core.utils.backoff import with_backoff
 from pctasks.core.utils.credential import get_credential
 from pctasks.run.secrets.base import SecretsProvider
 from pctasks.run.settings import RunSettings
-
-secret_lock = threading.Lock()
+from pctasks.run.task.cache import SECRET, get_task_data_cache
 
 
 class KeyvaultSecretsProvider(SecretsProvider):
@@ -32,7 +30,6 @@ class KeyvaultSecretsProvider(SecretsProvider):
         client_secret = settings.keyvault_sp_client_secret or None
 
         self._client: Optional[SecretClient] = None
-        self._cache: Cache = TTLCache(maxsize=128, ttl=60)
 
         if tenant_id and client_id and client_secret:
             self._creds = ClientSecretCredential(tenant_id, client_id, client_secret)
@@ -50,18 +47,20 @@ class KeyvaultSecretsProvider(SecretsProvider):
         if self._client:
             self._client.close()
 
-    @cachedmethod(lambda self: self._cache)
     def _fetch_secret(self, name: str) -> str:
         return with_backoff(
             lambda: self._client.get_secret(name).value  # type:ignore
         )
 
     def get_secret(self, name: str) -> str:
+        """Get a secret, using the process-wide task data cache."""
         if not self._client:
             raise ValueError("Must be used as a context manager")
+        assert self.settings
 
-        with secret_lock:
-            return self._fetch_secret(name)
+        return get_task_data_cache(self.settings).get(
+            SECRET, (self.keyvault_url, name), lambda: self._fetch_secret(name)
+        )
 
     @classmethod
     @cachedmethod(lambda cls: cls._cache, key=lambda _, settings: settings.keyvault_url)
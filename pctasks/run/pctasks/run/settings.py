@@ -61,6 +61,11 @@ class RunSettings(PCTasksSettings):
     check_output_seconds: int = 3
     check_status_blob_seconds: int = 5
 
+    # How long and how many image configs, secrets and SAS tokens
+    # to cache while preparing tasks
+    task_data_cache_seconds: int = 300
+    task_data_cache_size: int = 1024
+
     # Dev
     local_dev_endpoints_url: Optional[str] = None
     local_secrets: bool = False
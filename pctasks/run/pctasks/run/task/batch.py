@@ -6,13 +6,13 @@ from threading import Lock
 from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import cachetools
-from azure.core.exceptions import HttpResponseError
 
 from pctasks.core.models.run import TaskRunStatus
 from pctasks.core.models.task import TaskDefinition
 from pctasks.core.utils import map_opt
 from pctasks.run.batch.client import BatchClient
-from pctasks.run.batch.model import BatchJobState, BatchTaskId
+from pctasks.run.batch.failures import BatchFailureTracker
+from pctasks.run.batch.model import BatchTaskId
 from pctasks.run.batch.task import BatchTask
 from pctasks.run.batch.utils import make_valid_batch_id
 from pctasks.run.constants import MAX_MISSING_POLLS
@@ -74,6 +74,7 @@ class BatchTaskRunner(TaskRunner):
     def __init__(self, settings: RunSettings):
         super().__init__(settings)
         self._batch_client: Optional[BatchClient] = None
+        self._failure_tracker: Optional[BatchFailureTracker] = None
         self.response_cache: cachetools.Cache = cachetools.TTLCache(
             maxsize=100, ttl=self.settings.batch_cache_seconds
         )
@@ -82,18 +83,25 @@ class BatchTaskRunner(TaskRunner):
         logger.info("Initializing Batch client...")
         self._batch_client = BatchClient(self.settings.batch_settings)
         self._batch_client.__enter__()
+        self._failure_tracker = BatchFailureTracker(self._batch_client)
         return self
 
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         if self._batch_client:
             self._batch_client.__exit__(exc_type, exc_val, exc_tb)
             self._batch_client = None
+            self._failure_tracker = None
 
     def _get_batch_client(self) -> BatchClient:
         if not self._batch_client:
             raise BatchTaskRunnerError("Batch client not initialized.")
         return self._batch_client
 
+    def _get_failure_tracker(self) -> BatchFailureTracker:
+        if not self._failure_tracker:
+            raise BatchTaskRunnerError("Batch client not initialized.")
+        return self._failure_tracker
+
     def prepare_task_info(
         self,
         dataset_id: str,
@@ -188,7 +196,16 @@ class BatchTaskRunner(TaskRunner):
                 # Set code directory to working directory,
                 # as Azure Batch doesn't allow containers to
                 # modify system or user directories.
-                environ={"PCTASKS_TASK__CODE_DIR": "./_code"},
+                # Cache code and requirements in the node's shared
+                # directory so tasks on the same node can reuse them,
+                # along with any STAC schemas fetched for validation.
+                environ={
+                    "PCTASKS_TASK__CODE_DIR": "./_code",
+                    "PCTASKS_TASK__CACHE_DIR": "$AZ_BATCH_NODE_SHARED_DIR/pctasks",
+                    "PCTASKS_STAC_SCHEMA_CACHE_DIR": (
+                        "$AZ_BATCH_NODE_SHARED_DIR/pctasks/stac-schemas"
+                    ),
+                },
             )
 
             batch_submits[BatchJobInfo(batch_job_id, pool_id)].append(
@@ -291,37 +308,16 @@ class BatchTaskRunner(TaskRunner):
             if cache_key in self.response_cache:
                 return self.response_cache[cache_key]
             else:
-                batch_client = self._get_batch_client()
-
-                job_failed = False
-
-                try:
-                    job_info = batch_client.get_job_info(job_id)
-                    job_failed = job_info.state == BatchJobState.FAILED
-                except HttpResponseError as e:
-                    error = e.error  # Avoid type hinting error
-                    if error and error.code == "JobNotFound":
-                        job_failed = True
-                    else:
-                        logger.exception(
-                            f"(BATCH) Error getting job info for {job_id}."
-                        )
-
                 logger.info(
                     "(BATCH) Polling task runner for "
                     f"failed tasks in job {job_id}..."
                 )
-                try:
-                    failed_tasks = batch_client.get_failed_tasks(job_id)
-                except Exception:
-                    logger.exception("(BATCH) Error getting failed tasks.")
-                    # Don't let a Batch API error fail the job;
-                    # consider it as "no reported failures"
-                    failed_tasks = {}
-
-                total_failed = [len(failed_tasks)]
-                if total_failed:
-                    logger.info(f"(BATCH)  - {sum(total_failed)} failed tasks found.")
+                failed_tasks, job_failed = self._get_failure_tracker().get_failed_tasks(
+                    job_id
+                )
+
+                if failed_tasks:
+                    logger.info(f"(BATCH)  - {len(failed_tasks)} failed tasks found.")
                 else:
                     logger.info("(BATCH)  - No failed tasks found.")
 
@@ -377,3 +373,4 @@ class BatchTaskRunner(TaskRunner):
         if job_ids:
             for job_id in job_ids:
                 batch_client.terminate_job(job_id=job_id)
+                self._get_failure_tracker().forget(job_id)
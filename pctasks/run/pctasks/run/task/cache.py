@@ -0,0 +1,164 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from cachetools import LRUCache
+from planetary_computer.sas import get_token
+
+from pctasks.core.utils.template import PCTemplater
+from pctasks.run.settings import RunSettings
+
+V = TypeVar("V")
+
+IMAGE_CONFIG = "image_config"
+SECRET = "secret"
+SAS_TOKEN = "sas_token"
+
+# Drop SAS tokens this many seconds before they expire
+SAS_TOKEN_EXPIRY_MARGIN_SECONDS = 60
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "expired": self.expired}
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires: float
+
+
+class TaskDataCache:
+    """Process-wide cache of values resolved while preparing task data.
+
+    Caches image key configurations, Key Vault secrets and Planetary
+    Computer SAS tokens, keyed by kind and a per-kind key. Entries live
+    for at most ``ttl_seconds``, or until their own expiry if earlier
+    (e.g. a SAS token's expiry), and the least recently used entries are
+    evicted beyond ``maxsize``. Hits, misses and expirations are counted
+    per kind.
+
+    Values are resolved outside of the lock, so concurrent misses for the
+    same key may both resolve it.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl_seconds: float = 300,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._timer = timer
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = Lock()
+        self._stats: Dict[str, CacheStats] = {}
+
+    def _get_stats(self, kind: str) -> CacheStats:
+        if kind not in self._stats:
+            self._stats[kind] = CacheStats()
+        return self._stats[kind]
+
+    def get(
+        self,
+        kind: str,
+        key: Hashable,
+        resolve: Callable[[], V],
+        expires_in: Optional[Callable[[V], Optional[float]]] = None,
+    ) -> V:
+        """Get a cached value, resolving and caching it on a miss.
+
+        ``expires_in`` returns the number of seconds the resolved value
+        is valid for, if it's shorter lived than the cache TTL.
+        """
+        cache_key: Tuple[str, Hashable] = (kind, key)
+        with self._lock:
+            stats = self._get_stats(kind)
+            entry: Optional[_Entry] = self._cache.get(cache_key)
+            if entry is not None and entry.expires > self._timer():
+                stats.hits += 1
+                return entry.value
+            if entry is not None:
+                stats.expired += 1
+                self._cache.pop(cache_key, None)
+            stats.misses += 1
+
+        value = resolve()
+
+        now = self._timer()
+        ttl = self.ttl_seconds
+        if expires_in:
+            value_ttl = expires_in(value)
+            if value_ttl is not None:
+                ttl = min(ttl, value_ttl)
+        if ttl > 0:
+            with self._lock:
+                self._cache[cache_key] = _Entry(value, now + ttl)
+        return value
+
+    def invalidate(self, kind: Optional[str] = None, key: Hashable = None) -> None:
+        """Drop the cached value for a key, all values of a kind, or everything."""
+        with self._lock:
+            if kind is None:
+                self._cache.clear()
+            elif key is not None:
+                self._cache.pop((kind, key), None)
+            else:
+                for cache_key in [k for k in self._cache.keys() if k[0] == kind]:
+                    self._cache.pop(cache_key, None)
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {kind: s.as_dict() for kind, s in self._stats.items()}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+
+class CachingPCTemplater(PCTemplater):
+    """PCTemplater that caches SAS tokens until shortly before they expire."""
+
+    def __init__(self, cache: TaskDataCache) -> None:
+        self.cache = cache
+
+    def _get_token(self, storage_account: str, container: str) -> str:
+        def _expires_in(token: Any) -> float:
+            return (
+                token.expiry - datetime.now(timezone.utc)
+            ).total_seconds() - SAS_TOKEN_EXPIRY_MARGIN_SECONDS
+
+        return self.cache.get(
+            SAS_TOKEN,
+            (storage_account, container),
+            lambda: get_token(storage_account, container),
+            expires_in=_expires_in,
+        ).token
+
+
+_task_data_cache: Optional[TaskDataCache] = None
+_task_data_cache_lock = Lock()
+
+
+def get_task_data_cache(settings: RunSettings) -> TaskDataCache:
+    """Get the process-wide task data cache.
+
+    The cache is created with the size and TTL of the first settings used.
+    """
+    global _task_data_cache
+    with _task_data_cache_lock:
+        if _task_data_cache is None:
+            _task_data_cache = TaskDataCache(
+                maxsize=settings.task_data_cache_size,
+                ttl_seconds=settings.task_data_cache_seconds,
+            )
+        return _task_data_cache
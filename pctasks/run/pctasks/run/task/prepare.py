@@ -6,12 +6,11 @@ from typing import Any, Dict, List, Optional
 from azure.storage.blob import BlobSasPermissions, generate_blob_sas
 
 from pctasks.core.constants import ENV_VAR_TASK_APPINSIGHTS_KEY
-from pctasks.core.models.config import BlobConfig
+from pctasks.core.models.config import BlobConfig, ImageConfig
 from pctasks.core.models.task import TaskDefinition, TaskRunConfig, TaskRunMessage
 from pctasks.core.models.tokens import StorageAccountTokens
 from pctasks.core.storage.blob import BlobStorage, BlobUri, generate_key_for_sas
 from pctasks.core.utils.backoff import with_backoff
-from pctasks.core.utils.template import PCTemplater
 from pctasks.run.errors import TaskPreparationError
 from pctasks.run.models import (
     PreparedTaskData,
@@ -23,6 +22,7 @@ from pctasks.run.secrets.keyvault import KeyvaultSecretsProvider
 from pctasks.run.secrets.local import LocalSecretsProvider
 from pctasks.run.settings import RunSettings
 from pctasks.run.task.base import TaskRunner
+from pctasks.run.task.cache import IMAGE_CONFIG, CachingPCTemplater, get_task_data_cache
 from pctasks.run.utils import (
     get_task_input_path,
     get_task_log_path,
@@ -45,6 +45,7 @@ def prepare_task_data(
 ) -> PreparedTaskData:
     environment = task_def.environment
     task_tags = task_def.tags
+    cache = get_task_data_cache(settings)
 
     # --Handle image key--
 
@@ -56,8 +57,22 @@ def prepare_task_data(
 
         logger.info(f"No image specified, using image key '{image_key}'")
 
-        with settings.get_image_key_table() as image_key_table:
-            image_config = image_key_table.get_image(image_key, target_environment)
+        def _get_image_config() -> Optional[ImageConfig]:
+            with settings.get_image_key_table() as image_key_table:
+                return image_key_table.get_image(image_key, target_environment)
+
+        # Don't cache missing image keys, which may be set later
+        image_config = cache.get(
+            IMAGE_CONFIG,
+            (
+                settings.tables_account_url,
+                settings.image_key_table_name,
+                image_key,
+                target_environment,
+            ),
+            _get_image_config,
+            expires_in=lambda config: None if config else 0,
+        )
 
         if image_config is None:
             raise ValueError(
@@ -118,7 +133,9 @@ def prepare_task_data(
             def _transform_tokens(tokens: Dict[str, Any]) -> Dict[str, Any]:
                 tks = secrets_provider.substitute_secrets(tokens)
                 try:
-                    tks = with_backoff(lambda: PCTemplater().template_dict(tks))
+                    tks = with_backoff(
+                        lambda: CachingPCTemplater(cache).template_dict(tks)
+                    )
                 except Exception as e:
                     raise TaskPreparationError(
                         f"Failed to fetch SAS tokens from the Planetary Computer: {e}"
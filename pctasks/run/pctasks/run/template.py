@@ -49,7 +49,7 @@ def template_foreach(
     trigger_event: Optional[Dict[str, Any]],
 ) -> List[Any]:
     if isinstance(foreach.items, list):
-        return foreach.items
+        return _batch_items(foreach, foreach.items)
 
     def _get_value(path: List[str]) -> Optional[TemplateValue]:
         if path[0] == JOBS_TEMPLATE_PATH:
@@ -66,13 +66,26 @@ def template_foreach(
 
     items = template_str(foreach.items, _get_value)
 
+    if foreach.batch_size and not isinstance(items, list):
+        # The output of a job with a single partition isn't a list.
+        items = [items]
+
     if not isinstance(items, list):
         raise TemplateError(f"foreach expected list of items, got {items}")
 
     if foreach.flatten:
-        return list(completely_flatten(items))
+        return _batch_items(foreach, list(completely_flatten(items)))
     else:
-        return list(items)
+        return _batch_items(foreach, list(items))
+
+
+def _batch_items(foreach: ForeachConfig, items: List[Any]) -> List[Any]:
+    if not foreach.batch_size:
+        return items
+    return [
+        items[i : i + foreach.batch_size]
+        for i in range(0, len(items), foreach.batch_size)
+    ]
 
 
 class ItemTemplater(Templater):
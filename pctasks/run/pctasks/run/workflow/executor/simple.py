@@ -59,12 +59,18 @@ class SimpleWorkflowExecutor:
                         req_storage,
                         task_config.code.pip_options,
                         task_settings.code_dir,
+                        cache_dir=task_settings.get_cache_dir(),
                     )
 
                 code_storage, code_path = context.storage_factory.get_storage_for_file(
                     task_config.code.src
                 )
-                ensure_code(code_path, code_storage, target_dir=task_settings.code_dir)
+                ensure_code(
+                    code_path,
+                    code_storage,
+                    target_dir=task_settings.code_dir,
+                    cache_dir=task_settings.get_cache_dir(),
+                )
 
             task_path = task_config.task
 
@@ -0,0 +1,108 @@
+from threading import Lock
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+import azure.batch.models as batchmodels
+from azure.core.exceptions import HttpResponseError
+
+from pctasks.run.batch.client import BatchClient
+from pctasks.run.batch.task import BatchTask
+from pctasks.run.settings import BatchSettings
+
+
+def make_tasks(n: int) -> List[BatchTask]:
+    return [
+        BatchTask(task_id=f"task-{i}", command=["echo", str(i)], image="image")
+        for i in range(n)
+    ]
+
+
+class FakeAzureBatchClient:
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+        self.added: Dict[str, int] = {}
+        self.server_errors: Dict[str, int] = {}
+        self.failing_ids: List[str] = []
+        self._lock = Lock()
+
+    def create_task_collection(
+        self, job_id: str, task_collection: batchmodels.BatchTaskGroup
+    ) -> batchmodels.BatchTaskAddCollectionResult:
+        ids = [t.id for t in task_collection.value]
+        with self._lock:
+            self.calls.append(ids)
+        if any(i in self.failing_ids for i in ids):
+            raise HttpResponseError("Bad collection")
+        results = []
+        for task_id in ids:
+            if self.server_errors.get(task_id, 0) > 0:
+                self.server_errors[task_id] -= 1
+                results.append(
+                    batchmodels.BatchTaskAddResult(
+                        status=batchmodels.BatchTaskAddStatus.SERVER_ERROR,
+                        task_id=task_id,
+                        error=batchmodels.BatchError(
+                            code="ServerBusy",
+                            message=batchmodels.BatchErrorMessage(value="busy"),
+                        ),
+                    )
+                )
+            else:
+                with self._lock:
+                    self.added[task_id] = self.added.get(task_id, 0) + 1
+                results.append(
+                    batchmodels.BatchTaskAddResult(
+                        status=batchmodels.BatchTaskAddStatus.SUCCESS,
+                        task_id=task_id,
+                    )
+                )
+        # Azure Batch doesn't guarantee the order of results
+        return batchmodels.BatchTaskAddCollectionResult(value=results[::-1])
+
+
+def make_client(fake: Any, submit_threads: int = 4) -> BatchClient:
+    client = BatchClient(
+        BatchSettings(
+            url="https://test.batch.azure.com",
+            key="key",
+            default_pool_id="pool",
+            submit_threads=submit_threads,
+        )
+    )
+    client._client = fake
+    return client
+
+
+def test_add_collection_splits_into_collections() -> None:
+    fake = FakeAzureBatchClient()
+    client = make_client(fake)
+
+    errors = client.add_collection("job", make_tasks(250))
+
+    assert errors == [None] * 250
+    assert sorted(len(c) for c in fake.calls) == [50, 100, 100]
+    assert len(fake.added) == 250
+
+
+def test_add_collection_retries_only_server_errors() -> None:
+    fake = FakeAzureBatchClient()
+    fake.server_errors = {"task-3": 1, "task-7": 1}
+    client = make_client(fake, submit_threads=1)
+
+    with patch("pctasks.run.batch.client.time.sleep"):
+        errors = client.add_collection("job", make_tasks(10))
+
+    assert errors == [None] * 10
+    assert fake.calls[1] == ["task-7", "task-3"]
+    assert all(count == 1 for count in fake.added.values())
+
+
+def test_add_collection_reports_collection_errors_per_task() -> None:
+    fake = FakeAzureBatchClient()
+    fake.failing_ids = ["task-150"]
+    client = make_client(fake)
+
+    errors = client.add_collection("job", make_tasks(200))
+
+    assert errors[:100] == [None] * 100
+    assert all(e is not None for e in errors[100:])
@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import azure.batch.models as batchmodels
+from azure.core.exceptions import HttpResponseError
+
+from pctasks.run.batch.client import format_odata_datetime
+from pctasks.run.batch.failures import BatchFailureTracker
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_task(
+    task_id: str,
+    minutes: int,
+    failure: Optional[str] = None,
+    state: batchmodels.BatchTaskState = batchmodels.BatchTaskState.COMPLETED,
+) -> batchmodels.BatchTask:
+    result = (
+        batchmodels.BatchTaskExecutionResult.FAILURE
+        if failure
+        else batchmodels.BatchTaskExecutionResult.SUCCESS
+    )
+    failure_info = (
+        batchmodels.BatchTaskFailureInfo(
+            category=batchmodels.ErrorCategory.USER_ERROR, message=failure
+        )
+        if failure
+        else None
+    )
+    return batchmodels.BatchTask(
+        id=task_id,
+        state=state,
+        state_transition_time=T0 + timedelta(minutes=minutes),
+        execution_info=batchmodels.BatchTaskExecutionInfo(
+            retry_count=0,
+            requeue_count=0,
+            result=result,
+            failure_info=failure_info,
+        ),
+    )
+
+
+class FakeBatchClient:
+    def __init__(self) -> None:
+        self.job_state: Optional[batchmodels.BatchJobState] = (
+            batchmodels.BatchJobState.ACTIVE
+        )
+        self.tasks: Dict[str, batchmodels.BatchTask] = {}
+        self.list_calls: List[Tuple[str, Optional[datetime]]] = []
+
+    def get_job_state(self, job_id: str) -> Optional[batchmodels.BatchJobState]:
+        return self.job_state
+
+    def list_completed_tasks(
+        self, job_id: str, since: Optional[datetime] = None
+    ) -> List[batchmodels.BatchTask]:
+        self.list_calls.append((job_id, since))
+        return [
+            t
+            for t in self.tasks.values()
+            if t.state == batchmodels.BatchTaskState.COMPLETED
+            and (since is None or t.state_transition_time >= since)
+        ]
+
+    def list_changed_tasks(
+        self, job_id: str, since: datetime
+    ) -> List[batchmodels.BatchTask]:
+        self.list_calls.append((job_id, since))
+        return [t for t in self.tasks.values() if t.state_transition_time >= since]
+
+
+def test_failures_are_tracked_incrementally() -> None:
+    client = FakeBatchClient()
+    tracker = BatchFailureTracker(client, overlap=timedelta(minutes=1))  # type: ignore
+
+    client.tasks["a"] = make_task("a", 1, failure="boom")
+    client.tasks["b"] = make_task("b", 2)
+    failed, job_failed = tracker.get_failed_tasks("job")
+    assert failed == {"a": "boom"}
+    assert not job_failed
+    assert client.list_calls[-1] == ("job", None)
+
+    # Only tasks since the watermark, less the overlap, are listed.
+    client.tasks["c"] = make_task("c", 5, failure="bust")
+    failed, _ = tracker.get_failed_tasks("job")
+    assert failed == {"a": "boom", "c": "bust"}
+    assert client.list_calls[-1] == ("job", T0 + timedelta(minutes=1))
+
+    # A retried task that succeeds is no longer failed.
+    client.tasks["c"] = make_task("c", 7)
+    client.job_state = batchmodels.BatchJobState.COMPLETED
+    failed, job_failed = tracker.get_failed_tasks("job")
+    assert failed == {"a": "boom"}
+    assert job_failed
+    assert client.list_calls[-1] == ("job", T0 + timedelta(minutes=4))
+
+
+def test_reactivated_tasks_are_not_failed() -> None:
+    client = FakeBatchClient()
+    tracker = BatchFailureTracker(client, overlap=timedelta(minutes=1))  # type: ignore
+
+    client.tasks["a"] = make_task("a", 1, failure="boom")
+    failed, _ = tracker.get_failed_tasks("job")
+    assert failed == {"a": "boom"}
+
+    # Reactivated tasks keep the execution info of their failed run.
+    client.tasks["a"] = make_task(
+        "a", 3, failure="boom", state=batchmodels.BatchTaskState.ACTIVE
+    )
+    failed, _ = tracker.get_failed_tasks("job")
+    assert failed == {}
+
+    client.tasks["a"] = make_task(
+        "a", 4, failure="boom", state=batchmodels.BatchTaskState.RUNNING
+    )
+    failed, _ = tracker.get_failed_tasks("job")
+    assert failed == {}
+
+    client.tasks["a"] = make_task("a", 6, failure="boom again")
+    failed, _ = tracker.get_failed_tasks("job")
+    assert failed == {"a": "boom again"}
+
+
+def test_finished_jobs_are_forgotten() -> None:
+    client = FakeBatchClient()
+    tracker = BatchFailureTracker(client)  # type: ignore
+    client.tasks["a"] = make_task("a", 1, failure="boom")
+
+    tracker.get_failed_tasks("job")
+    assert "job" in tracker._jobs
+    tracker.forget("job")
+    assert "job" not in tracker._jobs
+
+    client.job_state = batchmodels.BatchJobState.COMPLETED
+    failed, job_failed = tracker.get_failed_tasks("job")
+    assert failed == {"a": "boom"}
+    assert job_failed
+    assert "job" not in tracker._jobs
+
+    client.job_state = None
+    tracker.get_failed_tasks("job")
+    assert "job" not in tracker._jobs
+
+
+def test_missing_job_is_failed() -> None:
+    client = FakeBatchClient()
+    client.job_state = None
+    tracker = BatchFailureTracker(client)  # type: ignore
+
+    failed, job_failed = tracker.get_failed_tasks("job")
+    assert failed == {}
+    assert job_failed
+    assert client.list_calls == []
+
+
+def test_list_errors_keep_known_failures() -> None:
+    client = FakeBatchClient()
+    client.tasks["a"] = make_task("a", 1, failure="boom")
+    tracker = BatchFailureTracker(client)  # type: ignore
+    tracker.get_failed_tasks("job")
+
+    def _raise(*args: object, **kwargs: object) -> None:
+        raise HttpResponseError("unavailable")
+
+    client.list_changed_tasks = _raise  # type: ignore
+    failed, job_failed = tracker.get_failed_tasks("job")
+    assert failed == {"a": "boom"}
+    assert not job_failed
+
+
+def test_job_state_errors_keep_tracking() -> None:
+    client = FakeBatchClient()
+    client.tasks["a"] = make_task("a", 1, failure="boom")
+    tracker = BatchFailureTracker(client, overlap=timedelta(minutes=1))  # type: ignore
+    tracker.get_failed_tasks("job")
+
+    def _raise(job_id: str) -> None:
+        raise HttpResponseError("unavailable")
+
+    client.get_job_state = _raise  # type: ignore
+    client.tasks["b"] = make_task("b", 3, failure="bust")
+    failed, job_failed = tracker.get_failed_tasks("job")
+    assert failed == {"a": "boom", "b": "bust"}
+    assert not job_failed
+    assert "job" in tracker._jobs
+    assert client.list_calls[-1] == ("job", T0)
+
+    # The watermark is kept, so the next poll doesn't list every task again.
+    failed, _ = tracker.get_failed_tasks("job")
+    assert failed == {"a": "boom", "b": "bust"}
+    assert client.list_calls[-1] == ("job", T0 + timedelta(minutes=2))
+
+
+def test_format_odata_datetime() -> None:
+    dt = datetime(2024, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+    assert format_odata_datetime(dt) == "datetime'2024-01-02T03:04:05.678Z'"
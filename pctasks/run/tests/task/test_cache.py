@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from planetary_computer.sas import SASToken
+
+import pctasks.run.task.cache
+from pctasks.run.task.cache import SAS_TOKEN, CachingPCTemplater, TaskDataCache
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_hits_and_expiry():
+    timer = FakeTimer()
+    cache = TaskDataCache(maxsize=10, ttl_seconds=60, timer=timer)
+    calls: List[str] = []
+
+    def _resolve() -> str:
+        calls.append("a")
+        return f"value-{len(calls)}"
+
+    assert cache.get("kind", "a", _resolve) == "value-1"
+    assert cache.get("kind", "a", _resolve) == "value-1"
+
+    timer.now = 61
+    assert cache.get("kind", "a", _resolve) == "value-2"
+    assert cache.stats == {"kind": {"hits": 1, "misses": 2, "expired": 1}}
+
+
+def test_cache_value_expiry():
+    timer = FakeTimer()
+    cache = TaskDataCache(maxsize=10, ttl_seconds=60, timer=timer)
+
+    cache.get("kind", "short", lambda: "v", expires_in=lambda _: 10)
+    cache.get("kind", "missing", lambda: None, expires_in=lambda _: 0)
+    assert len(cache) == 1
+
+    timer.now = 11
+    cache.get("kind", "short", lambda: "v")
+    assert cache.stats["kind"]["expired"] == 1
+
+
+def test_cache_eviction_and_invalidation():
+    cache = TaskDataCache(maxsize=2, ttl_seconds=60)
+    for key in ["a", "b", "c"]:
+        cache.get("one", key, lambda: key)
+    assert len(cache) == 2
+
+    cache.get("two", "a", lambda: "a")
+    cache.invalidate("one")
+    assert len(cache) == 1
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_caching_pc_templater(monkeypatch):
+    calls: List[str] = []
+
+    def _get_token(account: str, container: str) -> SASToken:
+        calls.append(f"{account}/{container}")
+        return SASToken(
+            token=f"token-{len(calls)}",
+            **{"msft:expiry": datetime.now(timezone.utc) + timedelta(minutes=30)},
+        )
+
+    monkeypatch.setattr(pctasks.run.task.cache, "get_token", _get_token)
+
+    cache = TaskDataCache()
+    data = {"token": "${{ pc.get_token(account, container) }}"}
+    for _ in range(3):
+        templated = CachingPCTemplater(cache).template_dict(data)
+        assert templated == {"token": "token-1"}
+
+    assert calls == ["account/container"]
+    assert cache.stats[SAS_TOKEN] == {"hits": 2, "misses": 1, "expired": 0}
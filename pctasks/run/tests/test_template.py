@@ -54,3 +54,24 @@ def test_template_foreach_nested():
 
     templated = template_foreach(foreach_config, jobs_output, None)
     assert templated == [["a", "b"], ["c", "d"]]
+
+
+def test_template_foreach_batch_size():
+    foreach_config = ForeachConfig(
+        items="${{ jobs.job1.tasks.task1.output.uri }}", batch_size=2
+    )
+    jobs_output: Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]] = {
+        "job1": [
+            {"tasks": {"task1": {"output": {"uri": "a"}}}},
+            {"tasks": {"task1": {"output": {"uri": "b"}}}},
+            {"tasks": {"task1": {"output": {"uri": "c"}}}},
+        ]
+    }
+
+    templated = template_foreach(foreach_config, jobs_output, None)
+    assert templated == [["a", "b"], ["c"]]
+
+    # A job with a single partition outputs a single value
+    jobs_output = {"job1": {"tasks": {"task1": {"output": {"uri": "a"}}}}}
+    templated = template_foreach(foreach_config, jobs_output, None)
+    assert templated == [["a"]]
@@ -90,6 +90,7 @@ def run_task(
                     req_storage,
                     task_config.code_pip_options,
                     target_dir=task_settings.code_dir,
+                    cache_dir=task_settings.get_cache_dir(),
                 )
 
             code_src_blob_config = task_config.code_src_blob_config
@@ -106,7 +107,12 @@ def run_task(
                     account_url=code_src_blob_config.account_url,
                     client_secret_credentials=taskio_credentials,
                 )
-                ensure_code(code_path, code_storage, target_dir=task_settings.code_dir)
+                ensure_code(
+                    code_path,
+                    code_storage,
+                    target_dir=task_settings.code_dir,
+                    cache_dir=task_settings.get_cache_dir(),
+                )
 
             def update_status(status: TaskRunStatus) -> None:
                 status_storage.write_text(status_path, status.value)
@@ -1,7 +1,11 @@
+import logging
+import os
 from typing import Optional
 
 from pctasks.core.settings import PCTasksSettings
 
+logger = logging.getLogger(__name__)
+
 
 class TaskSettings(PCTasksSettings):
     @classmethod
@@ -15,3 +19,26 @@ class TaskSettings(PCTasksSettings):
     and code source will be downloaded to this directory.
     If None, will use sys.path and pip install will not use a target directory.
     """
+
+    cache_dir: Optional[str] = None
+    """A node-local directory for caching downloaded code and installed requirements.
+
+    If provided, uploaded code and pip-installed requirement environments are
+    cached under this directory, keyed by the blob etag (or content hash).
+    Tasks that use the same code or requirements on the same node skip the
+    download and pip install. Environment variables in the path are expanded,
+    e.g. ``$AZ_BATCH_NODE_SHARED_DIR/pctasks``. If None, no caching is done.
+    """
+
+    def get_cache_dir(self) -> Optional[str]:
+        """The expanded cache directory, or None if caching is disabled."""
+        if not self.cache_dir:
+            return None
+        cache_dir = os.path.expandvars(self.cache_dir)
+        if "$" in cache_dir:
+            logger.warning(
+                f"Could not expand cache_dir {self.cache_dir}; "
+                "code and requirements will not be cached."
+            )
+            return None
+        return cache_dir
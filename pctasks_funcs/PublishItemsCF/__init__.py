@@ -1,47 +1,96 @@
+"""
+Cosmos DB Change Feed Publisher
+
+This Azure Function publishes STAC items written to the `items` container in
+Cosmos DB to the `ingest` queue, where they're picked up by the streaming
+ingest task.
+
+By default, each message is a single STAC item. When the
+``FUNC_PUBLISH_PACK_ITEMS`` app setting is true, items are packed into
+messages containing a JSON array of STAC items, up to the queue's message
+size limit. Items are sent concurrently, with at most ``FUNC_MAX_CONCURRENCY``
+sends in flight.
+"""
+
 from __future__ import annotations
 
 import json
 import logging
 import os
+from xml.sax.saxutils import escape
 
 import azure.functions as func
-import azure.identity
-import azure.storage.queue.aio
+import orjson
 import pctasks_funcs_base
 
+# The Queue service limit is 64 KiB. Leave some room for the XML envelope;
+# message sizes are measured after XML escaping.
+MAX_MESSAGE_SIZE = 60 * 1024
 
-async def main(documents: func.DocumentList) -> None:
-    account_url = os.environ["FUNC_STORAGE_QUEUE_ACCOUNT_URL"]
-    credential = os.environ.get("FUNC_STORAGE_ACCOUNT_KEY", None)
-    credential, credential_ctx = pctasks_funcs_base.credential_context(credential)
 
+async def main(documents: func.DocumentList) -> None:
     queue_name = "ingest"
     filtered_documents = [
         document for document in documents if document["type"] == "StacItem"
     ]
 
-    if filtered_documents:
-        async with credential_ctx:  # type: ignore
-            qc = azure.storage.queue.aio.QueueClient(
-                account_url,
-                queue_name,
-                credential=credential,
-            )
-            async with qc:
-                for document in filtered_documents:
-                    if document["type"] == "StacItem":
-                        message = transform_document(document)
-                        await qc.send_message(message)
-                        log_message = {
-                            "message": "Published item",
-                            "type": "publish-item",
-                            "collection_id": document["item"]["collection"],
-                            "item_id": document["item"]["id"],
-                        }
-
-                        logging.info(json.dumps(log_message))
+    if not filtered_documents:
+        return
+
+    qc = pctasks_funcs_base.get_queue_client(queue_name)
+    messages = [transform_document(document) for document in filtered_documents]
+    if os.environ.get("FUNC_PUBLISH_PACK_ITEMS", "").lower() in ("true", "1"):
+        messages = pack_messages(messages)
+
+    await pctasks_funcs_base.gather_with_concurrency(
+        qc.send_message(message) for message in messages
+    )
+
+    for document in filtered_documents:
+        log_message = {
+            "message": "Published item",
+            "type": "publish-item",
+            "collection_id": document["item"]["collection"],
+            "item_id": document["item"]["id"],
+        }
+
+        logging.info(json.dumps(log_message))
 
 
 def transform_document(document: func.Document) -> str:
     item = document["item"]
-    return json.dumps(item)
+    return orjson.dumps(item).decode("utf-8")
+
+
+def pack_messages(
+    messages: list[str], max_message_size: int = MAX_MESSAGE_SIZE
+) -> list[str]:
+    """
+    Pack serialized STAC items into JSON arrays of items.
+
+    Each packed message is at most ``max_message_size`` bytes once XML
+    escaped, as it is sent in the Queue service request body. Items that
+    are too large to share a message are sent on their own, unwrapped.
+    """
+    packed: list[str] = []
+    batch: list[str] = []
+    # The size of "[" + ",".join(batch) + "]"
+    batch_size = 1
+
+    def flush() -> None:
+        if len(batch) == 1:
+            packed.append(batch[0])
+        elif batch:
+            packed.append("[" + ",".join(batch) + "]")
+
+    for message in messages:
+        size = len(escape(message).encode("utf-8")) + 1
+        if batch and batch_size + size > max_message_size:
+            flush()
+            batch = []
+            batch_size = 1
+        batch.append(message)
+        batch_size += size
+
+    flush()
+    return packed
@@ -38,21 +38,26 @@ maps to the nested object:
 
 And would ensure that a cloud event with the URL given above would be dispatched
 to the `goes-glm` queue.
+
+Dispatch rules are read from the environment and indexed once per worker
+process. Messages are sent concurrently over pooled queue clients, with at
+most ``FUNC_MAX_CONCURRENCY`` (default 32) sends in flight per invocation.
 """
 
+import functools
 import json
 import logging
 import os
 
 import azure.functions as func
-import azure.identity.aio
-import azure.storage.queue.aio
 import pctasks_funcs_base
 
 from pctasks.core.models.event import StorageEvent
 
+DispatchConfig = list[tuple[str, str | None, str | None]]
+
 
-def load_dispatch_config() -> list[tuple[str, str | None, str | None]]:
+def load_dispatch_config() -> DispatchConfig:
     config = []
     for k, v in os.environ.items():
         if k.startswith("PCTASKS_DISPATCH__"):
@@ -65,23 +70,85 @@ def load_dispatch_config() -> list[tuple[str, str | None, str | None]]:
     return config
 
 
-def dispatch(url: str, rules: list[tuple[str, str | None, str | None]]) -> list[str]:
+class DispatchRules:
     """
-    Parameters
-    ----------
+    Dispatch rules indexed by prefix.
+
+    Rules are grouped by their prefix, so matching a URL takes one dictionary
+    lookup per distinct prefix length rather than a scan over every rule.
+    """
+
+    def __init__(self, config: DispatchConfig) -> None:
+        self.by_prefix: dict[str, list[tuple[str, str | None]]] = {}
+        self.unprefixed: list[tuple[str, str | None]] = []
+
+        for queue_name, prefix, suffix in config:
+            if prefix is None:
+                self.unprefixed.append((queue_name, suffix))
+            else:
+                self.by_prefix.setdefault(prefix, []).append((queue_name, suffix))
+
+        self.prefix_lengths = sorted({len(prefix) for prefix in self.by_prefix})
+
+    def match(self, url: str) -> list[str]:
+        candidates = list(self.unprefixed)
+        for length in self.prefix_lengths:
+            if length > len(url):
+                break
+            candidates.extend(self.by_prefix.get(url[:length], []))
+
+        queues = [
+            queue_name
+            for queue_name, suffix in candidates
+            if suffix is None or url.endswith(suffix)
+        ]
+        # We deduplicate here. Ideally, we wouldn't have duplicates in the first place.
+        return list(dict.fromkeys(queues))
+
+
+@functools.lru_cache(maxsize=1)
+def get_dispatch_rules() -> DispatchRules:
+    """
+    The dispatch rules for this worker process.
+
+    App settings don't change over the lifetime of a worker, so the
+    environment is read and indexed once.
     """
-    queues = []
-    for queue_name, prefix, suffix in rules:
-        matches_prefix = (prefix is None) or url.startswith(prefix)
-        matches_suffix = (suffix is None) or url.endswith(suffix)
+    return DispatchRules(load_dispatch_config())
 
-        if matches_prefix and matches_suffix:
-            queues.append(queue_name)
 
-    # We deduplicate here. Ideally, we wouldn't have duplicates in the first place.
-    queues = list(set(queues))
+def dispatch(url: str, rules: DispatchConfig | DispatchRules) -> list[str]:
+    """
+    Parameters
+    ----------
+    url: str
+        The URL of the blob from the storage event.
+    rules: list or DispatchRules
+        The dispatch rules, as returned by :func:`load_dispatch_config`
+        or :func:`get_dispatch_rules`.
+
+    Returns
+    -------
+    The names of the queues the event should be sent to.
+    """
+    if not isinstance(rules, DispatchRules):
+        rules = DispatchRules(rules)
+    return rules.match(url)
+
+
+async def send_event(storage_event: StorageEvent, queue_name: str) -> None:
+    queue_client = pctasks_funcs_base.get_queue_client(queue_name)
+    log_message = {
+        "message": "Dispatched message",
+        "type": "storage-event-dispatch",
+        "matched": True,
+        "url": storage_event.data.url,
+        "id": storage_event.id,
+        "queue_url": f"{queue_client.primary_hostname}/{queue_client.queue_name}",
+    }
 
-    return queues
+    logging.info(json.dumps(log_message))
+    await queue_client.send_message(storage_event.json())
 
 
 async def main(documents: func.DocumentList) -> None:
@@ -89,44 +156,26 @@ async def main(documents: func.DocumentList) -> None:
     # 1. Connection string (azurite)
     # 2. DefaultAzureCredential (prod)
     # TODO: local.settings.json
-    account_url = os.environ["FUNC_STORAGE_QUEUE_ACCOUNT_URL"]
-    credential = os.environ.get("FUNC_STORAGE_ACCOUNT_KEY", None)
-    credential, credential_ctx = pctasks_funcs_base.credential_context(credential)
-
-    config = load_dispatch_config()
-
-    async with credential_ctx:  # type: ignore
-        for document in documents:
-            storage_event = StorageEvent(**document)
-            queues = dispatch(storage_event.data.url, config)
-
-            if not queues:
-                log_message = {
-                    "message": "Dropped message",
-                    "type": "storage-event-dispatch",
-                    "matched": False,
-                    "url": storage_event.data.url,
-                    "id": storage_event.id,
-                }
-
-                logging.warning(json.dumps(log_message))
-                continue
-
-            for queue_name in queues:
-                queue_client = azure.storage.queue.aio.QueueClient(
-                    account_url, queue_name=queue_name, credential=credential
-                )
-                log_message = {
-                    "message": "Dispatched message",
-                    "type": "storage-event-dispatch",
-                    "matched": True,
-                    "url": storage_event.data.url,
-                    "id": storage_event.id,
-                    "queue_url": (
-                        f"{queue_client.primary_hostname}/{queue_client.queue_name}"
-                    ),
-                }
-
-                logging.info(json.dumps(log_message))
-                async with queue_client:
-                    await queue_client.send_message(storage_event.json())
+    rules = get_dispatch_rules()
+
+    sends = []
+    for document in documents:
+        storage_event = StorageEvent(**document)
+        queues = dispatch(storage_event.data.url, rules)
+
+        if not queues:
+            log_message = {
+                "message": "Dropped message",
+                "type": "storage-event-dispatch",
+                "matched": False,
+                "url": storage_event.data.url,
+                "id": storage_event.id,
+            }
+
+            logging.warning(json.dumps(log_message))
+            continue
+
+        for queue_name in queues:
+            sends.append(send_event(storage_event, queue_name))
+
+    await pctasks_funcs_base.gather_with_concurrency(sends)
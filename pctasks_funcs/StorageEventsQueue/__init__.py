@@ -1,23 +1,46 @@
 """
 Azure Function to forward Blob Storage Events to the `storage-events`
 container in Cosmos DB.
+
+The Cosmos DB container client is created once per worker process and
+reused across invocations.
 """
 
+import asyncio
 import json
 import logging
 
 import azure.functions as func
 
-from pctasks.core.cosmos.containers.storage_events import StorageEventsContainer
+from pctasks.core.cosmos.containers.storage_events import AsyncStorageEventsContainer
 from pctasks.core.models.event import StorageEventRecord
 
+_container: AsyncStorageEventsContainer | None = None
+_container_lock: asyncio.Lock | None = None
+
+
+async def get_container() -> AsyncStorageEventsContainer:
+    """Get the process-wide async storage events container."""
+    global _container, _container_lock
+    if _container is not None:
+        return _container
+    if _container_lock is None:
+        _container_lock = asyncio.Lock()
+    # Concurrent invocations wait for the first to open the container.
+    async with _container_lock:
+        if _container is None:
+            container = AsyncStorageEventsContainer(StorageEventRecord)
+            await container.__aenter__()
+            _container = container
+    return _container
 
-# TODO: use async
-def main(msg: func.QueueMessage) -> None:
+
+async def main(msg: func.QueueMessage) -> None:
     body = msg.get_body().decode("utf-8")
     event = StorageEventRecord.model_validate_json(body)
-    with StorageEventsContainer(StorageEventRecord) as cosmos_client:
-        cosmos_client.put(event)
+
+    container = await get_container()
+    await container.put(event)
 
     # Azure Functions overwrites custom_dimensions so we stuff the
     # structured log record into the "message" field.
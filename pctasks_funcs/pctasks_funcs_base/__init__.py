@@ -1,8 +1,23 @@
+import asyncio
 import contextlib
+import functools
+import logging
 import os
-from typing import Any, Optional, Tuple
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
 
 import azure.identity.aio
+import azure.storage.queue.aio
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 32
+
+_credential: Any = None
+_queue_clients: Dict[Tuple[str, str], azure.storage.queue.aio.QueueClient] = {}
+_queue_clients_loop: Optional[asyncio.AbstractEventLoop] = None
+_close_tasks: Set["asyncio.Task[None]"] = set()
 
 
 def credential_context(
@@ -30,3 +45,117 @@ def credential_context(
 
     assert credential_ctx_ is not None
     return credential, credential_ctx_
+
+
+def get_credential() -> Any:
+    """
+    Get the process-wide async credential for the function's storage account.
+
+    Unlike :func:`credential_context`, the credential is created once and kept
+    open for the lifetime of the worker process (and event loop) so that
+    tokens are reused across invocations.
+    """
+    global _credential
+    if _credential is None:
+        account_key = os.environ.get("FUNC_STORAGE_ACCOUNT_KEY", None)
+        _credential, _ = credential_context(account_key)
+    return _credential
+
+
+def _close_on_loop(
+    loop: asyncio.AbstractEventLoop,
+    queue_clients: List[azure.storage.queue.aio.QueueClient],
+    credential: Any,
+) -> None:
+    """Schedule closing queue clients and the credential of a previous loop.
+
+    Never waits for them to close. If their loop is still running (on
+    another thread), they're closed there. Otherwise, closing them is
+    attempted on the current loop, which can fail for sessions bound to
+    their original loop; that leaks them, as does a closed loop.
+    """
+
+    async def _close() -> None:
+        try:
+            for queue_client in queue_clients:
+                await queue_client.close()
+            if hasattr(credential, "close"):
+                await credential.close()
+        except Exception:
+            logger.warning(
+                f"Unable to close {len(queue_clients)} queue clients "
+                "from a previous event loop.",
+                exc_info=True,
+            )
+
+    if loop.is_closed():
+        if queue_clients:
+            logger.warning(
+                f"Unable to close {len(queue_clients)} queue clients; "
+                "their event loop is closed."
+            )
+        return
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(_close(), loop)
+    else:
+        task = asyncio.get_running_loop().create_task(_close())
+        # Keep a reference so the task isn't garbage collected before it runs
+        _close_tasks.add(task)
+        task.add_done_callback(_close_tasks.discard)
+
+
+def get_queue_client(queue_name: str) -> azure.storage.queue.aio.QueueClient:
+    """
+    Get a pooled async QueueClient for ``queue_name``.
+
+    Clients are cached per worker process (and event loop), so the underlying
+    HTTP session is reused across messages and function invocations.
+    """
+    global _credential, _queue_clients_loop
+    loop = asyncio.get_running_loop()
+    if _queue_clients_loop is not loop:
+        # aiohttp sessions and the async credential are bound to the loop
+        # they were created on, so recreate them for the new loop.
+        if _queue_clients_loop is not None:
+            _close_on_loop(
+                _queue_clients_loop, list(_queue_clients.values()), _credential
+            )
+        _queue_clients.clear()
+        _credential = None
+        _queue_clients_loop = loop
+
+    account_url = os.environ["FUNC_STORAGE_QUEUE_ACCOUNT_URL"]
+    key = (account_url, queue_name)
+    queue_client = _queue_clients.get(key)
+    if queue_client is None:
+        queue_client = azure.storage.queue.aio.QueueClient(
+            account_url, queue_name=queue_name, credential=get_credential()
+        )
+        _queue_clients[key] = queue_client
+    return queue_client
+
+
+@functools.lru_cache(maxsize=1)
+def get_max_concurrency() -> int:
+    """
+    The maximum number of concurrent queue operations per invocation.
+
+    Read once from ``FUNC_MAX_CONCURRENCY``.
+    """
+    return int(os.environ.get("FUNC_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+
+
+async def gather_with_concurrency(
+    aws: Iterable[Awaitable[T]], max_concurrency: Optional[int] = None
+) -> List[T]:
+    """
+    Like :func:`asyncio.gather`, but with at most ``max_concurrency``
+    awaitables running at once.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or get_max_concurrency())
+
+    async def run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws))
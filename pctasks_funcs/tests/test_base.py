@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from typing import List
+
+import pctasks_funcs_base
+import pytest
+
+
+class FakeQueueClient:
+    def __init__(self, account_url: str, queue_name: str, credential: object) -> None:
+        self.queue_name = queue_name
+        self.closed_on: List[asyncio.AbstractEventLoop] = []
+
+    async def close(self) -> None:
+        self.closed_on.append(asyncio.get_running_loop())
+
+
+@pytest.fixture(autouse=True)
+def queue_clients(monkeypatch):
+    monkeypatch.setenv("FUNC_STORAGE_QUEUE_ACCOUNT_URL", "https://account.queue")
+    monkeypatch.setenv("FUNC_STORAGE_ACCOUNT_NAME", "account")
+    monkeypatch.setenv("FUNC_STORAGE_ACCOUNT_KEY", "key")
+    monkeypatch.setattr(
+        pctasks_funcs_base.azure.storage.queue.aio, "QueueClient", FakeQueueClient
+    )
+    monkeypatch.setattr(pctasks_funcs_base, "_queue_clients", {})
+    monkeypatch.setattr(pctasks_funcs_base, "_queue_clients_loop", None)
+    monkeypatch.setattr(pctasks_funcs_base, "_credential", None)
+
+
+async def get_queue_client(queue_name: str = "queue") -> FakeQueueClient:
+    return pctasks_funcs_base.get_queue_client(queue_name)
+
+
+def test_queue_clients_are_pooled_per_loop():
+    loop = asyncio.new_event_loop()
+    try:
+        first = loop.run_until_complete(get_queue_client())
+        assert loop.run_until_complete(get_queue_client()) is first
+        assert loop.run_until_complete(get_queue_client("other")) is not first
+    finally:
+        loop.close()
+
+
+def test_stopped_loop_clients_are_closed_on_new_loop():
+    old_loop = asyncio.new_event_loop()
+    new_loop = asyncio.new_event_loop()
+    try:
+        old = old_loop.run_until_complete(get_queue_client())
+
+        async def _switch() -> FakeQueueClient:
+            client = await get_queue_client()
+            await asyncio.sleep(0)
+            return client
+
+        new = new_loop.run_until_complete(_switch())
+        assert new is not old
+        assert old.closed_on == [new_loop]
+        assert not pctasks_funcs_base._close_tasks
+    finally:
+        old_loop.close()
+        new_loop.close()
+
+
+def test_running_loop_clients_are_closed_on_their_loop():
+    old_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=old_loop.run_forever)
+    thread.start()
+    try:
+        old = asyncio.run_coroutine_threadsafe(get_queue_client(), old_loop).result(5)
+        asyncio.run(get_queue_client())
+        # Closing is scheduled on the old loop without waiting for it
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), old_loop).result(5)
+        assert old.closed_on == [old_loop]
+    finally:
+        old_loop.call_soon_threadsafe(old_loop.stop)
+        thread.join(5)
+        old_loop.close()
+
+
+def test_closed_loop_clients_are_dropped():
+    old = asyncio.run(get_queue_client())
+    new = asyncio.run(get_queue_client())
+    assert new is not old
+    assert old.closed_on == []
@@ -2,6 +2,7 @@
 # to ensure that the file is on sys.path
 import json
 import pathlib
+from xml.sax.saxutils import escape
 
 import azure.functions as func
 import PublishItemsCF
@@ -19,3 +20,30 @@ def document() -> func.Document:
 def test_transform_document(document):
     result = PublishItemsCF.transform_document(document)
     assert result
+
+
+def test_pack_messages():
+    messages = [json.dumps({"id": str(i), "pad": "x" * 40}) for i in range(10)]
+    packed = PublishItemsCF.pack_messages(messages, max_message_size=200)
+
+    assert all(len(m) <= 200 for m in packed)
+    unpacked = []
+    for message in packed:
+        data = json.loads(message)
+        unpacked.extend(data if isinstance(data, list) else [data])
+    assert [x["id"] for x in unpacked] == [str(i) for i in range(10)]
+
+
+def test_pack_messages_large_item():
+    messages = [json.dumps({"id": "big", "pad": "x" * 500}), json.dumps({"id": "a"})]
+    packed = PublishItemsCF.pack_messages(messages, max_message_size=200)
+
+    assert packed == messages
+
+
+def test_pack_messages_measures_escaped_size():
+    messages = [json.dumps({"id": str(i), "pad": "&" * 20}) for i in range(10)]
+    packed = PublishItemsCF.pack_messages(messages, max_message_size=200)
+
+    assert all(len(escape(m)) <= 200 for m in packed)
+    assert len(packed) == 10
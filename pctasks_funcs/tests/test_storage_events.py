@@ -1,4 +1,5 @@
 # TODO: figure out running. Just using python -m pytest for now
+import inspect
 import json
 import pathlib
 import time
@@ -8,6 +9,7 @@ import azure.functions as func
 import azure.storage.queue
 import pytest
 import StorageEventsCF
+import StorageEventsQueue
 
 from pctasks.core.cosmos.containers.items import ItemsContainer
 from pctasks.core.cosmos.containers.storage_events import StorageEventsContainer
@@ -235,3 +237,79 @@ def test_load_dispatch():
             "manifest.safe",
         ),
     ]
+
+
+def test_dispatch_rules_prefix_and_suffix():
+    rules = StorageEventsCF.DispatchRules(
+        [
+            ("a", "https://example.com/container/", None),
+            ("b", "https://example.com/container/sub/", "manifest.safe"),
+            ("c", None, ".json"),
+            ("a", "https://example.com/", None),
+        ]
+    )
+    assert rules.match("https://example.com/container/sub/manifest.safe") == [
+        "a",
+        "b",
+    ]
+    assert rules.match("https://example.com/container/sub/item.json") == ["c", "a"]
+    assert rules.match("https://other.com/item.xml") == []
+
+
+async def test_main_sends_concurrently(monkeypatch):
+    sent = []
+
+    class FakeQueueClient:
+        primary_hostname = "localhost"
+
+        def __init__(self, queue_name):
+            self.queue_name = queue_name
+
+        async def send_message(self, message):
+            sent.append((self.queue_name, json.loads(message)["id"]))
+
+    monkeypatch.setattr(
+        StorageEventsCF.pctasks_funcs_base, "get_queue_client", FakeQueueClient
+    )
+    monkeypatch.setattr(
+        StorageEventsCF,
+        "get_dispatch_rules",
+        lambda: StorageEventsCF.DispatchRules([("test-collection", "http://", None)]),
+    )
+    body = json.loads(HERE.joinpath("storage_event.json").read_text())
+    body["data"]["contentOffset"] = None
+    documents = []
+    for i in range(5):
+        documents.append(func.Document({**body, "id": str(i)}))
+    dropped_data = {**body["data"], "url": "https://example.com/item.json"}
+    documents.append(func.Document({**body, "id": "dropped", "data": dropped_data}))
+
+    await StorageEventsCF.main(func.DocumentList(documents))
+
+    assert sorted(sent) == [("test-collection", str(i)) for i in range(5)]
+
+
+async def test_storage_events_queue_put(monkeypatch):
+    put = []
+
+    class FakeContainer:
+        async def put(self, model):
+            put.append(model)
+
+    monkeypatch.setattr(StorageEventsQueue, "_container", FakeContainer())
+    body = json.loads(HERE.joinpath("storage_event.json").read_text())
+    body["data"]["contentOffset"] = None
+    for i in range(2):
+        msg = func.QueueMessage(
+            id=str(i), body=json.dumps({**body, "id": f"event-{i}"})
+        )
+        await StorageEventsQueue.main(msg)
+
+    assert [event.id for event in put] == ["event-0", "event-1"]
+
+
+def test_storage_events_queue_binding():
+    from azure.functions.queue import QueueMessageInConverter
+
+    annotation = inspect.signature(StorageEventsQueue.main).parameters["msg"]
+    assert QueueMessageInConverter.check_input_type_annotation(annotation.annotation)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Benchmark Cosmos DB record serialization and put/query throughput.
+
+Builds JobPartitionRunRecords shaped like those of a process-chunk job and
+times turning them into Cosmos DB items and back, comparing the previous
+json.dumps round trip with the single pass of
+BaseCosmosDBContainer.item_from_model. With ``--cosmos``, also puts and
+queries the records through a WorkflowRunsContainer in a temporary database
+(requires the emulator).
+
+Usage:
+
+    python scripts/benchmark_cosmos_records.py [--records 1000] [--tasks 5]
+"""
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+import orjson
+
+from pctasks.core.models.run import (
+    JobPartitionRunRecord,
+    JobPartitionRunStatus,
+    TaskRunRecord,
+    TaskRunStatus,
+)
+from pctasks.core.models.utils import STORAGE_CONTEXT, tzutc_now
+
+
+def make_records(count: int, tasks: int) -> List[JobPartitionRunRecord]:
+    records = []
+    for i in range(count):
+        record = JobPartitionRunRecord(
+            run_id="benchmark-run",
+            job_id="process-chunk",
+            partition_id=str(i),
+            status=JobPartitionRunStatus.RUNNING,
+            tasks=[
+                TaskRunRecord(
+                    run_id="benchmark-run",
+                    job_id="process-chunk",
+                    partition_id=str(i),
+                    task_id=f"task-{t}",
+                    status=TaskRunStatus.PENDING,
+                    log_uri=f"blob://account/logs/benchmark-run/{i}/task-{t}.log",
+                )
+                for t in range(tasks)
+            ],
+        )
+        for task in record.tasks:
+            task.set_status(TaskRunStatus.SUBMITTED)
+            task.set_status(TaskRunStatus.RUNNING)
+        record.created = tzutc_now()
+        records.append(record)
+    return records
+
+
+def item_from_model(record: JobPartitionRunRecord) -> Dict[str, Any]:
+    # Mirrors BaseCosmosDBContainer.item_from_model
+    item = record.model_dump(
+        mode="json", by_alias=True, exclude_none=True, context=STORAGE_CONTEXT
+    )
+    item["id"] = record.get_id()
+    return item
+
+
+def timeit(f: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, count: int, seconds: float) -> None:
+    print(f"{name:<32} {seconds:>9.4f}s  {count / seconds:>10.0f} records/s")
+
+
+def bench_serialization(records: List[JobPartitionRunRecord], repeat: int) -> None:
+    n = len(records)
+    report(
+        "serialize (json.dumps)",
+        n,
+        timeit(lambda: [orjson.loads(r.json()) for r in records], repeat),
+    )
+    report(
+        "serialize (model_dump json)",
+        n,
+        timeit(lambda: [item_from_model(r) for r in records], repeat),
+    )
+
+    items = [item_from_model(r) for r in records]
+    report(
+        "read (model_validate)",
+        n,
+        timeit(
+            lambda: [JobPartitionRunRecord.model_validate(i) for i in items], repeat
+        ),
+    )
+    report(
+        "read (model_construct)",
+        n,
+        timeit(
+            lambda: [JobPartitionRunRecord.model_construct(**i) for i in items], repeat
+        ),
+    )
+
+
+def bench_cosmos(records: List[JobPartitionRunRecord]) -> None:
+    from pctasks.core.cosmos.containers.workflow_runs import WorkflowRunsContainer
+    from pctasks.dev.cosmosdb import temp_cosmosdb_if_emulator
+
+    n = len(records)
+    with temp_cosmosdb_if_emulator() as db:
+        container = WorkflowRunsContainer(JobPartitionRunRecord, db=db)
+        with container:
+            start = time.perf_counter()
+            container.bulk_put(records)
+            report("bulk_put", n, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            result = list(
+                container.query(
+                    partition_key="benchmark-run",
+                    query="SELECT * FROM c WHERE c.type = @type",
+                    parameters={"type": "JobPartitionRun"},
+                )
+            )
+            report("query", len(result), time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000)
+    parser.add_argument("--tasks", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--cosmos", action="store_true", help="Also put and query via the emulator"
+    )
+    args = parser.parse_args()
+
+    records = make_records(args.records, args.tasks)
+    print(f"{args.records} records with {args.tasks} tasks each\n")
+    bench_serialization(records, args.repeat)
+
+    if args.cosmos:
+        print()
+        bench_cosmos(records)
+
+
+if __name__ == "__main__":
+    main()
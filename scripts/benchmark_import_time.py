@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark the cold-start import cost of the pctasks entry points.
+
+Each measurement runs in a fresh interpreter, so nothing is shared between
+runs. Reports the time to import the ``pctasks`` CLI, each registered
+``pctasks.commands`` subcommand, and the modules ``pctasks task run`` loads
+before it reads the task input, along with the time for ``--help`` of each
+command and the slowest imports (from ``python -X importtime``) of each
+module.
+
+Usage:
+
+    python scripts/benchmark_import_time.py [--repeat 5] [--top 5]
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import List, Tuple
+
+from pctasks.cli.cli import PCTASKS_COMMAND_ENTRY_POINT_GROUP
+from pctasks.core.cli import get_plugin_entry_points
+
+TASK_RUN_MODULE = "pctasks.task._cli"
+
+_IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+_COMMAND_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+from pctasks.cli.cli import pctasks_cmd
+try:
+    pctasks_cmd.main({args!r}, prog_name="pctasks")
+except SystemExit:
+    pass
+print(time.perf_counter() - start, file=sys.stderr)
+"""
+
+
+def _run(snippet: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", snippet],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def time_import(module: str, repeat: int) -> float:
+    return min(
+        float(_run(_IMPORT_SNIPPET.format(module=module)).stdout.strip())
+        for _ in range(repeat)
+    )
+
+
+def time_command(args: List[str], repeat: int) -> float:
+    return min(
+        float(_run(_COMMAND_SNIPPET.format(args=args)).stderr.strip().splitlines()[-1])
+        for _ in range(repeat)
+    )
+
+
+def slowest_imports(module: str, top: int) -> List[Tuple[str, float]]:
+    """Modules with the largest self import time, in seconds."""
+    result = _run(f"import {module}", "-X", "importtime")
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        imports.append((name.strip(), int(self_us) / 1e6))
+    return sorted(imports, key=lambda i: i[1], reverse=True)[:top]
+
+
+def report(name: str, import_seconds: float, help_seconds: float) -> None:
+    print(f"{name:<36} {import_seconds:>8.3f}s  {help_seconds:>8.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--top", type=int, default=5, help="Slowest imports to show per module"
+    )
+    args = parser.parse_args()
+
+    entry_points = get_plugin_entry_points(PCTASKS_COMMAND_ENTRY_POINT_GROUP)
+    targets = [("pctasks", "pctasks.cli.cli", ["--help"])]
+    targets += [
+        (f"pctasks {name}", entry_point.module, [name, "--help"])
+        for name, entry_point in sorted(entry_points.items())
+    ]
+    targets.append(("pctasks task run", TASK_RUN_MODULE, ["task", "run", "--help"]))
+
+    print(f"{'entry point':<36} {'import':>9}  {'--help':>9}")
+    for name, module, command in targets:
+        report(
+            name, time_import(module, args.repeat), time_command(command, args.repeat)
+        )
+
+    if args.top:
+        for name, module, _ in targets:
+            print(f"\nSlowest imports for {name} ({module}):")
+            for imported, seconds in slowest_imports(module, args.top):
+                print(f"  {imported:<50} {seconds:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
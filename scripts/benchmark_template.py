@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark templating foreach items from large job outputs.
+
+Builds job outputs shaped like those of a ``process-chunk`` job with many
+partitions and times resolving templates such as
+``${{ jobs.process-chunk.tasks.create-items.output.ndjson_uri }}``.
+
+Usage:
+
+    python scripts/benchmark_template.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+from pctasks.core.utils.template import find_value, split_path, template_str
+
+
+def make_job_outputs(partitions: int) -> Dict[str, Any]:
+    return {
+        "create-chunks": {
+            "tasks": {
+                "create-chunks": {
+                    "output": {
+                        "chunks": [
+                            {
+                                "uri": f"blob://account/container/chunks/{i}.csv",
+                                "chunk_id": f"{i}.csv",
+                            }
+                            for i in range(partitions)
+                        ]
+                    }
+                }
+            }
+        },
+        "process-chunk": [
+            {
+                "tasks": {
+                    "create-items": {
+                        "output": {
+                            "ndjson_uri": (
+                                f"blob://account/container/items/{i}/items.ndjson"
+                            )
+                        }
+                    }
+                }
+            }
+            for i in range(partitions)
+        ],
+    }
+
+
+TEMPLATES = [
+    "${{ jobs.create-chunks.tasks.create-chunks.output.chunks }}",
+    "${{ jobs.create-chunks.tasks.create-chunks.output.chunks.uri }}",
+    "${{ jobs.process-chunk.tasks.create-items.output.ndjson_uri }}",
+]
+
+
+def timeit(f: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'partitions':>10}  {'seconds':>9}  template")
+    for size in args.sizes:
+        job_outputs = make_job_outputs(size)
+
+        def get_value(path: List[str]) -> Any:
+            return find_value(job_outputs, path[1:], strict=True)
+
+        for template in TEMPLATES:
+            seconds = timeit(lambda: template_str(template, get_value), args.repeat)
+            print(f"{size:>10}  {seconds:>9.4f}  {template}")
+
+    path = "jobs.process-chunk.tasks.create-items.output.ndjson_uri"
+    seconds = timeit(lambda: [split_path(path) for _ in range(100_000)], args.repeat)
+    print(f"\nsplit_path x 100000: {seconds:.4f}s")
+
+
+if __name__ == "__main__":
+    main()